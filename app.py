@@ -1,16 +1,28 @@
 import streamlit as st
 import pandas as pd
+import csv
+import io
 from datetime import datetime
 import uuid
+from contextlib import closing
 
 # Import all components
 from src.config.settings import settings
-from src.database.db_manager import DatabaseManager
+from src.database.db_manager import DatabaseManager, QUIZ_HISTORY_PROJECTION
+from src.database.async_db_manager import AsyncDatabaseManager
 from src.generators.question_generator import QuestionGenerator
-from src.generators.career_advisor import CareerAdvisor
+from src.generators.career_advisor import CareerAdvisor, PLAN_MILESTONES, PLAN_SKILL_GAP
+from src.generators.question_bank import QuestionBank
 from src.analytics.visualizations import Analytics
 from src.utils.helpers import QuizManager
 from src.common.logger import get_logger
+from src.common.model_registry import model_registry
+from src.common.inference_batcher import batcher_metrics
+from src.common.warmup import start_warmup, is_ready
+from src.llm.cache import get_llm_cache
+from src.llm.semantic_cache import get_semantic_cache
+from src.llm.scheduler import get_llm_scheduler
+from src.llm.http_pool import http_pool_metrics
 
 logger = get_logger(__name__)
 
@@ -204,6 +216,17 @@ def get_db_manager():
     """Initialize and cache database manager"""
     return DatabaseManager()
 
+@st.cache_resource
+def get_async_db_manager():
+    """Async client for fetching several collections at once (None if unavailable)"""
+    if not settings.MONGO_ASYNC_ENABLED:
+        return None
+    try:
+        return AsyncDatabaseManager()
+    except Exception as e:
+        logger.warning(f"Async MongoDB unavailable, using sync queries: {e}")
+        return None
+
 # PERFORMANCE: Cache question generator initialization
 @st.cache_resource
 def get_question_generator():
@@ -214,15 +237,29 @@ def get_question_generator():
 @st.cache_resource
 def get_career_advisor():
     """Initialize and cache career advisor with HF models"""
-    return CareerAdvisor()
+    return CareerAdvisor(get_db_manager())
+
+# PERFORMANCE: Cache question bank and start its background refiller once
+@st.cache_resource
+def get_question_bank():
+    """Initialize and cache the pre-generated question bank"""
+    bank = QuestionBank(get_db_manager())
+    bank.start_refiller()
+    return bank
 
 # Initialize managers with caching
 if "setup_complete" not in st.session_state:
     try:
         settings.validate()
+        # Heavy ML imports and model loads are kept off the first paint
+        if settings.STARTUP_MODE == "eager":
+            start_warmup(background=False)
+        elif settings.STARTUP_MODE == "background":
+            start_warmup()
         st.session_state.db_manager = get_db_manager()
         st.session_state.question_generator = get_question_generator()
         st.session_state.career_advisor = get_career_advisor()
+        st.session_state.question_bank = get_question_bank() if settings.QUESTION_BANK_ENABLED else None
         st.session_state.analytics = Analytics(st.session_state.db_manager)
         st.session_state.quiz_manager = QuizManager()
         st.session_state.setup_complete = True
@@ -245,6 +282,11 @@ def load_career_goals(_db_manager, user_id):
     """Cache career goals for 60 seconds"""
     return _db_manager.get_career_goals(user_id)
 
+@st.cache_data(ttl=60)
+def load_career_plans(_db_manager, user_id, kind):
+    """Cache stored milestone plans / skill-gap reports for 60 seconds"""
+    return _db_manager.get_latest_career_plans(user_id, kind)
+
 @st.cache_data(ttl=60)
 def load_personal_goals(_db_manager, user_id):
     """Cache personal goals for 60 seconds"""
@@ -260,15 +302,45 @@ def load_quiz_sessions(_db_manager, user_id):
     """Cache quiz sessions for 60 seconds"""
     return _db_manager.get_quiz_sessions(user_id)
 
+@st.cache_data(ttl=60)
+def load_quiz_history_page(_db_manager, user_id, after):
+    """Cache one keyset page of quiz answers for 60 seconds"""
+    return _db_manager.get_quiz_history_page(user_id, after=after)
+
+@st.cache_data(ttl=60)
+def load_dashboard_summary(_db_manager, user_id):
+    """Cache sidebar counts and averages for 60 seconds"""
+    return _db_manager.get_dashboard_summary(user_id)
+
 @st.cache_data(ttl=300)
 def load_analytics_data(_analytics, user_id):
     """Cache analytics data for 5 minutes"""
-    progress_df = _analytics.get_goal_progress_over_time(user_id)
-    completion_by_category, completion_trend = _analytics.get_task_completion_stats(user_id)
-    performance_by_subject, performance_trend = _analytics.get_quiz_performance_stats(user_id)
+    # These collections are independent, so fetch them concurrently
+    frames = {}
+    async_db = get_async_db_manager()
+    if async_db is not None:
+        try:
+            frames = async_db.fetch_many(
+                timeout=30,
+                career_goals=async_db.get_career_goals(user_id),
+                tasks=async_db.get_daily_tasks(user_id),
+                quiz_sessions=async_db.get_quiz_sessions(user_id)
+            )
+        except Exception as e:
+            logger.warning(f"Concurrent analytics fetch failed, using sync queries: {e}")
+    
+    progress_df = _analytics.get_goal_progress_over_time(user_id, frames.get('career_goals'))
+    completion_by_category, completion_trend = _analytics.get_task_completion_stats(user_id, frames.get('tasks'))
+    performance_by_subject, performance_trend = _analytics.get_quiz_performance_stats(user_id, frames.get('quiz_sessions'))
+    # Quiz history can be large; the breakdown streams it instead
     difficulty_stats = _analytics.get_quiz_difficulty_breakdown(user_id)
     return progress_df, completion_by_category, completion_trend, performance_by_subject, performance_trend, difficulty_stats
 
+def show_warmup_notice():
+    """Tell the user the first AI request may wait on background model loading"""
+    if settings.STARTUP_MODE == "background" and not is_ready():
+        st.caption("⏳ AI models are warming up in the background - the first request may take a little longer.")
+
 # ==================== SIDEBAR ====================
 
 with st.sidebar:
@@ -281,19 +353,18 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("### 🎯 Quick Stats")
     
-    # Load cached data
-    career_goals = load_career_goals(st.session_state.db_manager, USER_ID)
-    personal_goals = load_personal_goals(st.session_state.db_manager, USER_ID)
-    tasks = load_daily_tasks(st.session_state.db_manager, USER_ID)
-    quiz_sessions = load_quiz_sessions(st.session_state.db_manager, USER_ID)
+    # Counts and averages come from one server-side aggregation
+    summary = load_dashboard_summary(st.session_state.db_manager, USER_ID)
     
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Career Goals", len(career_goals))
-        st.metric("Tasks", len(tasks))
+        st.metric("Career Goals", summary['career_goals'])
+        st.metric("Tasks", summary['tasks'])
+        st.metric("Avg Goal Progress", f"{summary['avg_goal_progress']:.0f}%")
     with col2:
-        st.metric("Personal Goals", len(personal_goals))
-        st.metric("Quizzes Taken", len(quiz_sessions))
+        st.metric("Personal Goals", summary['personal_goals'])
+        st.metric("Quizzes Taken", summary['quizzes_taken'])
+        st.metric("Avg Quiz Score", f"{summary['avg_quiz_score']:.0f}%")
     
     st.markdown("---")
     st.markdown("### 🤖 AI Models")
@@ -325,6 +396,7 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 with tab1:
     st.header("📚 AI Study Coach - Quiz Generator")
     st.markdown("Generate personalized quizzes on any topic using AI")
+    show_warmup_notice()
     
     col1, col2 = st.columns([1, 2])
     
@@ -369,23 +441,45 @@ with tab1:
                 if not subject or not topic:
                     st.error("Please enter both subject and topic")
                 else:
-                    with st.spinner("🤖 Generating quiz using AI..."):
-                        success = st.session_state.quiz_manager.generate_questions(
-                            st.session_state.question_generator,
-                            subject,
-                            topic,
-                            question_type,
-                            difficulty,
-                            num_questions
-                        )
-                        
-                        if success:
-                            st.session_state.quiz_generated = True
-                            st.session_state.quiz_submitted = False
-                            st.success("✅ Quiz generated successfully!")
-                            st.rerun()
-                        else:
-                            st.error("❌ Failed to generate quiz")
+                    quiz_manager = st.session_state.quiz_manager
+                    st.session_state.quiz_generated = False
+                    st.session_state.quiz_submitted = False
+                    
+                    # Render each question as soon as it is ready instead of
+                    # waiting for the whole quiz behind a spinner
+                    preview = col2.container(border=True)
+                    preview.subheader("📝 Preparing Your Quiz")
+                    status = preview.empty()
+                    question_slots = [preview.empty() for _ in range(num_questions)]
+                    ready = 0
+                    
+                    status.info(f"🤖 Generating quiz using AI... (0/{num_questions})")
+                    stream = quiz_manager.stream_questions(
+                        st.session_state.question_generator,
+                        subject,
+                        topic,
+                        question_type,
+                        difficulty,
+                        num_questions,
+                        question_bank=st.session_state.question_bank,
+                        user_id=USER_ID
+                    )
+                    # Closing the stream cancels in-flight generation if the
+                    # user navigates away or starts another quiz mid-stream
+                    with closing(stream):
+                        for i, q in stream:
+                            ready += 1
+                            options = "".join(f"\n- {option}" for option in q.get('options', []))
+                            question_slots[i].markdown(f"**Question {i+1}:** {q['question']}{options}")
+                            status.info(f"🤖 Generating quiz using AI... ({ready}/{num_questions})")
+                    
+                    if quiz_manager.generation_complete:
+                        st.session_state.quiz_generated = True
+                        st.success("✅ Quiz generated successfully!")
+                        st.rerun()
+                    else:
+                        status.empty()
+                        st.error("❌ Failed to generate quiz")
     
     with col2:
         if st.session_state.quiz_generated and st.session_state.quiz_manager.questions:
@@ -420,34 +514,18 @@ with tab1:
                 if st.button("📤 Submit Quiz", type="primary", use_container_width=True):
                     st.session_state.quiz_manager.evaluate_quiz()
                     
-                    # Save to database
-                    correct, total, score_pct = st.session_state.quiz_manager.get_score()
-                    
-                    # Save session summary
-                    st.session_state.db_manager.save_quiz_session(
+                    # Save session summary and individual results in one batch
+                    st.session_state.db_manager.save_quiz_attempt(
                         USER_ID,
                         st.session_state.quiz_manager.subject,
-                        total,
-                        correct,
-                        score_pct,
-                        st.session_state.quiz_manager.difficulty
+                        st.session_state.quiz_manager.difficulty,
+                        st.session_state.quiz_manager.results
                     )
                     
-                    # Save individual results
-                    for result in st.session_state.quiz_manager.results:
-                        st.session_state.db_manager.save_quiz_result(
-                            USER_ID,
-                            result['subject'],
-                            result['question_type'],
-                            result['question'],
-                            result['user_answer'],
-                            result['correct_answer'],
-                            result['is_correct'],
-                            result['difficulty']
-                        )
-                    
                     # Clear cache after submission
                     load_quiz_sessions.clear()
+                    load_quiz_history_page.clear()
+                    load_dashboard_summary.clear()
                     
                     st.session_state.quiz_submitted = True
                     st.rerun()
@@ -499,6 +577,7 @@ with tab1:
             # Reset button
             with col2:
                 if st.button("🔄 Take New Quiz"):
+                    st.session_state.quiz_manager.cancel()
                     st.session_state.quiz_generated = False
                     st.session_state.quiz_submitted = False
                     st.session_state.quiz_manager = QuizManager()
@@ -509,51 +588,75 @@ with tab1:
 with tab2:
     st.header("💼 AI Career Coach")
     st.markdown("Get personalized career advice powered by AI")
+    show_warmup_notice()
+    
+    # Chat history - NOT cached (real-time updates needed); only the newest
+    # window is read per rerun, older windows are loaded on request
+    if 'chat_older' not in st.session_state:
+        st.session_state.chat_older = []
+        st.session_state.chat_older_cursor = None
     
-    # Chat history - NOT cached (real-time updates needed)
-    chat_history = st.session_state.db_manager.get_chat_history(USER_ID)
+    chat_window, older_cursor = st.session_state.db_manager.get_chat_window(USER_ID)
+    if st.session_state.chat_older:
+        older_cursor = st.session_state.chat_older_cursor
     
     # Clear chat button
     col1, col2 = st.columns([5, 1])
+    with col1:
+        if older_cursor is not None and st.button("⬆️ Load older messages"):
+            older, st.session_state.chat_older_cursor = st.session_state.db_manager.get_chat_window(
+                USER_ID, before=older_cursor
+            )
+            st.session_state.chat_older = older + st.session_state.chat_older
+            st.rerun()
     with col2:
         if st.button("🗑️ Clear Chat"):
             st.session_state.db_manager.clear_chat_history(USER_ID)
+            st.session_state.chat_older = []
+            st.session_state.chat_older_cursor = None
             st.success("Chat cleared!")
             st.rerun()
     
     # Display chat history
-    if not chat_history.empty:
-        for _, msg in chat_history.iterrows():
-            with st.chat_message(msg['role']):
-                st.markdown(msg['content'])
+    for msg in st.session_state.chat_older + chat_window:
+        with st.chat_message(msg['role']):
+            st.markdown(msg['content'])
     
     # Chat input
     if prompt := st.chat_input("Ask about career growth, skill development, job search..."):
-        # Add user message to database
+        # Add user message to database; the view snaps back to the newest window
         st.session_state.db_manager.add_chat_message(USER_ID, "user", prompt)
+        st.session_state.chat_older = []
+        st.session_state.chat_older_cursor = None
         
         # Display user message
         with st.chat_message("user"):
             st.markdown(prompt)
         
-        # Get context from cached data
-        career_goals_list = load_career_goals(st.session_state.db_manager, USER_ID).to_dict('records')
-        personal_goals_list = load_personal_goals(st.session_state.db_manager, USER_ID).to_dict('records')
-        tasks_list = load_daily_tasks(st.session_state.db_manager, USER_ID).to_dict('records')
+        # Context loaders the advisor starts alongside retrieval and uses only
+        # when retrieval gives no context. They run on worker threads without
+        # a ScriptRunContext, so they call the database directly instead of
+        # the st.cache_data loaders
+        db_manager = st.session_state.db_manager
+        career_goals_list = lambda: db_manager.get_career_goals(USER_ID).to_dict('records')
+        personal_goals_list = lambda: db_manager.get_personal_goals(USER_ID).to_dict('records')
+        tasks_list = lambda: db_manager.get_daily_tasks(USER_ID).to_dict('records')
         
-        # Generate response
+        # Stream the response as it is generated
         with st.chat_message("assistant"):
-            with st.spinner("🤔 Thinking..."):
-                response = st.session_state.career_advisor.generate_career_advice(
+            response = st.write_stream(
+                st.session_state.career_advisor.stream_career_advice(
                     prompt,
                     career_goals_list,
                     personal_goals_list,
-                    tasks_list
+                    tasks_list,
+                    user_id=USER_ID
                 )
-                st.markdown(response)
+            )
         
-        # Save assistant response
+        # Save the fully assembled assistant response
         st.session_state.db_manager.add_chat_message(USER_ID, "assistant", response)
+        st.session_state.career_advisor.update_conversation_memory(USER_ID)
 
 # ==================== TAB 3: GOALS & TASKS ====================
 
@@ -580,13 +683,45 @@ with tab3:
                             USER_ID, goal, deadline, priority, notes
                         )
                         load_career_goals.clear()  # Clear cache
+                        load_dashboard_summary.clear()
                         st.success("Career goal added!")
                         st.rerun()
                     else:
                         st.error("Please enter a goal")
         
+        # Skill-gap report, regenerated only for a new role/skills combination
+        with st.expander("🧭 Skill Gap Analysis", expanded=False):
+            skill_reports = load_career_plans(st.session_state.db_manager, USER_ID, PLAN_SKILL_GAP)
+            latest_report = skill_reports.get(None)
+            last_inputs = latest_report['inputs'] if latest_report else {}
+            
+            with st.form("skill_gap_form"):
+                col1, col2 = st.columns(2)
+                current_role = col1.text_input("Current Role", value=last_inputs.get('current_role', ""))
+                target_role = col2.text_input("Target Role", value=last_inputs.get('target_role', ""))
+                current_skills = st.text_input(
+                    "Current Skills (comma separated)",
+                    value=", ".join(last_inputs.get('current_skills', []))
+                )
+                
+                if st.form_submit_button("Analyze Skill Gap", use_container_width=True):
+                    if current_role and target_role:
+                        with st.spinner("Analyzing skill gap..."):
+                            st.session_state.career_advisor.get_skill_gap_analysis(
+                                USER_ID, current_role, target_role, current_skills
+                            )
+                        load_career_plans.clear()  # Clear cache
+                        st.rerun()
+                    else:
+                        st.error("Please enter your current and target roles")
+            
+            if latest_report:
+                st.caption(f"Generated {latest_report['created']:%Y-%m-%d %H:%M}")
+                st.markdown(latest_report['content'])
+        
         # Display career goals
         career_goals = load_career_goals(st.session_state.db_manager, USER_ID)
+        milestone_plans = load_career_plans(st.session_state.db_manager, USER_ID, PLAN_MILESTONES)
         
         if len(career_goals) == 0:
             st.info("No career goals yet. Add your first goal above!")
@@ -611,12 +746,36 @@ with tab3:
                     if progress != goal['progress']:
                         st.session_state.db_manager.update_career_goal(goal['id'], progress)
                         load_career_goals.clear()  # Clear cache
+                        load_dashboard_summary.clear()
                         st.rerun()
                     
                     if col4.button("🗑️", key=f"del_career_{goal['id']}"):
                         st.session_state.db_manager.delete_career_goal(goal['id'])
                         load_career_goals.clear()  # Clear cache
+                        load_dashboard_summary.clear()
+                        load_career_plans.clear()
                         st.rerun()
+                    
+                    # Stored milestone plan; the LLM only runs when the goal's inputs changed
+                    plan = milestone_plans.get(goal['id'])
+                    plan_inputs = CareerAdvisor.goal_breakdown_inputs(goal['goal'], goal['deadline'], goal['progress'])
+                    plan_current = plan is not None and plan['input_hash'] == CareerAdvisor.plan_input_hash(PLAN_MILESTONES, plan_inputs, goal['id'])
+                    
+                    with st.expander("🗺️ Milestone Plan", expanded=False):
+                        if plan:
+                            if not plan_current:
+                                st.caption("This goal changed since the plan was generated.")
+                            st.markdown(plan['content'])
+                        
+                        if not plan_current and st.button(
+                            "🔄 Refresh Plan" if plan else "✨ Generate Plan", key=f"plan_{goal['id']}"
+                        ):
+                            with st.spinner("Planning milestones..."):
+                                st.session_state.career_advisor.get_goal_breakdown(
+                                    USER_ID, goal['goal'], goal['deadline'], goal['progress'], goal_id=goal['id']
+                                )
+                            load_career_plans.clear()  # Clear cache
+                            st.rerun()
     
     # Personal Goals
     with subtab2:
@@ -636,6 +795,7 @@ with tab3:
                             USER_ID, goal, category, notes
                         )
                         load_personal_goals.clear()  # Clear cache
+                        load_dashboard_summary.clear()
                         st.success("Personal goal added!")
                         st.rerun()
                     else:
@@ -659,6 +819,7 @@ with tab3:
                 if completed != bool(goal['completed']):
                     st.session_state.db_manager.update_personal_goal(goal['id'], completed)
                     load_personal_goals.clear()  # Clear cache
+                    load_dashboard_summary.clear()
                     st.rerun()
                 
                 col2.write(f"**{goal['goal']}**")
@@ -667,6 +828,7 @@ with tab3:
                 if col4.button("🗑️", key=f"del_personal_{goal['id']}"):
                     st.session_state.db_manager.delete_personal_goal(goal['id'])
                     load_personal_goals.clear()  # Clear cache
+                    load_dashboard_summary.clear()
                     st.rerun()
     
     # Daily Tasks
@@ -686,6 +848,7 @@ with tab3:
                             USER_ID, task, category, priority
                         )
                         load_daily_tasks.clear()  # Clear cache
+                        load_dashboard_summary.clear()
                         st.success("Task added!")
                         st.rerun()
                     else:
@@ -709,6 +872,7 @@ with tab3:
                 if completed != bool(task['completed']):
                     st.session_state.db_manager.update_daily_task(task['id'], completed)
                     load_daily_tasks.clear()  # Clear cache
+                    load_dashboard_summary.clear()
                     st.rerun()
                 
                 col2.write(task['task'])
@@ -717,6 +881,7 @@ with tab3:
                 if col4.button("🗑️", key=f"del_task_{task['id']}"):
                     st.session_state.db_manager.delete_daily_task(task['id'])
                     load_daily_tasks.clear()  # Clear cache
+                    load_dashboard_summary.clear()
                     st.rerun()
 
 # ==================== TAB 4: ANALYTICS ====================
@@ -781,6 +946,34 @@ with tab4:
                 st.plotly_chart(difficulty_chart, use_container_width=True)
     else:
         st.info("Take quizzes to see performance analytics")
+    
+    # Answer history, one keyset page at a time
+    if 'quiz_history_cursors' not in st.session_state:
+        st.session_state.quiz_history_cursors = [None]
+    
+    with st.expander("🗂️ Quiz Answer History"):
+        cursors = st.session_state.quiz_history_cursors
+        history_page, next_cursor = load_quiz_history_page(
+            st.session_state.db_manager, USER_ID, cursors[-1]
+        )
+        
+        if len(history_page) == 0:
+            st.info("No quiz answers yet")
+        else:
+            st.dataframe(
+                history_page[['taken_at', 'subject', 'difficulty', 'question', 'user_answer', 'correct_answer', 'is_correct']],
+                use_container_width=True,
+                hide_index=True
+            )
+            
+            col1, col2, col3 = st.columns([1, 2, 1])
+            if col1.button("◀ Newer", disabled=len(cursors) == 1, key="quiz_history_newer"):
+                cursors.pop()
+                st.rerun()
+            col2.caption(f"Page {len(cursors)}")
+            if col3.button("Older ▶", disabled=next_cursor is None, key="quiz_history_older"):
+                cursors.append(next_cursor)
+                st.rerun()
 
 # ==================== TAB 5: SETTINGS ====================
 
@@ -794,8 +987,88 @@ with tab5:
     - **Temperature**: {settings.GROQ_TEMPERATURE}
     - **HuggingFace Embeddings**: {settings.HF_EMBEDDING_MODEL}
     - **HuggingFace Sentiment**: {settings.HF_SENTIMENT_MODEL}
+    - **HF Inference Mode**: {settings.HF_INFERENCE_MODE}
     """)
     
+    # Shared model memory footprint
+    model_report = model_registry.memory_report()
+    if model_report:
+        model_df = pd.DataFrame(model_report)
+        model_df["parameter_mb"] = (model_df["parameter_bytes"].fillna(0) / (1024 * 1024)).round(1)
+        model_df["rss_delta_mb"] = (model_df["rss_delta_bytes"].fillna(0) / (1024 * 1024)).round(1)
+        st.dataframe(
+            model_df[["model", "task", "mode", "refcount", "load_seconds", "parameter_mb", "rss_delta_mb"]],
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    # Pre-LLM chat turn stage timings
+    stage_metrics = st.session_state.career_advisor.pipeline_metrics()
+    if stage_metrics:
+        st.dataframe(pd.DataFrame(stage_metrics).round(1), use_container_width=True, hide_index=True)
+    
+    # Share of chat messages that needed the transformer sentiment model
+    sentiment_tiers = st.session_state.career_advisor.sentiment_tiers
+    if sentiment_tiers is not None:
+        sentiment_stats = sentiment_tiers.stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Sentiment Escalation Rate", f"{sentiment_stats['escalation_rate'] * 100:.1f}%")
+        col2.metric("Lexicon Decisions", sentiment_stats['fast_path'])
+        col3.metric("Transformer Calls", sentiment_stats['escalations'])
+        col4.metric("Memo Hits", sentiment_stats['memo_hits'])
+    
+    # Micro-batching effectiveness for the HuggingFace models
+    inference_metrics = batcher_metrics()
+    if inference_metrics:
+        inference_df = pd.DataFrame(inference_metrics).round(1)
+        st.dataframe(
+            inference_df[["name", "requests", "batches", "avg_batch_size", "max_batch_size",
+                          "avg_wait_ms", "p95_wait_ms", "avg_run_ms", "errors"]],
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    # LLM response cache effectiveness
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        cache_stats = llm_cache.stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("LLM Cache Hit Rate", f"{cache_stats['hit_rate'] * 100:.1f}%")
+        col2.metric("Memory Hits", cache_stats['memory_hits'])
+        col3.metric("Disk Hits", cache_stats['disk_hits'])
+        col4.metric("Misses", cache_stats['misses'])
+    
+    # Semantic cache effectiveness for career questions
+    semantic_cache = get_semantic_cache()
+    if semantic_cache is not None:
+        semantic_stats = semantic_cache.stats()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Semantic Cache Hit Rate", f"{semantic_stats['hit_rate'] * 100:.1f}%")
+        col2.metric("Semantic Hits", semantic_stats['hits'])
+        col3.metric("Cached Answers", semantic_stats['entries'])
+        col4.metric("Evictions", semantic_stats['evictions'])
+    
+    # Shared LLM HTTP connection pool
+    pool_metrics = http_pool_metrics()
+    if pool_metrics is not None:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("HTTP Pool Utilization", f"{pool_metrics['utilization'] * 100:.0f}%")
+        col2.metric("Open Connections", f"{pool_metrics['open_connections']}/{pool_metrics['max_connections']}")
+        col3.metric("Idle Connections", pool_metrics['idle_connections'])
+        col4.metric("LLM HTTP Requests", pool_metrics['requests'])
+    
+    # Shared LLM scheduler load
+    scheduler_metrics = get_llm_scheduler().metrics()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("LLM Queue Depth", scheduler_metrics['queue_depth'])
+    col2.metric("LLM Requests", scheduler_metrics['requests'])
+    col3.metric("Retries", scheduler_metrics['retries'])
+    col4.metric("Rate Limited", scheduler_metrics['rate_limited'])
+    st.dataframe(
+        pd.DataFrame(scheduler_metrics['wait_ms']).T.round(1),
+        use_container_width=True
+    )
+    
     st.markdown("---")
     
     st.subheader("💾 Data Export")
@@ -830,12 +1103,24 @@ with tab5:
             )
     
     if col3.button("📥 Export Quiz Results"):
-        quiz_history = st.session_state.db_manager.get_quiz_history(USER_ID)
+        # Rows are written straight from the cursor; only the finished file
+        # is held in memory, never the full history as documents
+        csv_buffer = io.StringIO()
+        writer = csv.DictWriter(csv_buffer, fieldnames=list(QUIZ_HISTORY_PROJECTION), extrasaction="ignore")
+        writer.writeheader()
+        rows = 0
+        try:
+            for result in st.session_state.db_manager.iter_quiz_history(USER_ID):
+                writer.writerow(result)
+                rows += 1
+        except Exception as e:
+            rows = 0
+            st.error(f"Could not export quiz history: {e}")
         
-        if len(quiz_history) > 0:
+        if rows:
             st.download_button(
                 label="Download Quiz History CSV",
-                data=quiz_history.to_csv(index=False).encode('utf-8'),
+                data=csv_buffer.getvalue().encode('utf-8'),
                 file_name=f"quiz_history_{datetime.now().strftime('%Y%m%d')}.csv",
                 mime="text/csv"
             )
@@ -0,0 +1,12 @@
+"""
+Helpers shared by the benchmark scripts
+"""
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of floats"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
@@ -0,0 +1,156 @@
+"""
+Compare HF inference modes (fp32 / int8 / onnx) on CPU
+
+Loads HF_SENTIMENT_MODEL and HF_EMBEDDING_MODEL in every requested mode,
+checks accuracy parity against the fp32 reference (sentiment label
+agreement, embedding cosine similarity) and reports load time, resident
+memory growth, single-request latency and batched throughput. Rows show
+the mode each model actually loaded in; a mode that fell back to fp32 is
+marked and makes the run exit 1.
+
+Usage:
+    python scripts/benchmark_inference.py
+    python scripts/benchmark_inference.py --modes fp32 int8 --repeats 50 --batch-size 32
+    python scripts/benchmark_inference.py --min-agreement 0.95 --min-cosine 0.98   # exit 1 on a parity regression
+"""
+
+import argparse
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+SAMPLE_TEXTS = [
+    "I finally landed the internship I was hoping for!",
+    "I'm completely burned out and don't know what to do next.",
+    "Can you help me plan my week?",
+    "My manager keeps ignoring my ideas and it's frustrating.",
+    "I passed the AWS certification exam today.",
+    "Not sure whether to study data science or web development.",
+    "I keep procrastinating on my portfolio and feel terrible about it.",
+    "The interview went okay, I think.",
+    "I love learning new programming languages.",
+    "I got rejected from three jobs this week.",
+    "What skills should a junior backend engineer focus on?",
+    "Honestly I'm excited but also nervous about switching careers.",
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", default=["fp32", "int8", "onnx"])
+    parser.add_argument("--repeats", type=int, default=30, help="Single-text calls timed per model")
+    parser.add_argument("--batch-size", type=int, default=16, help="Texts per batched call")
+    parser.add_argument("--min-agreement", type=float, default=None, help="Fail below this sentiment label agreement")
+    parser.add_argument("--min-cosine", type=float, default=None, help="Fail below this minimum embedding cosine")
+    return parser.parse_args()
+
+
+def timed_load(loader, model_name, mode):
+    """Load a model and return (model, seconds, rss growth in MB)"""
+    from src.common.model_registry import _current_rss_bytes
+
+    rss_before = _current_rss_bytes()
+    start = time.perf_counter()
+    model = loader(model_name, mode)
+    seconds = time.perf_counter() - start
+    rss_after = _current_rss_bytes()
+    rss_mb = (rss_after - rss_before) / (1024 * 1024) if rss_before and rss_after else float("nan")
+    return model, seconds, rss_mb
+
+
+def effective_mode(model, requested):
+    """(mode the model actually runs in, note for the parity column)
+
+    int8 and onnx fall back to fp32 when they cannot be loaded; such a row
+    reports fp32 numbers, so it is labelled as such and fails the run.
+    """
+    from src.common.model_registry import INFERENCE_MODE_ATTR
+
+    actual = getattr(model, INFERENCE_MODE_ATTR, requested)
+    if actual != requested:
+        return actual, f"FELL BACK from {requested}"
+    return actual, None
+
+
+def measure(run, repeats, batch_size):
+    """(p50 single-text latency in ms, batched throughput in texts/s)"""
+    run(SAMPLE_TEXTS[:2])  # warm up
+
+    latencies = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        run([SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    batch = (SAMPLE_TEXTS * (batch_size // len(SAMPLE_TEXTS) + 1))[:batch_size]
+    start = time.perf_counter()
+    for _ in range(max(1, repeats // 5)):
+        run(batch)
+    throughput = batch_size * max(1, repeats // 5) / (time.perf_counter() - start)
+    return latencies[len(latencies) // 2], throughput
+
+
+def main():
+    args = parse_args()
+
+    import numpy as np
+    from src.config.settings import settings
+    from src.common.model_registry import load_embedding_model, load_sentiment_pipeline
+
+    modes = ["fp32"] + [mode for mode in args.modes if mode != "fp32"]
+    reference = {}
+    failed = False
+    fell_back = False
+
+    print(f"{'model':<10} {'mode':<5} {'load s':>7} {'rss MB':>8} {'p50 ms':>8} {'texts/s':>9}  parity")
+    for mode in modes:
+        classifier, load_s, rss_mb = timed_load(load_sentiment_pipeline, settings.HF_SENTIMENT_MODEL, mode)
+        actual, fallback = effective_mode(classifier, mode)
+        run = lambda texts, classifier=classifier: classifier(texts, batch_size=len(texts), truncation=True)
+        p50, throughput = measure(run, args.repeats, args.batch_size)
+        labels = [result["label"].lower() for result in run(SAMPLE_TEXTS)]
+        if mode == "fp32":
+            reference["labels"] = labels
+            parity = "reference"
+        elif fallback:
+            parity = fallback
+            fell_back = True
+        else:
+            agreement = sum(a == b for a, b in zip(labels, reference["labels"])) / len(labels)
+            parity = f"label agreement {agreement:.1%}"
+            failed |= args.min_agreement is not None and agreement < args.min_agreement
+        print(f"{'sentiment':<10} {actual:<5} {load_s:7.2f} {rss_mb:8.1f} {p50:8.1f} {throughput:9.1f}  {parity}")
+        del classifier, run
+
+        encoder, load_s, rss_mb = timed_load(load_embedding_model, settings.HF_EMBEDDING_MODEL, mode)
+        actual, fallback = effective_mode(encoder, mode)
+        run = lambda texts, encoder=encoder: encoder.encode(texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True)
+        p50, throughput = measure(run, args.repeats, args.batch_size)
+        embeddings = np.asarray(run(SAMPLE_TEXTS), dtype=np.float32)
+        if mode == "fp32":
+            reference["embeddings"] = embeddings
+            parity = "reference"
+        elif fallback:
+            parity = fallback
+            fell_back = True
+        else:
+            cosines = np.sum(embeddings * reference["embeddings"], axis=1)
+            parity = f"cosine mean {cosines.mean():.4f} min {cosines.min():.4f}"
+            failed |= args.min_cosine is not None and float(cosines.min()) < args.min_cosine
+        print(f"{'embedding':<10} {actual:<5} {load_s:7.2f} {rss_mb:8.1f} {p50:8.1f} {throughput:9.1f}  {parity}")
+        del encoder, run
+
+    if fell_back:
+        print("Inference mode FAILED: a requested mode fell back to fp32 (see the log for why)")
+    if failed:
+        print("Parity check FAILED")
+    if failed or fell_back:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
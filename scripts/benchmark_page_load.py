@@ -0,0 +1,109 @@
+"""
+Benchmark serial vs concurrent page loads against MongoDB
+
+Seeds a throwaway user with goals, tasks and quiz history, then times the
+four reads the Analytics page needs: one after another through the sync
+DatabaseManager, and all at once through AsyncDatabaseManager.fetch_many.
+The seeded documents are deleted afterwards.
+
+Usage:
+    python scripts/benchmark_page_load.py                      # local mongod
+    python scripts/benchmark_page_load.py --uri "$MONGO_URI" --runs 50 --rows 500
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from bench_utils import percentile
+
+COLLECTIONS = ["career_goals", "daily_tasks", "quiz_sessions", "quiz_results"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uri", default="mongodb://localhost:27017/", help="MongoDB URI (default: local mongod)")
+    parser.add_argument("--runs", type=int, default=30, help="Page loads per mode")
+    parser.add_argument("--rows", type=int, default=200, help="Documents seeded per collection")
+    return parser.parse_args()
+
+
+def seed(db, user_id, rows):
+    now = datetime.now()
+    db.db.career_goals.insert_many([
+        {"user_id": user_id, "goal": f"Goal {i}", "deadline": "2030-01-01", "priority": "High",
+         "progress": i % 100, "created": now, "notes": None}
+        for i in range(rows)
+    ])
+    db.db.daily_tasks.insert_many([
+        {"user_id": user_id, "task": f"Task {i}", "category": "Learning", "priority": "Medium",
+         "completed": i % 2 == 0, "added": now, "completed_at": None}
+        for i in range(rows)
+    ])
+    results = [
+        {"subject": "Python", "question_type": "Multiple Choice", "question": f"Question {i}",
+         "user_answer": "a", "correct_answer": "a", "is_correct": i % 3 != 0, "difficulty": "Medium"}
+        for i in range(rows)
+    ]
+    for start in range(0, rows, 20):
+        db.save_quiz_attempt(user_id, "Python", "Medium", results[start:start + 20])
+
+
+def report(name, timings):
+    print(
+        f"{name:<11} p50 {percentile(timings, 50):8.1f} ms   "
+        f"p95 {percentile(timings, 95):8.1f} ms   "
+        f"mean {sum(timings) / len(timings):8.1f} ms"
+    )
+
+
+def main():
+    args = parse_args()
+    os.environ["MONGO_URI"] = args.uri
+
+    from src.database.db_manager import DatabaseManager
+    from src.database.async_db_manager import AsyncDatabaseManager
+
+    db = DatabaseManager()
+    async_db = AsyncDatabaseManager()
+    user_id = f"benchmark-{uuid.uuid4().hex[:8]}"
+    seed(db, user_id, args.rows)
+
+    serial, concurrent = [], []
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            db.get_career_goals(user_id)
+            db.get_daily_tasks(user_id)
+            db.get_quiz_sessions(user_id)
+            db.get_quiz_history(user_id)
+            serial.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            async_db.fetch_many(
+                career_goals=async_db.get_career_goals(user_id),
+                tasks=async_db.get_daily_tasks(user_id),
+                quiz_sessions=async_db.get_quiz_sessions(user_id),
+                quiz_results=async_db.get_quiz_history(user_id)
+            )
+            concurrent.append((time.perf_counter() - start) * 1000)
+    finally:
+        for name in COLLECTIONS:
+            db.db[name].delete_many({"user_id": user_id})
+        async_db.close()
+        db.close()
+
+    print(f"{args.runs} page loads, {args.rows} documents per collection")
+    report("serial", serial)
+    report("concurrent", concurrent)
+    print(f"Speedup (p50): {percentile(serial, 50) / percentile(concurrent, 50):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark the quiz and career-chat pipelines against an offline LLM backend
+
+Drives full QuizManager and CareerAdvisor flows through the synthetic or
+replay backend, so parsing, retries, similarity checks and (optionally)
+MongoDB writes can be measured without Groq network latency or quota.
+
+Usage:
+    python scripts/benchmark_pipeline.py --backend synthetic --quizzes 20 --chats 50
+    python scripts/benchmark_pipeline.py --backend replay --fixtures data/llm_fixtures.jsonl
+    python scripts/benchmark_pipeline.py --latency-ms 0 --failure-rate 0.1 --concurrency 8 --with-db
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from bench_utils import percentile
+
+CHAT_QUERIES = [
+    "How do I become a data scientist?",
+    "What should I learn next to get promoted?",
+    "I'm feeling stuck with my job search, any advice?",
+    "How can I balance learning with a full-time job?",
+]
+
+SAMPLE_CAREER_GOALS = [{"goal": "Become a senior ML engineer", "progress": 40}]
+SAMPLE_PERSONAL_GOALS = [{"goal": "Exercise three times a week", "category": "Health"}]
+SAMPLE_TASKS = [{"task": "Finish PyTorch course module", "category": "Learning"}]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["synthetic", "replay"], default="synthetic")
+    parser.add_argument("--fixtures", help="Fixture file for the replay backend")
+    parser.add_argument("--latency-ms", type=float, default=None, help="Synthetic median latency")
+    parser.add_argument("--latency-sigma", type=float, default=None, help="Synthetic log-normal sigma")
+    parser.add_argument("--failure-rate", type=float, default=None, help="Synthetic failure probability")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quizzes", type=int, default=10, help="Number of quiz flows")
+    parser.add_argument("--questions", type=int, default=5, help="Questions per quiz")
+    parser.add_argument("--question-type", choices=["Multiple Choice", "Fill in the Blank"], default="Multiple Choice")
+    parser.add_argument("--chats", type=int, default=20, help="Number of chat turns")
+    parser.add_argument("--concurrency", type=int, default=4, help="Flows run in parallel")
+    parser.add_argument("--with-db", action="store_true", help="Persist quiz results to MONGO_URI")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Settings are read at import time, so the backend must be chosen first"""
+    os.environ["LLM_BACKEND"] = args.backend
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["QUESTION_BANK_ENABLED"] = "false"
+    os.environ["LLM_SYNTHETIC_SEED"] = str(args.seed)
+    # Measure the pipeline itself, not the Groq rate budget
+    os.environ["LLM_RPM_LIMIT"] = "0"
+    os.environ["LLM_TPM_LIMIT"] = "0"
+    if args.fixtures:
+        os.environ["LLM_FIXTURE_PATH"] = args.fixtures
+    if args.latency_ms is not None:
+        os.environ["LLM_SYNTHETIC_LATENCY_MS"] = str(args.latency_ms)
+    if args.latency_sigma is not None:
+        os.environ["LLM_SYNTHETIC_LATENCY_SIGMA"] = str(args.latency_sigma)
+    if args.failure_rate is not None:
+        os.environ["LLM_SYNTHETIC_FAILURE_RATE"] = str(args.failure_rate)
+
+
+def run_flows(name, flow, count, concurrency):
+    """Run `count` flows on a thread pool and return (latencies, failures, wall seconds)"""
+    latencies, failures = [], 0
+
+    def timed(i):
+        start = time.perf_counter()
+        ok = flow(i)
+        return ok, time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix=f"bench-{name}") as executor:
+        for ok, elapsed in executor.map(timed, range(count)):
+            latencies.append(elapsed)
+            failures += 0 if ok else 1
+    return latencies, failures, time.perf_counter() - wall_start
+
+
+def report(name, latencies, failures, wall_seconds):
+    """Print throughput and latency percentiles for one flow type"""
+    if not latencies:
+        return
+    ms = [value * 1000 for value in latencies]
+    print(
+        f"{name:<6} n={len(ms):<4} failures={failures:<3} "
+        f"throughput={len(ms) / wall_seconds:7.2f}/s  "
+        f"p50={percentile(ms, 50):8.1f}ms  p90={percentile(ms, 90):8.1f}ms  "
+        f"p99={percentile(ms, 99):8.1f}ms  max={max(ms):8.1f}ms"
+    )
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    from src.generators.question_generator import QuestionGenerator
+    from src.generators.career_advisor import CareerAdvisor
+    from src.utils.helpers import QuizManager
+
+    generator = QuestionGenerator()
+    advisor = CareerAdvisor()
+    db_manager = None
+    if args.with_db:
+        from src.database.db_manager import DatabaseManager
+        db_manager = DatabaseManager()
+
+    def quiz_flow(i):
+        manager = QuizManager()
+        ok = manager.generate_questions(generator, "Benchmark", f"Topic {i % 5}", args.question_type, "Medium", args.questions)
+        if ok and db_manager is not None:
+            manager.collect_answer(0, "")
+            manager.evaluate_quiz()
+            # Same batched session + results write the app uses on submit
+            db_manager.save_quiz_attempt("bench_user", "Benchmark", "Medium", manager.results)
+        return ok
+
+    def chat_flow(i):
+        try:
+            advisor.generate_career_advice(
+                CHAT_QUERIES[i % len(CHAT_QUERIES)],
+                SAMPLE_CAREER_GOALS, SAMPLE_PERSONAL_GOALS, SAMPLE_TASKS,
+                use_cache=False
+            )
+            return True
+        except Exception:
+            return False
+
+    print(f"Backend: {args.backend}  concurrency: {args.concurrency}")
+    if args.quizzes:
+        report("quiz", *run_flows("quiz", quiz_flow, args.quizzes, args.concurrency))
+    if args.chats:
+        report("chat", *run_flows("chat", chat_flow, args.chats, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
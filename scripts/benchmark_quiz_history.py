@@ -0,0 +1,84 @@
+"""
+Benchmark quiz-history reads: full load vs keyset page vs streaming
+
+Seeds a throwaway user with --rows quiz results, then reports
+time-to-first-row, total time and peak Python memory (tracemalloc) for
+get_quiz_history (everything into a DataFrame), get_quiz_history_page
+(one keyset page) and iter_quiz_history (batched cursor). The seeded
+documents are deleted afterwards.
+
+Usage:
+    python scripts/benchmark_quiz_history.py --rows 20000
+    python scripts/benchmark_quiz_history.py --rows 50000 --batch-size 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import uuid
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Quiz results seeded for the user")
+    parser.add_argument("--batch-size", type=int, default=None, help="Override QUIZ_HISTORY_BATCH_SIZE")
+    return parser.parse_args()
+
+
+def seed(db, user_id, rows):
+    results = [
+        {"subject": "Python", "question_type": "Multiple Choice",
+         "question": f"Benchmark question {i}: " + "x" * 200,
+         "user_answer": "a", "correct_answer": "a", "is_correct": i % 3 != 0,
+         "difficulty": ["Easy", "Medium", "Hard"][i % 3]}
+        for i in range(rows)
+    ]
+    for start in range(0, rows, 1000):
+        db.save_quiz_attempt(user_id, "Python", "Medium", results[start:start + 1000])
+
+
+def measure(name, first_row_fn):
+    """first_row_fn() returns an iterator; time its first row and full drain"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = first_row_fn()
+    count = 0
+    first_ms = None
+    for _ in rows:
+        if first_ms is None:
+            first_ms = (time.perf_counter() - start) * 1000
+        count += 1
+    total_ms = (time.perf_counter() - start) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<10} rows {count:7d}   first row {first_ms or 0:8.1f} ms   "
+        f"total {total_ms:8.1f} ms   peak {peak / 1024 / 1024:7.1f} MB"
+    )
+
+
+def main():
+    args = parse_args()
+
+    from src.database.db_manager import DatabaseManager
+
+    db = DatabaseManager()
+    user_id = f"benchmark-{uuid.uuid4().hex[:8]}"
+    seed(db, user_id, args.rows)
+
+    try:
+        measure("full", lambda: db.get_quiz_history(user_id).itertuples())
+        measure("page", lambda: db.get_quiz_history_page(user_id)[0].itertuples())
+        measure("stream", lambda: db.iter_quiz_history(user_id, batch_size=args.batch_size))
+    finally:
+        db.db.quiz_results.delete_many({"user_id": user_id})
+        db.db.quiz_sessions.delete_many({"user_id": user_id})
+
+
+if __name__ == "__main__":
+    main()
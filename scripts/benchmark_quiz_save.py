@@ -0,0 +1,97 @@
+"""
+Benchmark saving a submitted quiz: per-row inserts vs save_quiz_attempt
+
+The per-row path is what the app used to do - save_quiz_session followed
+by one save_quiz_result per question. The batched path writes the session
+and every result with save_quiz_attempt. Both run against MONGO_URI under
+a throwaway user id whose documents are deleted afterwards.
+
+Usage:
+    python scripts/benchmark_quiz_save.py
+    python scripts/benchmark_quiz_save.py --questions 20 --runs 30 --transaction
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from bench_utils import percentile
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=20, help="Questions per quiz")
+    parser.add_argument("--runs", type=int, default=20, help="Quizzes saved per path")
+    parser.add_argument("--transaction", action="store_true", help="Use a transaction for the batched path")
+    return parser.parse_args()
+
+
+def sample_results(count):
+    return [
+        {
+            "subject": "Python",
+            "question_type": "Multiple Choice",
+            "question": f"Benchmark question {i}: what does len([]) return?",
+            "user_answer": "0",
+            "correct_answer": "0",
+            "is_correct": i % 3 != 0,
+            "difficulty": "Medium"
+        }
+        for i in range(count)
+    ]
+
+
+def save_per_row(db, user_id, results):
+    correct = sum(1 for r in results if r["is_correct"])
+    db.save_quiz_session(user_id, "Python", len(results), correct, correct / len(results) * 100, "Medium")
+    for r in results:
+        db.save_quiz_result(
+            user_id, r["subject"], r["question_type"], r["question"],
+            r["user_answer"], r["correct_answer"], r["is_correct"], r["difficulty"]
+        )
+
+
+def report(name, timings):
+    print(
+        f"{name:<14} p50 {percentile(timings, 50):8.1f} ms   "
+        f"p95 {percentile(timings, 95):8.1f} ms   "
+        f"mean {sum(timings) / len(timings):8.1f} ms"
+    )
+
+
+def main():
+    args = parse_args()
+
+    from src.database.db_manager import DatabaseManager
+
+    db = DatabaseManager()
+    user_id = f"benchmark-{uuid.uuid4().hex[:8]}"
+    results = sample_results(args.questions)
+
+    per_row, batched = [], []
+    try:
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            save_per_row(db, user_id, results)
+            per_row.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            db.save_quiz_attempt(user_id, "Python", "Medium", results, use_transaction=args.transaction)
+            batched.append((time.perf_counter() - start) * 1000)
+    finally:
+        db.db.quiz_results.delete_many({"user_id": user_id})
+        db.db.quiz_sessions.delete_many({"user_id": user_id})
+
+    print(f"{args.runs} quizzes x {args.questions} questions")
+    report("per-row", per_row)
+    report("save_attempt", batched)
+    print(f"Speedup (p50): {percentile(per_row, 50) / percentile(batched, 50):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
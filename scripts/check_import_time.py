@@ -0,0 +1,117 @@
+"""
+Cold-start import budget check
+
+Imports every src.* module app.py pulls in at startup (read from its
+module-level imports, so new modules are covered automatically) under
+`python -X importtime` and fails when the heavy ML stack sneaks back into the import path or the
+total import time exceeds the budget.
+
+Usage:
+    python scripts/check_import_time.py [--budget-ms 2500]
+"""
+
+import argparse
+import ast
+import os
+import subprocess
+import sys
+
+# Entry point whose module-level src.* imports make up the startup path
+APP_MODULE = "app.py"
+# Packages that must only load lazily or in the warm-up thread
+FORBIDDEN_MODULES = ["torch", "transformers", "sentence_transformers"]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def startup_modules(path):
+    """src.* modules imported at module level of the entry point
+
+    Imports inside functions are deliberately lazy and are skipped; the
+    modules' own imports are covered because the check imports them for real.
+    """
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    modules = []
+
+    def visit(node):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                continue
+            if isinstance(child, ast.Import):
+                names = [alias.name for alias in child.names]
+            elif isinstance(child, ast.ImportFrom) and child.level == 0 and child.module:
+                names = [child.module]
+            else:
+                names = []
+            modules.extend(name for name in names if name.split(".")[0] == "src" and name not in modules)
+            visit(child)
+
+    visit(tree)
+    return modules
+
+
+def measure_imports(modules):
+    """Run the imports in a fresh interpreter and parse -X importtime output"""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{proc.stderr[-2000:]}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=2500.0, help="Maximum total import time in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level imports to print")
+    args = parser.parse_args()
+
+    modules = startup_modules(os.path.join(PROJECT_ROOT, APP_MODULE))
+    if not modules:
+        print(f"FAIL: no src.* imports found in {APP_MODULE}")
+        return 1
+    timings = measure_imports(modules)
+
+    total_ms = sum(self_us for self_us, _ in timings.values()) / 1000
+    leaked = sorted(name for name in timings if name.split(".")[0] in FORBIDDEN_MODULES)
+
+    top_level = sorted(
+        ((name, cumulative) for name, (_, cumulative) in timings.items() if "." not in name),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    print(f"Imported {len(modules)} startup modules from {APP_MODULE}")
+    print(f"Total import time: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print("Slowest top-level imports:")
+    for name, cumulative in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if leaked:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(leaked[:5])}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Evaluate the tiered sentiment classifier against the full transformer model
+
+Runs every labeled message through the TextBlob-first tiered classifier
+and through the HF_SENTIMENT_MODEL pipeline alone, then reports the
+escalation rate, accuracy of both against the labels, their agreement,
+and how accurate the lexicon tier is on the messages it decided alone.
+
+Usage:
+    python scripts/evaluate_sentiment.py
+    python scripts/evaluate_sentiment.py --data labeled.jsonl --threshold 0.3
+    # labeled.jsonl: one {"text": ..., "label": "positive|negative|neutral"} per line
+"""
+
+import argparse
+import json
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+LABELED_SAMPLE = [
+    ("I got the job offer, I'm so happy!", "positive"),
+    ("This is the best week of my career so far.", "positive"),
+    ("I finally finished my portfolio and it looks great.", "positive"),
+    ("Excited to start my new machine learning course tomorrow!", "positive"),
+    ("My mentor gave me really helpful feedback today.", "positive"),
+    ("I passed my certification exam.", "positive"),
+    ("Thanks, that plan actually makes a lot of sense.", "positive"),
+    ("I feel confident about the interview on Friday.", "positive"),
+    ("I was rejected again and I feel terrible.", "negative"),
+    ("I'm exhausted and burned out from this job.", "negative"),
+    ("My manager is awful and I hate going to work.", "negative"),
+    ("I keep failing my coding interviews.", "negative"),
+    ("Honestly I feel stuck and hopeless about my career.", "negative"),
+    ("I'm worried I'll never get promoted.", "negative"),
+    ("The layoffs were announced and I'm scared.", "negative"),
+    ("I procrastinated all week and got nothing done.", "negative"),
+    ("What skills should I learn for data engineering?", "neutral"),
+    ("Can you help me plan my week?", "neutral"),
+    ("How long does it take to learn SQL?", "neutral"),
+    ("I work as a backend developer at a fintech company.", "neutral"),
+    ("Should I do a master's degree or a bootcamp?", "neutral"),
+    ("My interview is scheduled for next Tuesday.", "neutral"),
+    ("Which certifications matter for cloud roles?", "neutral"),
+    ("I have three years of experience in marketing.", "neutral"),
+    ("The interview went okay I guess, not sure how I did.", "neutral"),
+    ("It's fine, just another regular day at the office.", "neutral"),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="JSONL file of labeled messages (defaults to the built-in sample)")
+    parser.add_argument("--threshold", type=float, default=None, help="Override SENTIMENT_FAST_THRESHOLD")
+    return parser.parse_args()
+
+
+def load_samples(path):
+    if not path:
+        return LABELED_SAMPLE
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                samples.append((record["text"], record["label"].lower()))
+    return samples
+
+
+def main():
+    args = parse_args()
+
+    from src.config.settings import settings
+    from src.common.tiered_sentiment import TieredSentimentAnalyzer
+    from src.common.model_registry import load_sentiment_pipeline
+
+    samples = load_samples(args.data)
+    classifier = load_sentiment_pipeline(settings.HF_SENTIMENT_MODEL)
+    full_model = lambda text: classifier(text[:512], truncation=True)[0]
+
+    threshold = settings.SENTIMENT_FAST_THRESHOLD if args.threshold is None else args.threshold
+    tiered = TieredSentimentAnalyzer(full_model, threshold=threshold, memo_size=0)
+
+    full_correct = tiered_correct = agree = 0
+    lexicon_total = lexicon_correct = 0
+    for text, label in samples:
+        full_label = full_model(text)["label"].lower()
+        result = tiered.analyze(text)
+        tiered_label = result["label"].lower()
+
+        full_correct += full_label == label
+        tiered_correct += tiered_label == label
+        agree += tiered_label == full_label
+        if result["tier"] == "lexicon":
+            lexicon_total += 1
+            lexicon_correct += tiered_label == label
+
+    n = len(samples)
+    stats = tiered.stats()
+    print(f"Samples:               {n}")
+    print(f"Threshold:             {threshold}")
+    print(f"Escalation rate:       {stats['escalation_rate']:.1%} ({stats['escalations']}/{n})")
+    print(f"Full model accuracy:   {full_correct / n:.1%}")
+    print(f"Tiered accuracy:       {tiered_correct / n:.1%}")
+    print(f"Agreement with full:   {agree / n:.1%}")
+    if lexicon_total:
+        print(f"Lexicon-tier accuracy: {lexicon_correct / lexicon_total:.1%} ({lexicon_total} decided without the transformer)")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,10 +14,11 @@ class Analytics:
     
     # ==================== GOAL ANALYTICS ====================
     
-    def get_goal_progress_over_time(self, user_id):
-        """Analyze goal progress over time"""
+    def get_goal_progress_over_time(self, user_id, career_goals=None):
+        """Analyze goal progress over time (career_goals may be prefetched)"""
         try:
-            career_goals = self.db.get_career_goals(user_id)
+            if career_goals is None:
+                career_goals = self.db.get_career_goals(user_id)
             
             if len(career_goals) == 0:
                 return None
@@ -76,10 +77,11 @@ class Analytics:
 
     # ==================== TASK ANALYTICS ====================
     
-    def get_task_completion_stats(self, user_id):
-        """Analyze task completion statistics"""
+    def get_task_completion_stats(self, user_id, tasks=None):
+        """Analyze task completion statistics (tasks may be prefetched)"""
         try:
-            tasks = self.db.get_daily_tasks(user_id)
+            if tasks is None:
+                tasks = self.db.get_daily_tasks(user_id)
             
             if len(tasks) == 0:
                 return None, None
@@ -179,10 +181,11 @@ class Analytics:
 
     # ==================== QUIZ ANALYTICS ====================
     
-    def get_quiz_performance_stats(self, user_id):
-        """Analyze quiz performance statistics"""
+    def get_quiz_performance_stats(self, user_id, quiz_sessions=None):
+        """Analyze quiz performance statistics (quiz_sessions may be prefetched)"""
         try:
-            quiz_sessions = self.db.get_quiz_sessions(user_id)
+            if quiz_sessions is None:
+                quiz_sessions = self.db.get_quiz_sessions(user_id)
             
             if len(quiz_sessions) == 0:
                 return None, None
@@ -258,18 +261,34 @@ class Analytics:
             logger.error(f"Failed to plot quiz charts: {e}")
             return []
     
-    def get_quiz_difficulty_breakdown(self, user_id):
-        """Analyze performance by difficulty level"""
+    def get_quiz_difficulty_breakdown(self, user_id, quiz_results=None):
+        """Analyze performance by difficulty level
+        
+        Without prefetched quiz_results the history is streamed in batches
+        and only per-difficulty counters are kept, so memory stays flat
+        however many questions the user has answered.
+        """
         try:
-            quiz_results = self.db.get_quiz_history(user_id)
-            
-            if len(quiz_results) == 0:
-                return None
-            
-            difficulty_stats = quiz_results.groupby('difficulty').agg(
-                total_questions=('is_correct', 'count'),
-                correct_answers=('is_correct', 'sum')
-            )
+            if quiz_results is not None:
+                if len(quiz_results) == 0:
+                    return None
+                difficulty_stats = quiz_results.groupby('difficulty').agg(
+                    total_questions=('is_correct', 'count'),
+                    correct_answers=('is_correct', 'sum')
+                )
+            else:
+                counts = {}
+                for result in self.db.iter_quiz_history(user_id, fields=("difficulty", "is_correct")):
+                    total, correct = counts.get(result.get('difficulty'), (0, 0))
+                    counts[result.get('difficulty')] = (total + 1, correct + bool(result.get('is_correct')))
+                
+                if not counts:
+                    return None
+                
+                difficulty_stats = pd.DataFrame(
+                    [(d, t, c) for d, (t, c) in counts.items()],
+                    columns=['difficulty', 'total_questions', 'correct_answers']
+                ).set_index('difficulty').sort_index()
             difficulty_stats['accuracy'] = (
                 difficulty_stats['correct_answers'] / difficulty_stats['total_questions'] * 100
             ).round(2)
@@ -0,0 +1,226 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.model_registry import LazyModel, EMBEDDING_TASK, SENTIMENT_TASK
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """Gathers single-item requests from many threads into batched calls
+
+    Callers submit() one item and get a Future back. A worker thread
+    collects requests until `max_batch_size` items are waiting or the
+    oldest one has waited `max_wait_ms`, then runs `batch_fn` once on the
+    whole batch and resolves every future with its own result. With
+    `enabled=False` each item is run inline as a batch of one.
+    """
+
+    def __init__(self, name, batch_fn, max_batch_size=32, max_wait_ms=10, enabled=True):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.enabled = enabled
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self._batch_sizes = deque(maxlen=1000)
+        self._queue_waits = deque(maxlen=1000)
+        self._run_times = deque(maxlen=1000)
+        self._counters = {"requests": 0, "batches": 0, "errors": 0}
+
+    def submit(self, item):
+        """Queue one item; the returned future resolves to its result"""
+        if not self.enabled:
+            future = Future()
+            self._execute([(item, future, time.monotonic())])
+            return future
+
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((item, future, time.monotonic()))
+        return future
+
+    def submit_many(self, items):
+        """Queue several items at once so they share as few batches as possible"""
+        futures = [Future() for _ in items]
+        if not self.enabled:
+            now = time.monotonic()
+            self._execute([(item, future, now) for item, future in zip(items, futures)])
+            return futures
+
+        self._ensure_worker()
+        for item, future in zip(items, futures):
+            self._queue.put((item, future, time.monotonic()))
+        return futures
+
+    def close(self):
+        """Stop the worker after it finishes the requests already queued"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                self._queue.put(_STOP)
+                self._thread = None
+
+    def metrics(self):
+        """Batch size, queue wait and forward-pass time distributions"""
+        with self._lock:
+            sizes = list(self._batch_sizes)
+            waits = sorted(self._queue_waits)
+            runs = sorted(self._run_times)
+            metrics = dict(self._counters)
+
+        metrics["name"] = self.name
+        metrics["queued"] = self._queue.qsize()
+        metrics["avg_batch_size"] = sum(sizes) / len(sizes) if sizes else 0.0
+        metrics["max_batch_size"] = max(sizes) if sizes else 0
+        metrics["avg_wait_ms"] = sum(waits) / len(waits) * 1000 if waits else 0.0
+        metrics["p95_wait_ms"] = waits[int(0.95 * (len(waits) - 1))] * 1000 if waits else 0.0
+        metrics["avg_run_ms"] = sum(runs) / len(runs) * 1000 if runs else 0.0
+        return metrics
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Worker loop: collect a batch up to the size or deadline, then execute it"""
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                break
+
+            batch = [first]
+            deadline = first[2] + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is _STOP:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            self._execute(batch)
+
+    def _execute(self, batch):
+        """Run batch_fn once and hand each caller its result (or the shared error)"""
+        batch = [request for request in batch if request[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.monotonic()
+        items = [request[0] for request in batch]
+        try:
+            results = self.batch_fn(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} inputs")
+        except Exception as e:
+            logger.warning(f"{self.name} batch of {len(items)} failed: {e}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            failed = True
+        else:
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            failed = False
+
+        finished = time.monotonic()
+        with self._lock:
+            self._counters["requests"] += len(batch)
+            self._counters["batches"] += 1
+            self._counters["errors"] += 1 if failed else 0
+            self._batch_sizes.append(len(batch))
+            self._queue_waits.extend(started - enqueued for _, _, enqueued in batch)
+            self._run_times.append(finished - started)
+
+
+def _embedding_batch_fn(model):
+    """Encode texts in one forward pass into L2-normalized float32 rows"""
+    def run(texts):
+        encoder = model.get()
+        if encoder is None:
+            raise RuntimeError(f"Embedding model {model.model_name} is unavailable")
+        embeddings = encoder.encode(
+            texts, batch_size=len(texts), convert_to_numpy=True, normalize_embeddings=True
+        )
+        return list(np.asarray(embeddings, dtype=np.float32))
+    return run
+
+
+def _sentiment_batch_fn(model):
+    """Classify texts in one pipeline call"""
+    def run(texts):
+        classifier = model.get()
+        if classifier is None:
+            raise RuntimeError(f"Sentiment model {model.model_name} is unavailable")
+        return classifier(texts, batch_size=len(texts), truncation=True)
+    return run
+
+
+_batch_fns = {
+    EMBEDDING_TASK: _embedding_batch_fn,
+    SENTIMENT_TASK: _sentiment_batch_fn,
+}
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(model_name, task):
+    """Process-wide batcher for (model_name, task), shared by every session"""
+    key = (model_name, task)
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = MicroBatcher(
+                f"{task}:{model_name.split('/')[-1]}",
+                _batch_fns[task](LazyModel(model_name, task)),
+                max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+                max_wait_ms=settings.INFERENCE_MAX_WAIT_MS,
+                enabled=settings.INFERENCE_BATCHING_ENABLED,
+            )
+            _batchers[key] = batcher
+        return batcher
+
+
+def embed_text(text, model_name=None):
+    """Normalized embedding for one text, computed in a shared micro-batch"""
+    batcher = get_batcher(model_name or settings.HF_EMBEDDING_MODEL, EMBEDDING_TASK)
+    return batcher.submit(text).result(timeout=settings.INFERENCE_TIMEOUT_SECONDS)
+
+
+def embed_texts(texts, model_name=None):
+    """Normalized embeddings for many texts, submitted together for batching"""
+    batcher = get_batcher(model_name or settings.HF_EMBEDDING_MODEL, EMBEDDING_TASK)
+    futures = batcher.submit_many(list(texts))
+    return [future.result(timeout=settings.INFERENCE_TIMEOUT_SECONDS) for future in futures]
+
+
+def classify_sentiment(text, model_name=None):
+    """Sentiment {'label', 'score'} for one text, computed in a shared micro-batch"""
+    batcher = get_batcher(model_name or settings.HF_SENTIMENT_MODEL, SENTIMENT_TASK)
+    return batcher.submit(text).result(timeout=settings.INFERENCE_TIMEOUT_SECONDS)
+
+
+def batcher_metrics():
+    """Metrics for every batcher created so far"""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    return [batcher.metrics() for batcher in batchers]
@@ -0,0 +1,302 @@
+import os
+import threading
+import time
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+EMBEDDING_TASK = "embedding"
+SENTIMENT_TASK = "sentiment-analysis"
+
+# fp32: stock weights; int8: dynamic int8 quantization of Linear layers;
+# onnx: exported ONNX graph run by onnxruntime (needs optimum[onnxruntime])
+INFERENCE_MODES = ("fp32", "int8", "onnx")
+
+# Attribute the loaders set on a model to record the mode it actually runs in
+INFERENCE_MODE_ATTR = "inference_mode"
+
+
+def _resolve_mode(mode):
+    """Inference mode to use, defaulting to settings.HF_INFERENCE_MODE"""
+    mode = (mode or settings.HF_INFERENCE_MODE).lower()
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unknown inference mode '{mode}', expected one of {INFERENCE_MODES}")
+    return mode
+
+
+def _tag_mode(model, mode):
+    """Record the effective inference mode on a loaded model"""
+    try:
+        setattr(model, INFERENCE_MODE_ATTR, mode)
+    except Exception:
+        pass
+    return model
+
+
+def _quantize_int8(module):
+    """Dynamically quantize the Linear layers of a torch module to int8 (CPU only)"""
+    import torch
+    return torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_embedding_model(model_name, mode=None):
+    """Load a SentenceTransformer embedding model in the given inference mode
+
+    A mode whose dependencies are missing falls back to fp32 with a warning;
+    the mode actually used is tagged on the model as `inference_mode`.
+    """
+    from sentence_transformers import SentenceTransformer
+    mode = _resolve_mode(mode)
+
+    if mode == "onnx":
+        try:
+            return _tag_mode(SentenceTransformer(model_name, backend="onnx"), "onnx")
+        except Exception as e:
+            logger.warning(f"ONNX embedding backend unavailable for {model_name}, using fp32: {e}")
+            return _tag_mode(SentenceTransformer(model_name), "fp32")
+
+    model = SentenceTransformer(model_name, device="cpu" if mode == "int8" else None)
+    if mode == "int8":
+        try:
+            return _tag_mode(_quantize_int8(model), "int8")
+        except Exception as e:
+            logger.warning(f"int8 quantization failed for {model_name}, using fp32: {e}")
+    return _tag_mode(model, "fp32")
+
+
+def load_sentiment_pipeline(model_name, mode=None):
+    """Load a HuggingFace sentiment-analysis pipeline in the given inference mode
+
+    A mode whose dependencies are missing falls back to fp32 with a warning;
+    the mode actually used is tagged on the pipeline as `inference_mode`.
+    """
+    import torch
+    from transformers import pipeline
+    mode = _resolve_mode(mode)
+
+    if mode == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            from transformers import AutoTokenizer
+            return _tag_mode(pipeline(
+                "sentiment-analysis",
+                model=ORTModelForSequenceClassification.from_pretrained(model_name, export=True),
+                tokenizer=AutoTokenizer.from_pretrained(model_name)
+            ), "onnx")
+        except Exception as e:
+            logger.warning(f"ONNX sentiment backend unavailable for {model_name}, using fp32: {e}")
+            mode = "fp32"
+
+    if mode == "int8":
+        classifier = pipeline("sentiment-analysis", model=model_name, device=-1)
+        try:
+            classifier.model = _quantize_int8(classifier.model)
+            return _tag_mode(classifier, "int8")
+        except Exception as e:
+            logger.warning(f"int8 quantization failed for {model_name}, using fp32: {e}")
+            return _tag_mode(classifier, "fp32")
+
+    return _tag_mode(pipeline(
+        "sentiment-analysis",
+        model=model_name,
+        device=0 if torch.cuda.is_available() else -1
+    ), "fp32")
+
+
+def _current_rss_bytes():
+    """Resident set size of this process, or None where /proc is unavailable"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _parameter_bytes(model):
+    """Bytes held by the torch weights behind a model
+
+    Counts parameters and buffers plus the packed weights of dynamically
+    quantized Linear layers, which are neither.
+    """
+    module = model if hasattr(model, "parameters") else getattr(model, "model", None)
+    if module is None or not hasattr(module, "parameters"):
+        return None
+
+    total = sum(p.numel() * p.element_size() for p in module.parameters())
+    total += sum(b.numel() * b.element_size() for b in module.buffers())
+    for submodule in module.modules():
+        packed = getattr(submodule, "_packed_params", None)
+        if packed is None or not hasattr(packed, "_weight_bias"):
+            continue
+        for tensor in packed._weight_bias():
+            if tensor is not None:
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class _ModelEntry:
+    """Registry slot for a single (model_name, task) pair"""
+
+    def __init__(self, model_name, task):
+        self.model_name = model_name
+        self.task = task
+        self.model = None
+        self.refcount = 0
+        self.load_lock = threading.Lock()
+        self.load_seconds = None
+        self.parameter_bytes = None
+        self.rss_delta_bytes = None
+        self.mode = None
+
+
+class ModelRegistry:
+    """Process-wide registry handing out refcounted model singletons
+
+    Models are keyed by (model_name, task), loaded lazily on the first
+    acquire() and dropped again once every holder has released them.
+    Loading happens under a per-model lock, so concurrent first callers
+    wait for one load instead of each building their own copy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._loaders = {
+            EMBEDDING_TASK: load_embedding_model,
+            SENTIMENT_TASK: load_sentiment_pipeline,
+        }
+
+    def register_loader(self, task, loader):
+        """Register the callable used to build models for a task"""
+        with self._lock:
+            self._loaders[task] = loader
+
+    def acquire(self, model_name, task):
+        """Return the shared model for (model_name, task), loading it if needed"""
+        key = (model_name, task)
+        with self._lock:
+            if task not in self._loaders:
+                raise ValueError(f"No model loader registered for task '{task}'")
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _ModelEntry(model_name, task)
+                self._entries[key] = entry
+            entry.refcount += 1
+            loader = self._loaders[task]
+
+        try:
+            with entry.load_lock:
+                if entry.model is None:
+                    self._load(entry, loader)
+            return entry.model
+        except Exception:
+            self.release(model_name, task)
+            raise
+
+    def release(self, model_name, task):
+        """Drop one reference; the model is unloaded when none remain"""
+        key = (model_name, task)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refcount -= 1
+            if entry.refcount > 0:
+                return
+            del self._entries[key]
+
+        if entry.model is not None:
+            entry.model = None
+            logger.info(f"Unloaded model {model_name} ({task})")
+
+    def is_loaded(self, model_name, task):
+        """Whether the model is currently resident"""
+        with self._lock:
+            entry = self._entries.get((model_name, task))
+            return entry is not None and entry.model is not None
+
+    def memory_report(self):
+        """Per-model load time, refcount and memory usage"""
+        with self._lock:
+            entries = list(self._entries.values())
+
+        return [
+            {
+                "model": entry.model_name,
+                "task": entry.task,
+                "mode": entry.mode,
+                "refcount": entry.refcount,
+                "loaded": entry.model is not None,
+                "load_seconds": entry.load_seconds,
+                "parameter_bytes": entry.parameter_bytes,
+                "rss_delta_bytes": entry.rss_delta_bytes,
+            }
+            for entry in entries
+        ]
+
+    def _load(self, entry, loader):
+        """Build the model and record how long and how much memory it took"""
+        rss_before = _current_rss_bytes()
+        start = time.perf_counter()
+
+        entry.model = loader(entry.model_name)
+
+        entry.load_seconds = time.perf_counter() - start
+        # Effective mode after any fallback; custom loaders may not tag one
+        entry.mode = getattr(entry.model, INFERENCE_MODE_ATTR, None)
+        rss_after = _current_rss_bytes()
+        if rss_before is not None and rss_after is not None:
+            entry.rss_delta_bytes = max(0, rss_after - rss_before)
+
+        try:
+            entry.parameter_bytes = _parameter_bytes(entry.model)
+        except Exception as e:
+            logger.warning(f"Could not measure memory for {entry.model_name}: {e}")
+
+        size_mb = (entry.parameter_bytes or 0) / (1024 * 1024)
+        logger.info(
+            f"Loaded model {entry.model_name} ({entry.task}, {entry.mode}) in {entry.load_seconds:.2f}s, "
+            f"{size_mb:.1f} MB of weights"
+        )
+
+
+model_registry = ModelRegistry()
+
+
+class LazyModel:
+    """Handle that acquires a registry model on first use
+
+    Holding a LazyModel costs nothing until get() is called, which keeps
+    torch and transformers out of the import and construction path of
+    the generators. A failed load is remembered so callers fall back to
+    their degraded path instead of retrying the load on every request.
+    """
+
+    def __init__(self, model_name, task, registry=None):
+        self.model_name = model_name
+        self.task = task
+        self._registry = registry or model_registry
+        self._model = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the model, or None if it could not be loaded"""
+        if self._model is None and not self._failed:
+            with self._lock:
+                if self._model is None and not self._failed:
+                    try:
+                        self._model = self._registry.acquire(self.model_name, self.task)
+                    except Exception as e:
+                        logger.warning(f"Failed to load {self.task} model {self.model_name}: {e}")
+                        self._failed = True
+        return self._model
+
+    def release(self):
+        """Give the reference back to the registry"""
+        with self._lock:
+            if self._model is not None:
+                self._model = None
+                self._registry.release(self.model_name, self.task)
@@ -0,0 +1,95 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+NEUTRAL = {"label": "neutral", "score": 0.5}
+
+
+def textblob_sentiment(text):
+    """(label, polarity) from TextBlob's lexicon"""
+    from textblob import TextBlob
+    polarity = TextBlob(text).sentiment.polarity
+    if polarity > 0:
+        return "positive", polarity
+    if polarity < 0:
+        return "negative", polarity
+    return "neutral", polarity
+
+
+class TieredSentimentAnalyzer:
+    """Lexicon first pass that escalates only ambiguous messages
+
+    Messages whose TextBlob polarity is at least `threshold` away from zero
+    are labeled without touching the transformer; the rest go to
+    `escalate(text)`, normally the batched RoBERTa pipeline. Results are
+    memoized by message hash in a bounded LRU, except lexicon fallbacks
+    used while the transformer is unavailable.
+    """
+
+    def __init__(self, escalate, threshold=0.35, memo_size=2048):
+        self.escalate = escalate
+        self.threshold = threshold
+        self.memo_size = max(0, memo_size)
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "memo_hits": 0, "fast_path": 0, "escalations": 0, "fallbacks": 0}
+
+    def analyze(self, text):
+        """{'label', 'score', 'tier'} for a message"""
+        key = hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+        with self._lock:
+            self._counters["requests"] += 1
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self._counters["memo_hits"] += 1
+                return dict(cached)
+
+        result, fell_back = self._classify(text)
+
+        with self._lock:
+            # Retry the transformer next time rather than pinning the fallback
+            if self.memo_size and not fell_back:
+                self._memo[key] = result
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return dict(result)
+
+    def stats(self):
+        """Request counts plus the share of classified messages that escalated"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memo_entries"] = len(self._memo)
+        classified = stats["fast_path"] + stats["escalations"]
+        stats["escalation_rate"] = stats["escalations"] / classified if classified else 0.0
+        return stats
+
+    def _classify(self, text):
+        """(result, fell_back); fell_back is True when escalation failed"""
+        try:
+            label, polarity = textblob_sentiment(text)
+        except Exception as e:
+            logger.warning(f"Lexicon sentiment failed: {e}")
+            label, polarity = "neutral", 0.0
+
+        if abs(polarity) >= self.threshold:
+            with self._lock:
+                self._counters["fast_path"] += 1
+            return {"label": label, "score": 0.5 + abs(polarity) / 2, "tier": "lexicon"}, False
+
+        with self._lock:
+            self._counters["escalations"] += 1
+        try:
+            result = self.escalate(text)
+            if result is not None:
+                return {"label": result["label"], "score": result["score"], "tier": "transformer"}, False
+        except Exception as e:
+            logger.warning(f"Sentiment escalation failed: {e}")
+
+        # Transformer unavailable: keep the lexicon's best guess
+        with self._lock:
+            self._counters["fallbacks"] += 1
+        return {"label": label, "score": 0.5, "tier": "lexicon"}, True
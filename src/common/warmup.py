@@ -0,0 +1,68 @@
+import threading
+import time
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.model_registry import model_registry, EMBEDDING_TASK, SENTIMENT_TASK
+
+logger = get_logger(__name__)
+
+# Models pinned in the registry for the lifetime of the process
+WARMUP_MODELS = [
+    (settings.HF_EMBEDDING_MODEL, EMBEDDING_TASK),
+    (settings.HF_SENTIMENT_MODEL, SENTIMENT_TASK),
+]
+
+_ready = threading.Event()
+_start_lock = threading.Lock()
+_thread = None
+_errors = []
+_started_at = None
+_finished_at = None
+
+
+def _warm_up():
+    """Import the ML stack and load every warm-up model into the registry"""
+    global _finished_at
+    try:
+        for model_name, task in WARMUP_MODELS:
+            try:
+                model_registry.acquire(model_name, task)
+            except Exception as e:
+                logger.warning(f"Warm-up failed for {model_name}: {e}")
+                _errors.append(f"{model_name}: {e}")
+    finally:
+        _finished_at = time.perf_counter()
+        _ready.set()
+        logger.info(f"Model warm-up finished in {_finished_at - _started_at:.2f}s")
+
+
+def start_warmup(background=True):
+    """Start loading models once per process; later calls are no-ops"""
+    global _thread, _started_at
+    with _start_lock:
+        if _started_at is not None:
+            return
+        _started_at = time.perf_counter()
+
+        if background:
+            _thread = threading.Thread(target=_warm_up, name="model-warmup", daemon=True)
+            _thread.start()
+            logger.info("Model warm-up started in background")
+            return
+
+    _warm_up()
+
+
+def is_ready():
+    """Whether warm-up has finished (successfully or not)"""
+    return _ready.is_set()
+
+
+def wait_until_ready(timeout=None):
+    """Block until warm-up has finished; returns False on timeout"""
+    return _ready.wait(timeout)
+
+
+def warmup_errors():
+    """Errors raised while loading warm-up models"""
+    return list(_errors)
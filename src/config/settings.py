@@ -18,26 +18,129 @@ class Settings:
     GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
     GROQ_TEMPERATURE = float(os.getenv("GROQ_TEMPERATURE", "0.7"))
     
+    # LLM Backend: "groq" (live), "record" (live + append to fixture file),
+    # "replay" (serve recorded fixtures) or "synthetic" (offline, simulated)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "groq").lower()
+    LLM_FIXTURE_PATH = os.getenv("LLM_FIXTURE_PATH", "data/llm_fixtures.jsonl")
+    LLM_REPLAY_STRICT = os.getenv("LLM_REPLAY_STRICT", "false").lower() == "true"
+    LLM_SYNTHETIC_LATENCY_MS = float(os.getenv("LLM_SYNTHETIC_LATENCY_MS", "400"))
+    LLM_SYNTHETIC_LATENCY_SIGMA = float(os.getenv("LLM_SYNTHETIC_LATENCY_SIGMA", "0.5"))
+    LLM_SYNTHETIC_FAILURE_RATE = float(os.getenv("LLM_SYNTHETIC_FAILURE_RATE", "0.0"))
+    LLM_SYNTHETIC_SEED = int(os.getenv("LLM_SYNTHETIC_SEED")) if os.getenv("LLM_SYNTHETIC_SEED") else None
+    
+    # LLM Scheduler: shared rate budgets and retry policy for every LLM call
+    LLM_RPM_LIMIT = int(os.getenv("LLM_RPM_LIMIT", "30"))
+    LLM_TPM_LIMIT = int(os.getenv("LLM_TPM_LIMIT", "6000"))
+    LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "256"))
+    LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "4"))
+    LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+    LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+    
+    # Shared HTTP connection pool for LLM API calls
+    LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+    LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+    LLM_HTTP_KEEPALIVE_SECONDS = float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "60"))
+    LLM_HTTP_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "60"))
+    LLM_HTTP_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT_SECONDS", "10"))
+    
     # HuggingFace Models
     HF_EMBEDDING_MODEL = os.getenv("HF_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
     HF_SENTIMENT_MODEL = os.getenv("HF_SENTIMENT_MODEL", "cardiffnlp/twitter-roberta-base-sentiment-latest")
     HF_TEXT_MODEL = os.getenv("HF_TEXT_MODEL", "mistralai/Mistral-7B-Instruct-v0.2")
     
+    # HF inference mode on CPU: fp32, int8 (dynamic quantization) or onnx
+    HF_INFERENCE_MODE = os.getenv("HF_INFERENCE_MODE", "fp32").lower()
+    
+    # Retrieval-based chat context from the per-user vector index
+    VECTOR_INDEX_ENABLED = os.getenv("VECTOR_INDEX_ENABLED", "true").lower() == "true"
+    CONTEXT_TOP_K = int(os.getenv("CONTEXT_TOP_K", "8"))
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "400"))
+    CONTEXT_MIN_SCORE = float(os.getenv("CONTEXT_MIN_SCORE", "0.2"))
+    
+    # Conversation memory: rolling summary + recent messages per chat prompt
+    CHAT_MEMORY_ENABLED = os.getenv("CHAT_MEMORY_ENABLED", "true").lower() == "true"
+    CHAT_RECENT_MESSAGES = int(os.getenv("CHAT_RECENT_MESSAGES", "6"))
+    CHAT_SUMMARY_EVERY = int(os.getenv("CHAT_SUMMARY_EVERY", "6"))
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "800"))
+    CHAT_SUMMARY_MAX_WORDS = int(os.getenv("CHAT_SUMMARY_MAX_WORDS", "150"))
+    
+    # Semantic cache: reuse answers to near-identical career questions
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_SCOPE = os.getenv("SEMANTIC_CACHE_SCOPE", "user").lower()
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+    SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "604800"))
+    
+    # Milestone plans are regenerated when progress crosses a bucket of this size
+    PLAN_PROGRESS_BUCKET = int(os.getenv("PLAN_PROGRESS_BUCKET", "25"))
+    
+    # Threads running the pre-LLM stages of a chat turn
+    CHAT_PIPELINE_WORKERS = int(os.getenv("CHAT_PIPELINE_WORKERS", "8"))
+    
+    # Tiered sentiment: TextBlob first, transformer only for ambiguous messages
+    SENTIMENT_TIERED_ENABLED = os.getenv("SENTIMENT_TIERED_ENABLED", "true").lower() == "true"
+    SENTIMENT_FAST_THRESHOLD = float(os.getenv("SENTIMENT_FAST_THRESHOLD", "0.35"))
+    SENTIMENT_MEMO_SIZE = int(os.getenv("SENTIMENT_MEMO_SIZE", "2048"))
+    
+    # Micro-batched inference for the HuggingFace models
+    INFERENCE_BATCHING_ENABLED = os.getenv("INFERENCE_BATCHING_ENABLED", "true").lower() == "true"
+    INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "32"))
+    INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+    INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
+    
     # MongoDB Connection (Atlas/Cloud)
     # Try to get URI from Streamlit secrets if running online, fallback to ENV for local dev
     MONGO_URI = (
         st.secrets["MONGO_URI"] if st is not None and "MONGO_URI" in st.secrets
         else os.getenv("MONGO_URI")
     )
+    # Pool options shared by the sync and async clients
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "45000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    # Fetch independent collections concurrently through the async client
+    MONGO_ASYNC_ENABLED = os.getenv("MONGO_ASYNC_ENABLED", "true").lower() == "true"
     
     # Application
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
     CHAT_HISTORY_LIMIT = int(os.getenv("CHAT_HISTORY_LIMIT", "20"))
     
+    # Startup: "background" warms models in a thread, "eager" loads them
+    # before the first page paint, "lazy" loads them on first use
+    STARTUP_MODE = os.getenv("STARTUP_MODE", "background").lower()
+    
+    # LLM Response Cache (memory LRU + SQLite file)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite")
+    LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "256"))
+    LLM_CACHE_MAX_DISK_MB = int(os.getenv("LLM_CACHE_MAX_DISK_MB", "50"))
+    
+    # Quiz Generation
+    QUIZ_GENERATION_CONCURRENCY = int(os.getenv("QUIZ_GENERATION_CONCURRENCY", "4"))
+    # "batch" asks for several questions per LLM call, "single" for one
+    QUIZ_GENERATION_MODE = os.getenv("QUIZ_GENERATION_MODE", "batch").lower()
+    QUIZ_BATCH_SIZE = int(os.getenv("QUIZ_BATCH_SIZE", "5"))
+    # Recent questions a generator checks new ones against for duplicates
+    QUESTION_HISTORY_LIMIT = int(os.getenv("QUESTION_HISTORY_LIMIT", "500"))
+    # Write quiz sessions and their results in one transaction (needs a replica set, e.g. Atlas)
+    QUIZ_SAVE_TRANSACTION = os.getenv("QUIZ_SAVE_TRANSACTION", "false").lower() == "true"
+    # Quiz history reads: rows per history page, documents per streamed batch
+    QUIZ_HISTORY_PAGE_SIZE = int(os.getenv("QUIZ_HISTORY_PAGE_SIZE", "25"))
+    QUIZ_HISTORY_BATCH_SIZE = int(os.getenv("QUIZ_HISTORY_BATCH_SIZE", "500"))
+    
+    # Question Bank
+    QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+    QUESTION_BANK_LOW_WATER = int(os.getenv("QUESTION_BANK_LOW_WATER", "20"))
+    QUESTION_BANK_TARGET = int(os.getenv("QUESTION_BANK_TARGET", "50"))
+    QUESTION_BANK_REFILL_INTERVAL = int(os.getenv("QUESTION_BANK_REFILL_INTERVAL", "300"))
+    QUESTION_BANK_POPULAR_KEYS = int(os.getenv("QUESTION_BANK_POPULAR_KEYS", "10"))
+    
     @classmethod
     def validate(cls):
         """Validate required settings"""
-        if not cls.GROQ_API_KEY:
+        if cls.LLM_BACKEND in ("groq", "record") and not cls.GROQ_API_KEY:
             raise ValueError("GROQ_API_KEY not found in environment variables")
         if not cls.MONGO_URI:
             raise ValueError("MONGO_URI not found in environment variables or Streamlit secrets!")
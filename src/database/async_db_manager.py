@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+from src.config.settings import settings
+from src.database.db_manager import mongo_client_options, records_frame, user_records_spec
+
+logger = get_logger(__name__)
+
+class AsyncDatabaseManager:
+    """Async reads of the collections the analytics tab fetches together
+
+    Only the getters that are fetched concurrently live here; every other
+    read and all writes go through DatabaseManager. Filters, projections
+    and sorts come from the same db_manager helpers the sync getters use,
+    so both return identical DataFrames.
+
+    The client is a PyMongo AsyncMongoClient with the same pool options.
+    An async client belongs to one event loop, so the shared client lives
+    on a background loop: sync callers (the Streamlit script) use run() /
+    fetch_many(), which block only until the concurrently issued queries
+    finish.
+
+    Error policy: every getter logs and raises CustomException instead of
+    returning an empty frame, so a failed fetch_many can fall back to the
+    sync queries.
+    """
+    _client = None
+    _db = None
+    _loop = None
+    _lock = threading.Lock()
+
+    def __init__(self, db_name="growth_companion"):
+        with AsyncDatabaseManager._lock:
+            if AsyncDatabaseManager._client is None:
+                if not settings.MONGO_URI:
+                    raise CustomException("Missing MongoDB URI", "settings.MONGO_URI is empty")
+                try:
+                    from pymongo import AsyncMongoClient
+                except ImportError as e:
+                    raise CustomException("Async MongoDB client unavailable (needs pymongo>=4.13)", e)
+
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="mongo-async-loop", daemon=True).start()
+                AsyncDatabaseManager._loop = loop
+                AsyncDatabaseManager._client = AsyncMongoClient(settings.MONGO_URI, **mongo_client_options())
+                AsyncDatabaseManager._db = AsyncDatabaseManager._client[db_name]
+                logger.info(f"Async MongoDB client created: {db_name}")
+
+        self.client = AsyncDatabaseManager._client
+        self.db = AsyncDatabaseManager._db
+        self.loop = AsyncDatabaseManager._loop
+
+    # ==================== SYNC BRIDGE ====================
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the client's loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def gather(self, **calls):
+        """Await several coroutines concurrently; returns {name: result}"""
+        results = await asyncio.gather(*calls.values())
+        return dict(zip(calls.keys(), results))
+
+    def fetch_many(self, timeout=None, **calls):
+        """Sync gather: fetch_many(goals=adb.get_career_goals(uid), tasks=...)"""
+        return self.run(self.gather(**calls), timeout)
+
+    # ==================== GETTERS ====================
+
+    async def _find_frame(self, collection, user_id, subject=None, add_id=True):
+        """A user's documents from collection as a DataFrame, newest first; raises CustomException"""
+        try:
+            query, projection, sort = user_records_spec(collection, user_id, subject)
+            docs = await self.db[collection].find(query, projection).sort(sort).to_list()
+            return records_frame(docs, add_id=add_id)
+        except Exception as e:
+            logger.error(f"Failed to get {collection}: {e}")
+            raise CustomException(f"Failed to get {collection}", e)
+
+    async def get_career_goals(self, user_id):
+        """Get all career goals for a user"""
+        return await self._find_frame("career_goals", user_id)
+
+    async def get_daily_tasks(self, user_id):
+        """Get all daily tasks for a user"""
+        return await self._find_frame("daily_tasks", user_id)
+
+    async def get_quiz_sessions(self, user_id):
+        """Get all quiz session summaries"""
+        return await self._find_frame("quiz_sessions", user_id)
+
+    async def get_quiz_history(self, user_id, subject=None):
+        """Get quiz history for analytics"""
+        return await self._find_frame("quiz_results", user_id, subject, add_id=False)
+
+    def close(self):
+        """Close the async client and stop its loop"""
+        if AsyncDatabaseManager._client is not None:
+            try:
+                self.run(AsyncDatabaseManager._client.close(), timeout=10)
+            except Exception as e:
+                logger.warning(f"Async MongoDB close failed: {e}")
+            AsyncDatabaseManager._loop.call_soon_threadsafe(AsyncDatabaseManager._loop.stop)
+            AsyncDatabaseManager._client = None
+            AsyncDatabaseManager._db = None
+            AsyncDatabaseManager._loop = None
+            logger.info("Async MongoDB connection closed")
@@ -1,5 +1,8 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from pymongo.errors import ConnectionFailure
+from bson import ObjectId
+import hashlib
+import json
 import pandas as pd
 from datetime import datetime
 from src.common.logger import get_logger
@@ -8,9 +11,190 @@ from src.config.settings import settings
 
 logger = get_logger(__name__)
 
+QUIZ_HISTORY_PROJECTION = {
+    "_id": 1, "user_id": 1, "subject": 1, "question_type": 1, "question": 1,
+    "user_answer": 1, "correct_answer": 1, "is_correct": 1, "difficulty": 1, "taken_at": 1
+}
+
+def hash_question(question_text):
+    """Stable hash of a question's text, used to match bank and result rows"""
+    normalized = " ".join(str(question_text).lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+def hash_plan_inputs(inputs):
+    """Stable hash of the inputs a career plan was generated from"""
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _bank_key(subject, topic, difficulty, question_type):
+    """Normalized (subject, topic, difficulty, question_type) bank key"""
+    return {
+        "subject": subject.strip().lower(),
+        "topic": topic.strip().lower(),
+        "difficulty": difficulty.strip().lower(),
+        "question_type": question_type
+    }
+
+def build_quiz_attempt_docs(user_id, subject, difficulty, results):
+    """(session_doc, result_docs) for a submitted quiz, linked by a client-side session _id"""
+    now = datetime.now()
+    session_id = ObjectId()
+    correct_answers = sum(1 for r in results if r['is_correct'])
+    total_questions = len(results)
+    session_doc = {
+        "_id": session_id,
+        "user_id": user_id,
+        "subject": subject,
+        "total_questions": total_questions,
+        "correct_answers": correct_answers,
+        "score_percentage": (correct_answers / total_questions * 100) if total_questions else 0,
+        "difficulty": difficulty,
+        "created_at": now
+    }
+    result_docs = [
+        {
+            "user_id": user_id,
+            "session_id": session_id,
+            "subject": r['subject'],
+            "question_type": r['question_type'],
+            "question": r['question'],
+            "question_hash": hash_question(r['question']),
+            "user_answer": r['user_answer'],
+            "correct_answer": r['correct_answer'],
+            "is_correct": r['is_correct'],
+            "difficulty": r['difficulty'],
+            "taken_at": now
+        }
+        for r in results
+    ]
+    return session_doc, result_docs
+
+def dashboard_pipeline(user_id):
+    """Aggregation on career_goals that unions the other per-user collections
+    
+    Each collection is filtered by its user_id index, projected down to the
+    one field it contributes and grouped by source, so at most four small
+    documents come back however much data the user has.
+    """
+    def tagged(collection, field):
+        return [
+            {"$match": {"user_id": user_id}},
+            {"$project": {"_id": 0, "source": {"$literal": collection}, field: 1}}
+        ]
+    
+    return tagged("career_goals", "progress") + [
+        {"$unionWith": {"coll": "personal_goals", "pipeline": tagged("personal_goals", "completed")}},
+        {"$unionWith": {"coll": "daily_tasks", "pipeline": tagged("daily_tasks", "completed")}},
+        {"$unionWith": {"coll": "quiz_sessions", "pipeline": tagged("quiz_sessions", "score_percentage")}},
+        {"$group": {
+            "_id": "$source",
+            "count": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [{"$eq": ["$completed", True]}, 1, 0]}},
+            "avg_progress": {"$avg": "$progress"},
+            "avg_score": {"$avg": "$score_percentage"}
+        }}
+    ]
+
+def summarize_dashboard(rows):
+    """Sidebar metrics from the grouped rows of dashboard_pipeline"""
+    summary = {
+        "career_goals": 0,
+        "avg_goal_progress": 0.0,
+        "personal_goals": 0,
+        "personal_goals_completed": 0,
+        "tasks": 0,
+        "tasks_completed": 0,
+        "quizzes_taken": 0,
+        "avg_quiz_score": 0.0
+    }
+    for row in rows:
+        if row["_id"] == "career_goals":
+            summary["career_goals"] = row["count"]
+            summary["avg_goal_progress"] = row["avg_progress"] or 0.0
+        elif row["_id"] == "personal_goals":
+            summary["personal_goals"] = row["count"]
+            summary["personal_goals_completed"] = row["completed"]
+        elif row["_id"] == "daily_tasks":
+            summary["tasks"] = row["count"]
+            summary["tasks_completed"] = row["completed"]
+        elif row["_id"] == "quiz_sessions":
+            summary["quizzes_taken"] = row["count"]
+            summary["avg_quiz_score"] = row["avg_score"] or 0.0
+    return summary
+
+def keyset_before(field, cursor):
+    """Filter for documents sorted (field desc, _id desc) after a (value, _id) cursor"""
+    value, last_id = cursor
+    last_id = ObjectId(last_id)
+    return {"$or": [
+        {field: {"$lt": value}},
+        {field: value, "_id": {"$lt": last_id}}
+    ]}
+
+def quiz_history_query(user_id, subject=None, after=None):
+    """quiz_results filter, optionally resuming after a (taken_at, _id) keyset cursor"""
+    query = {"user_id": user_id}
+    if subject:
+        query["subject"] = subject
+    if after is not None:
+        query.update(keyset_before("taken_at", after))
+    return query
+
+def chat_window_query(user_id, before=None):
+    """chat_history filter, optionally limited to messages older than a (timestamp, _id) cursor"""
+    query = {"user_id": user_id}
+    if before is not None:
+        query.update(keyset_before("timestamp", before))
+    return query
+
+CAREER_GOALS_PROJECTION = {
+    "_id": 1, "user_id": 1, "goal": 1, "deadline": 1, "priority": 1, "progress": 1, "created": 1, "notes": 1
+}
+DAILY_TASKS_PROJECTION = {
+    "_id": 1, "user_id": 1, "task": 1, "category": 1, "priority": 1, "completed": 1, "added": 1, "completed_at": 1
+}
+QUIZ_SESSIONS_PROJECTION = {
+    "_id": 1, "user_id": 1, "subject": 1, "total_questions": 1,
+    "correct_answers": 1, "score_percentage": 1, "difficulty": 1, "created_at": 1
+}
+
+# Projection and newest-first sort of the per-user collections read as DataFrames
+_USER_RECORD_SPECS = {
+    "career_goals": (CAREER_GOALS_PROJECTION, [("created", -1)]),
+    "daily_tasks": (DAILY_TASKS_PROJECTION, [("added", -1)]),
+    "quiz_sessions": (QUIZ_SESSIONS_PROJECTION, [("created_at", -1)]),
+    "quiz_results": (QUIZ_HISTORY_PROJECTION, [("taken_at", -1)]),
+}
+
+def user_records_spec(collection, user_id, subject=None):
+    """(filter, projection, sort) for reading a user's documents, shared by the sync and async getters"""
+    projection, sort = _USER_RECORD_SPECS[collection]
+    query = quiz_history_query(user_id, subject) if collection == "quiz_results" else {"user_id": user_id}
+    return query, projection, sort
+
+def records_frame(docs, add_id=True):
+    """DataFrame of documents with string ids (copied to `id` when add_id)"""
+    for doc in docs:
+        doc['_id'] = str(doc['_id'])
+        if add_id:
+            doc['id'] = doc['_id']
+    return pd.DataFrame(docs) if docs else pd.DataFrame()
+
+def mongo_client_options():
+    """Connection-pool options shared by the sync and async Mongo clients"""
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS
+    }
+
 class DatabaseManager:
     _client = None
     _db = None
+    # Callables notified as listener(collection, operation, doc_id, user_id)
+    # after goals, tasks and chat messages change
+    _change_listeners = []
     
     def __init__(self, db_name="growth_companion"):
         """Use settings.MONGO_URI, no hardcoded localhost!"""
@@ -19,14 +203,10 @@ class DatabaseManager:
             if DatabaseManager._client is None:
                 if not settings.MONGO_URI:
                     raise CustomException("Missing MongoDB URI", "settings.MONGO_URI is empty")
-                DatabaseManager._client = MongoClient(
-                    settings.MONGO_URI,
-                    maxPoolSize=50,
-                    minPoolSize=10,
-                    maxIdleTimeMS=45000,
-                    serverSelectionTimeoutMS=5000
-                )
+                DatabaseManager._client = MongoClient(settings.MONGO_URI, **mongo_client_options())
                 DatabaseManager._db = DatabaseManager._client[db_name]
+                self.client = DatabaseManager._client
+                self.db = DatabaseManager._db
                 self._create_indexes()
                 logger.info(f"Connected to MongoDB Atlas: {db_name}")
             else:
@@ -46,12 +226,45 @@ class DatabaseManager:
             self.db.career_goals.create_index([("user_id", 1), ("created", -1)])
             self.db.personal_goals.create_index([("user_id", 1), ("created", -1)])
             self.db.daily_tasks.create_index([("user_id", 1), ("added", -1)])
-            self.db.chat_history.create_index([("user_id", 1), ("timestamp", -1)])
+            # Newest-first chat windows, with _id breaking timestamp ties
+            self.db.chat_history.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+            self.db.chat_summaries.create_index([("user_id", 1)], unique=True)
             self.db.quiz_results.create_index([("user_id", 1), ("subject", 1), ("taken_at", -1)])
             self.db.quiz_sessions.create_index([("user_id", 1), ("created_at", -1)])
+            # Seen-question lookups for the question bank
+            self.db.quiz_results.create_index([("user_id", 1), ("question_hash", 1)])
+            self.db.quiz_results.create_index([("session_id", 1)])
+            # Keyset pagination over a user's history
+            self.db.quiz_results.create_index([("user_id", 1), ("taken_at", -1), ("_id", -1)])
+            self.db.question_bank.create_index(
+                [("subject", 1), ("topic", 1), ("difficulty", 1), ("question_type", 1), ("question_hash", 1)],
+                unique=True
+            )
+            self.db.question_bank_keys.create_index(
+                [("subject", 1), ("topic", 1), ("difficulty", 1), ("question_type", 1)],
+                unique=True
+            )
+            self.db.question_bank_keys.create_index([("requests", -1)])
+            # Generated plans are reused until their inputs change
+            self.db.career_plans.create_index([("user_id", 1), ("kind", 1), ("input_hash", 1)], unique=True)
+            self.db.career_plans.create_index([("user_id", 1), ("kind", 1), ("created", -1)])
             logger.info("MongoDB indexes created successfully")
         except Exception as e:
             logger.warning(f"Index creation warning: {e}")
+    
+    @classmethod
+    def add_change_listener(cls, listener):
+        """Register a callback for inserts, updates and deletes of user data"""
+        if listener not in cls._change_listeners:
+            cls._change_listeners.append(listener)
+    
+    def _notify_change(self, collection, operation, doc_id=None, user_id=None):
+        """Tell listeners about a write; listener errors never fail the write"""
+        for listener in list(DatabaseManager._change_listeners):
+            try:
+                listener(collection, operation, doc_id, user_id)
+            except Exception as e:
+                logger.warning(f"Change listener failed for {collection} {operation}: {e}")
 
     # ==================== CAREER GOALS ====================
     
@@ -68,6 +281,7 @@ class DatabaseManager:
                 "notes": notes
             }
             result = self.db.career_goals.insert_one(goal_doc)
+            self._notify_change("career_goals", "insert", result.inserted_id, user_id)
             logger.info(f"Career goal added: {goal}")
             return str(result.inserted_id)
         except Exception as e:
@@ -78,17 +292,11 @@ class DatabaseManager:
         """Get all career goals for a user - optimized with projection"""
         try:
             # Only fetch required fields
-            goals = list(self.db.career_goals.find(
-                {"user_id": user_id},
-                {"_id": 1, "user_id": 1, "goal": 1, "deadline": 1, "priority": 1, "progress": 1, "created": 1, "notes": 1}
-            ).sort("created", -1))
-            
-            # Convert ObjectId to string for DataFrame compatibility
-            for goal in goals:
-                goal['_id'] = str(goal['_id'])
-                goal['id'] = goal['_id']  # Add id field for compatibility
+            query, projection, sort = user_records_spec("career_goals", user_id)
+            goals = list(self.db.career_goals.find(query, projection).sort(sort))
             
-            return pd.DataFrame(goals) if goals else pd.DataFrame()
+            # String ids (plus an id copy) for DataFrame compatibility
+            return records_frame(goals)
         except Exception as e:
             logger.error(f"Failed to get career goals: {e}")
             return pd.DataFrame()
@@ -101,6 +309,7 @@ class DatabaseManager:
                 {"_id": ObjectId(goal_id)},
                 {"$set": {"progress": progress}}
             )
+            self._notify_change("career_goals", "update", goal_id)
             logger.info(f"Career goal {goal_id} updated to {progress}%")
         except Exception as e:
             logger.error(f"Failed to update career goal: {e}")
@@ -111,6 +320,8 @@ class DatabaseManager:
         try:
             from bson.objectid import ObjectId
             self.db.career_goals.delete_one({"_id": ObjectId(goal_id)})
+            self.db.career_plans.delete_many({"goal_id": goal_id})
+            self._notify_change("career_goals", "delete", goal_id)
             logger.info(f"Career goal {goal_id} deleted")
         except Exception as e:
             logger.error(f"Failed to delete career goal: {e}")
@@ -129,6 +340,7 @@ class DatabaseManager:
                 "notes": notes
             }
             result = self.db.personal_goals.insert_one(goal_doc)
+            self._notify_change("personal_goals", "insert", result.inserted_id, user_id)
             logger.info(f"Personal goal added: {goal}")
             return str(result.inserted_id)
         except Exception as e:
@@ -160,6 +372,7 @@ class DatabaseManager:
                 {"_id": ObjectId(goal_id)},
                 {"$set": {"completed": completed}}
             )
+            self._notify_change("personal_goals", "update", goal_id)
         except Exception as e:
             logger.error(f"Failed to update personal goal: {e}")
     
@@ -168,6 +381,7 @@ class DatabaseManager:
         try:
             from bson.objectid import ObjectId
             self.db.personal_goals.delete_one({"_id": ObjectId(goal_id)})
+            self._notify_change("personal_goals", "delete", goal_id)
         except Exception as e:
             logger.error(f"Failed to delete personal goal: {e}")
 
@@ -186,6 +400,7 @@ class DatabaseManager:
                 "completed_at": None
             }
             result = self.db.daily_tasks.insert_one(task_doc)
+            self._notify_change("daily_tasks", "insert", result.inserted_id, user_id)
             return str(result.inserted_id)
         except Exception as e:
             logger.error(f"Failed to add task: {e}")
@@ -194,16 +409,9 @@ class DatabaseManager:
     def get_daily_tasks(self, user_id):
         """Get all daily tasks for a user - optimized with projection"""
         try:
-            tasks = list(self.db.daily_tasks.find(
-                {"user_id": user_id},
-                {"_id": 1, "user_id": 1, "task": 1, "category": 1, "priority": 1, "completed": 1, "added": 1, "completed_at": 1}
-            ).sort("added", -1))
-            
-            for task in tasks:
-                task['_id'] = str(task['_id'])
-                task['id'] = task['_id']
-            
-            return pd.DataFrame(tasks) if tasks else pd.DataFrame()
+            query, projection, sort = user_records_spec("daily_tasks", user_id)
+            tasks = list(self.db.daily_tasks.find(query, projection).sort(sort))
+            return records_frame(tasks)
         except Exception as e:
             logger.error(f"Failed to get tasks: {e}")
             return pd.DataFrame()
@@ -217,6 +425,7 @@ class DatabaseManager:
                 {"_id": ObjectId(task_id)},
                 {"$set": {"completed": completed, "completed_at": completed_at}}
             )
+            self._notify_change("daily_tasks", "update", task_id)
         except Exception as e:
             logger.error(f"Failed to update task: {e}")
     
@@ -225,6 +434,7 @@ class DatabaseManager:
         try:
             from bson.objectid import ObjectId
             self.db.daily_tasks.delete_one({"_id": ObjectId(task_id)})
+            self._notify_change("daily_tasks", "delete", task_id)
         except Exception as e:
             logger.error(f"Failed to delete task: {e}")
 
@@ -239,34 +449,170 @@ class DatabaseManager:
                 "content": content,
                 "timestamp": datetime.now()
             }
-            self.db.chat_history.insert_one(message_doc)
+            result = self.db.chat_history.insert_one(message_doc)
+            self._notify_change("chat_history", "insert", result.inserted_id, user_id)
         except Exception as e:
             logger.error(f"Failed to add chat message: {e}")
     
-    def get_chat_history(self, user_id, limit=20):
-        """Get chat history for a user - optimized with limit and projection"""
+    def get_chat_history(self, user_id, limit=None):
+        """Newest `limit` messages (default CHAT_HISTORY_LIMIT) as a DataFrame in display order"""
+        messages, _ = self.get_chat_window(user_id, limit)
+        return pd.DataFrame(messages) if messages else pd.DataFrame()
+    
+    def get_chat_window(self, user_id, limit=None, before=None):
+        """Newest `limit` messages older than the `before` cursor, oldest first
+        
+        Reads backwards along the (user_id, timestamp, _id) index, so the
+        cost depends on `limit`, not on the conversation length. Returns
+        (messages, older_cursor); pass older_cursor as `before` to load the
+        previous window. It is None once the start of the chat is reached.
+        """
+        limit = limit or settings.CHAT_HISTORY_LIMIT
         try:
             messages = list(self.db.chat_history.find(
-                {"user_id": user_id},
+                chat_window_query(user_id, before),
                 {"_id": 1, "user_id": 1, "role": 1, "content": 1, "timestamp": 1}
-            ).sort("timestamp", 1).limit(limit))
+            ).sort([("timestamp", -1), ("_id", -1)]).limit(limit + 1))
+            
+            older_cursor = None
+            if len(messages) > limit:
+                messages = messages[:limit]
+                older_cursor = (messages[-1]['timestamp'], str(messages[-1]['_id']))
             
             for msg in messages:
                 msg['_id'] = str(msg['_id'])
             
-            return pd.DataFrame(messages) if messages else pd.DataFrame()
+            return messages[::-1], older_cursor
         except Exception as e:
             logger.error(f"Failed to get chat history: {e}")
-            return pd.DataFrame()
+            return [], None
     
     def clear_chat_history(self, user_id):
         """Clear all chat history for a user"""
         try:
             self.db.chat_history.delete_many({"user_id": user_id})
+            self.db.chat_summaries.delete_one({"user_id": user_id})
+            self._notify_change("chat_history", "clear", user_id=user_id)
             logger.info(f"Chat history cleared for user {user_id}")
         except Exception as e:
             logger.error(f"Failed to clear chat history: {e}")
 
+    def get_recent_chat_messages(self, user_id, limit=6):
+        """Newest `limit` messages, returned oldest first"""
+        try:
+            messages = list(self.db.chat_history.find(
+                {"user_id": user_id},
+                {"_id": 0, "role": 1, "content": 1, "timestamp": 1}
+            ).sort([("timestamp", -1), ("_id", -1)]).limit(limit))
+            return messages[::-1]
+        except Exception as e:
+            logger.error(f"Failed to get recent chat messages: {e}")
+            return []
+    
+    def get_chat_messages_between(self, user_id, after=None, before=None, limit=None):
+        """Up to `limit` messages with after < timestamp < before, oldest first (bounds optional)"""
+        try:
+            window = {}
+            if after is not None:
+                window["$gt"] = after
+            if before is not None:
+                window["$lt"] = before
+            query = {"user_id": user_id}
+            if window:
+                query["timestamp"] = window
+            cursor = self.db.chat_history.find(
+                query,
+                {"_id": 0, "role": 1, "content": 1, "timestamp": 1}
+            ).sort("timestamp", 1)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+        except Exception as e:
+            logger.error(f"Failed to get chat messages: {e}")
+            return []
+    
+    def count_chat_messages_after(self, user_id, after=None):
+        """Number of messages newer than `after` (all messages if None)"""
+        try:
+            query = {"user_id": user_id}
+            if after is not None:
+                query["timestamp"] = {"$gt": after}
+            return self.db.chat_history.count_documents(query)
+        except Exception as e:
+            logger.error(f"Failed to count chat messages: {e}")
+            return 0
+    
+    # ==================== CHAT SUMMARIES ====================
+    
+    def get_chat_summary(self, user_id):
+        """Rolling conversation summary for a user, or None"""
+        try:
+            return self.db.chat_summaries.find_one({"user_id": user_id}, {"_id": 0})
+        except Exception as e:
+            logger.error(f"Failed to get chat summary: {e}")
+            return None
+    
+    def save_chat_summary(self, user_id, summary, summarized_until, summarized_messages):
+        """Store the rolling summary covering every message up to summarized_until"""
+        try:
+            self.db.chat_summaries.update_one(
+                {"user_id": user_id},
+                {"$set": {
+                    "summary": summary,
+                    "summarized_until": summarized_until,
+                    "summarized_messages": summarized_messages,
+                    "updated": datetime.now()
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to save chat summary: {e}")
+    
+    # ==================== CAREER PLANS ====================
+    
+    def get_career_plan(self, user_id, kind, input_hash):
+        """Stored plan generated from exactly these inputs, or None"""
+        try:
+            return self.db.career_plans.find_one(
+                {"user_id": user_id, "kind": kind, "input_hash": input_hash},
+                {"_id": 0}
+            )
+        except Exception as e:
+            logger.error(f"Failed to get career plan: {e}")
+            return None
+    
+    def save_career_plan(self, user_id, kind, input_hash, inputs, content, goal_id=None):
+        """Store a generated plan keyed by the hash of its inputs"""
+        try:
+            self.db.career_plans.update_one(
+                {"user_id": user_id, "kind": kind, "input_hash": input_hash},
+                {"$set": {
+                    "goal_id": goal_id,
+                    "inputs": inputs,
+                    "content": content,
+                    "created": datetime.now()
+                }},
+                upsert=True
+            )
+            logger.info(f"Saved {kind} plan for user {user_id}")
+        except Exception as e:
+            logger.error(f"Failed to save career plan: {e}")
+    
+    def get_latest_career_plans(self, user_id, kind):
+        """Newest plan of a kind per goal ({goal_id: plan}; None keys plans without a goal)"""
+        try:
+            plans = self.db.career_plans.find(
+                {"user_id": user_id, "kind": kind},
+                {"_id": 0}
+            ).sort("created", -1)
+            latest = {}
+            for plan in plans:
+                latest.setdefault(plan.get("goal_id"), plan)
+            return latest
+        except Exception as e:
+            logger.error(f"Failed to get career plans: {e}")
+            return {}
+    
     # ==================== QUIZ RESULTS ====================
     
     def save_quiz_result(self, user_id, subject, question_type, question, user_answer, correct_answer, is_correct, difficulty):
@@ -277,6 +623,7 @@ class DatabaseManager:
                 "subject": subject,
                 "question_type": question_type,
                 "question": question,
+                "question_hash": hash_question(question),
                 "user_answer": user_answer,
                 "correct_answer": correct_answer,
                 "is_correct": is_correct,
@@ -305,45 +652,205 @@ class DatabaseManager:
             logger.error(f"Failed to save quiz session: {e}")
             return None
     
+    def save_quiz_attempt(self, user_id, subject, difficulty, results, use_transaction=None):
+        """Save a quiz session and all of its question results together
+        
+        The session _id is assigned client-side so every result carries a
+        session_id back-reference, and all results go in one insert_many
+        instead of one insert per question. With use_transaction (default
+        settings.QUIZ_SAVE_TRANSACTION) both writes commit or neither does.
+        """
+        if use_transaction is None:
+            use_transaction = settings.QUIZ_SAVE_TRANSACTION
+        session_doc, result_docs = build_quiz_attempt_docs(user_id, subject, difficulty, results)
+        
+        def write(session=None):
+            self.db.quiz_sessions.insert_one(session_doc, session=session)
+            if result_docs:
+                self.db.quiz_results.insert_many(result_docs, ordered=False, session=session)
+        
+        try:
+            if use_transaction:
+                with self.client.start_session() as session:
+                    session.with_transaction(lambda s: write(s))
+            else:
+                write()
+            return str(session_doc["_id"])
+        except Exception as e:
+            logger.error(f"Failed to save quiz attempt: {e}")
+            return None
+    
     def get_quiz_history(self, user_id, subject=None):
         """Get quiz history for analytics - optimized with projection"""
         try:
-            query = {"user_id": user_id}
-            if subject:
-                query["subject"] = subject
-            
+            query, projection, sort = user_records_spec("quiz_results", user_id, subject)
+            results = list(self.db.quiz_results.find(query, projection).sort(sort))
+            return records_frame(results, add_id=False)
+        except Exception as e:
+            logger.error(f"Failed to get quiz history: {e}")
+            return pd.DataFrame()
+    
+    def get_quiz_history_page(self, user_id, page_size=None, after=None, subject=None):
+        """One page of quiz results, newest first, by keyset pagination
+        
+        `after` is the cursor returned with the previous page. Returns
+        (DataFrame, next_cursor); next_cursor is None on the last page.
+        """
+        page_size = page_size or settings.QUIZ_HISTORY_PAGE_SIZE
+        try:
             results = list(self.db.quiz_results.find(
-                query,
-                {"_id": 1, "user_id": 1, "subject": 1, "question_type": 1, "question": 1, 
-                 "user_answer": 1, "correct_answer": 1, "is_correct": 1, "difficulty": 1, "taken_at": 1}
-            ).sort("taken_at", -1))
+                quiz_history_query(user_id, subject, after),
+                QUIZ_HISTORY_PROJECTION
+            ).sort([("taken_at", -1), ("_id", -1)]).limit(page_size + 1))
+            
+            next_cursor = None
+            if len(results) > page_size:
+                results = results[:page_size]
+                next_cursor = (results[-1]['taken_at'], str(results[-1]['_id']))
             
             for result in results:
                 result['_id'] = str(result['_id'])
             
-            return pd.DataFrame(results) if results else pd.DataFrame()
+            return (pd.DataFrame(results) if results else pd.DataFrame()), next_cursor
         except Exception as e:
-            logger.error(f"Failed to get quiz history: {e}")
-            return pd.DataFrame()
+            logger.error(f"Failed to get quiz history page: {e}")
+            return pd.DataFrame(), None
+    
+    def iter_quiz_history(self, user_id, subject=None, batch_size=None, fields=None):
+        """Stream quiz results newest first, `batch_size` documents per round trip
+        
+        Only one batch is held in memory at a time; pass `fields` to project
+        down to the columns a consumer needs. A failure part-way through
+        raises, so consumers never mistake a truncated stream for the whole
+        history.
+        """
+        batch_size = batch_size or settings.QUIZ_HISTORY_BATCH_SIZE
+        projection = {field: 1 for field in fields} if fields else QUIZ_HISTORY_PROJECTION
+        try:
+            cursor = self.db.quiz_results.find(
+                quiz_history_query(user_id, subject),
+                projection
+            ).sort([("taken_at", -1), ("_id", -1)]).batch_size(batch_size)
+            
+            with cursor:
+                for result in cursor:
+                    result['_id'] = str(result['_id'])
+                    yield result
+        except Exception as e:
+            logger.error(f"Failed to stream quiz history: {e}")
+            raise CustomException("Failed to stream quiz history", e)
     
     def get_quiz_sessions(self, user_id):
         """Get all quiz session summaries - optimized with projection"""
         try:
-            sessions = list(self.db.quiz_sessions.find(
-                {"user_id": user_id},
-                {"_id": 1, "user_id": 1, "subject": 1, "total_questions": 1, 
-                 "correct_answers": 1, "score_percentage": 1, "difficulty": 1, "created_at": 1}
-            ).sort("created_at", -1))
-            
-            for session in sessions:
-                session['_id'] = str(session['_id'])
-                session['id'] = session['_id']
-            
-            return pd.DataFrame(sessions) if sessions else pd.DataFrame()
+            query, projection, sort = user_records_spec("quiz_sessions", user_id)
+            sessions = list(self.db.quiz_sessions.find(query, projection).sort(sort))
+            return records_frame(sessions)
         except Exception as e:
             logger.error(f"Failed to get quiz sessions: {e}")
             return pd.DataFrame()
     
+    # ==================== DASHBOARD ====================
+    
+    def get_dashboard_summary(self, user_id):
+        """Counts and averages for the sidebar in one aggregation round trip"""
+        try:
+            return summarize_dashboard(self.db.career_goals.aggregate(dashboard_pipeline(user_id)))
+        except Exception as e:
+            logger.error(f"Failed to get dashboard summary: {e}")
+            return summarize_dashboard([])
+    
+    # ==================== QUESTION BANK ====================
+    
+    def add_bank_questions(self, subject, topic, difficulty, question_type, questions):
+        """Store pre-generated questions under a bank key, skipping duplicates"""
+        if not questions:
+            return 0
+        
+        try:
+            key = _bank_key(subject, topic, difficulty, question_type)
+            operations = []
+            for q in questions:
+                question_hash = hash_question(q['question'])
+                operations.append(UpdateOne(
+                    {**key, "question_hash": question_hash},
+                    {"$setOnInsert": {
+                        **key,
+                        "question_hash": question_hash,
+                        "type": q['type'],
+                        "question": q['question'],
+                        "options": q.get('options', []),
+                        "correct_answer": q['correct_answer'],
+                        "created_at": datetime.now()
+                    }},
+                    upsert=True
+                ))
+            
+            result = self.db.question_bank.bulk_write(operations, ordered=False)
+            logger.info(f"Question bank: added {result.upserted_count} questions for {key['topic']}")
+            return result.upserted_count
+        except Exception as e:
+            logger.error(f"Failed to add bank questions: {e}")
+            return 0
+    
+    def draw_bank_questions(self, user_id, subject, topic, difficulty, question_type, count):
+        """Randomly draw up to `count` bank questions the user has not seen yet
+        
+        Seen questions are excluded on the server with a $lookup anti-join on
+        the (user_id, question_hash) index of quiz_results (MongoDB 5.0+), so
+        the draw does not grow with the user's quiz history
+        """
+        try:
+            key = _bank_key(subject, topic, difficulty, question_type)
+            
+            questions = list(self.db.question_bank.aggregate([
+                {"$match": key},
+                {"$lookup": {
+                    "from": "quiz_results",
+                    "localField": "question_hash",
+                    "foreignField": "question_hash",
+                    "pipeline": [{"$match": {"user_id": user_id}}, {"$limit": 1}, {"$project": {"_id": 1}}],
+                    "as": "seen"
+                }},
+                {"$match": {"seen": {"$size": 0}}},
+                {"$sample": {"size": count}},
+                {"$project": {"_id": 0, "type": 1, "question": 1, "options": 1, "correct_answer": 1}}
+            ]))
+            return questions
+        except Exception as e:
+            logger.error(f"Failed to draw bank questions: {e}")
+            return []
+    
+    def count_bank_questions(self, subject, topic, difficulty, question_type):
+        """Number of questions stored under a bank key"""
+        try:
+            return self.db.question_bank.count_documents(_bank_key(subject, topic, difficulty, question_type))
+        except Exception as e:
+            logger.error(f"Failed to count bank questions: {e}")
+            return 0
+    
+    def record_bank_request(self, subject, topic, difficulty, question_type):
+        """Bump the popularity counter the refiller uses to pick keys"""
+        try:
+            self.db.question_bank_keys.update_one(
+                _bank_key(subject, topic, difficulty, question_type),
+                {"$inc": {"requests": 1}, "$set": {"last_requested": datetime.now()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to record bank request: {e}")
+    
+    def get_popular_bank_keys(self, limit=10):
+        """Most requested bank keys, most popular first"""
+        try:
+            return list(self.db.question_bank_keys.find(
+                {},
+                {"_id": 0, "subject": 1, "topic": 1, "difficulty": 1, "question_type": 1, "requests": 1}
+            ).sort("requests", -1).limit(limit))
+        except Exception as e:
+            logger.error(f"Failed to get popular bank keys: {e}")
+            return []
+    
     def close(self):
         """Close MongoDB connection"""
         try:
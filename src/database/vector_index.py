@@ -0,0 +1,318 @@
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+from bson.objectid import ObjectId
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.inference_batcher import embed_text, embed_texts
+from src.llm.scheduler import estimate_tokens
+
+logger = get_logger(__name__)
+
+# Source collections covered by the index and the item type they map to
+INDEXED_COLLECTIONS = {
+    "career_goals": "career_goal",
+    "personal_goals": "personal_goal",
+    "daily_tasks": "task",
+    "chat_history": "chat",
+}
+
+# Past chat turns indexed when a user is backfilled
+BACKFILL_CHAT_LIMIT = 200
+
+
+def _describe(collection, doc):
+    """(text to embed, text shown in the prompt) for a source document"""
+    if collection == "career_goals":
+        semantic = " ".join(filter(None, [doc.get("goal"), doc.get("notes")]))
+        display = f"Career goal: {doc.get('goal')} (Progress: {doc.get('progress', 0)}%, deadline {doc.get('deadline')})"
+        if doc.get("notes"):
+            display += f" - notes: {doc['notes']}"
+    elif collection == "personal_goals":
+        semantic = " ".join(filter(None, [doc.get("goal"), doc.get("category"), doc.get("notes")]))
+        status = "completed" if doc.get("completed") else "in progress"
+        display = f"Personal goal: {doc.get('goal')} ({doc.get('category')}, {status})"
+        if doc.get("notes"):
+            display += f" - notes: {doc['notes']}"
+    elif collection == "daily_tasks":
+        semantic = " ".join(filter(None, [doc.get("task"), doc.get("category")]))
+        status = "done" if doc.get("completed") else "open"
+        display = f"Task: {doc.get('task')} ({doc.get('category')}, {doc.get('priority')} priority, {status})"
+    else:
+        semantic = str(doc.get("content", ""))[:1000]
+        display = f"Earlier {doc.get('role', 'user')} message: {str(doc.get('content', ''))[:500]}"
+    return semantic, display
+
+
+def _text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class _UserMatrix:
+    """In-memory copy of one user's embeddings for fast top-k search"""
+
+    def __init__(self, docs):
+        self.keys = [doc["source_id"] for doc in docs]
+        self.items = [self._item(doc) for doc in docs]
+        self.matrix = (
+            np.asarray([doc["embedding"] for doc in docs], dtype=np.float32) if docs else None
+        )
+
+    @staticmethod
+    def _item(doc):
+        return {
+            "source": doc["source"],
+            "source_id": doc["source_id"],
+            "text": doc["text"],
+            "semantic_text": doc.get("semantic_text", ""),
+            "tokens": doc["tokens"],
+        }
+
+    def upsert(self, doc):
+        row = np.asarray(doc["embedding"], dtype=np.float32).reshape(1, -1)
+        if doc["source_id"] in self.keys:
+            index = self.keys.index(doc["source_id"])
+            self.items[index] = self._item(doc)
+            self.matrix[index] = row
+            return
+        self.keys.append(doc["source_id"])
+        self.items.append(self._item(doc))
+        self.matrix = row if self.matrix is None else np.vstack([self.matrix, row])
+
+    def update_text(self, source_id, text, tokens):
+        if source_id in self.keys:
+            item = self.items[self.keys.index(source_id)]
+            item["text"], item["tokens"] = text, tokens
+
+    def remove(self, source_ids):
+        keep = [i for i, key in enumerate(self.keys) if key not in source_ids]
+        if len(keep) == len(self.keys):
+            return
+        self.keys = [self.keys[i] for i in keep]
+        self.items = [self.items[i] for i in keep]
+        self.matrix = self.matrix[keep] if keep else None
+
+
+class UserVectorIndex:
+    """Per-user embedding index over goals, tasks, notes and past chat turns
+
+    Embeddings live in the `user_embeddings` collection, one document per
+    source item, and are kept current by DatabaseManager change events.
+    Changes are applied in order on a single background worker so writes
+    from the UI never wait on the embedding model; an item is re-embedded
+    only when its semantic text changes (a progress update just refreshes
+    the display text). Searches run against an in-memory matrix per user
+    that is patched in place as changes arrive.
+
+    A user's existing data is backfilled once, in the background, and
+    recorded in `user_embedding_state`; change events that reach
+    `user_embeddings` first do not count as a backfill.
+    """
+
+    def __init__(self, db_manager):
+        self.db = db_manager.db
+        self.collection = self.db.user_embeddings
+        self.state = self.db.user_embedding_state
+        self._users = {}
+        self._backfilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vector-index")
+
+        try:
+            self.collection.create_index([("user_id", 1), ("source_id", 1)], unique=True)
+            self.collection.create_index([("source_id", 1)])
+            self.state.create_index([("user_id", 1)], unique=True)
+        except Exception as e:
+            logger.warning(f"Vector index creation warning: {e}")
+
+        db_manager.add_change_listener(self.on_change)
+
+    def on_change(self, collection, operation, doc_id=None, user_id=None):
+        """DatabaseManager change listener; queues the index update"""
+        if collection not in INDEXED_COLLECTIONS:
+            return
+        self._executor.submit(self._apply_change, collection, operation, doc_id, user_id)
+
+    def search(self, user_id, query, k=None, token_budget=None, min_score=None, exclude_text=None):
+        """Top-k items most relevant to query that fit within token_budget
+
+        Returns a list of {'source', 'text', 'score', 'tokens'} ordered by
+        relevance, or None when the embedding model is unavailable or the
+        user's backfill has not finished yet.
+        """
+        k = k or settings.CONTEXT_TOP_K
+        token_budget = token_budget or settings.CONTEXT_TOKEN_BUDGET
+        min_score = settings.CONTEXT_MIN_SCORE if min_score is None else min_score
+
+        try:
+            query_embedding = np.asarray(embed_text(query), dtype=np.float32).reshape(-1)
+        except Exception as e:
+            logger.warning(f"Vector search unavailable: {e}")
+            return None
+
+        user = self._load_user(user_id)
+        with self._lock:
+            if user_id in self._backfilling:
+                return None
+            if user.matrix is None:
+                return []
+            scores = user.matrix @ query_embedding
+            ranked = [(float(scores[i]), dict(user.items[i])) for i in np.argsort(-scores)]
+
+        results, used = [], 0
+        for score, item in ranked:
+            if len(results) >= k or score < min_score:
+                break
+            if exclude_text and item["semantic_text"] == exclude_text[:1000]:
+                continue
+            if used + item["tokens"] > token_budget:
+                continue
+            used += item["tokens"]
+            results.append({"source": item["source"], "text": item["text"], "score": score, "tokens": item["tokens"]})
+        return results
+
+    def rebuild_user(self, user_id):
+        """Backfill the index from a user's existing goals, tasks and recent chat"""
+        sources = []
+        for collection in INDEXED_COLLECTIONS:
+            cursor = self.db[collection].find({"user_id": user_id})
+            if collection == "chat_history":
+                cursor = cursor.sort("timestamp", -1).limit(BACKFILL_CHAT_LIMIT)
+            sources.extend((collection, doc) for doc in cursor)
+        self._index_documents(sources)
+        self.state.update_one(
+            {"user_id": user_id}, {"$set": {"backfilled": datetime.now()}}, upsert=True
+        )
+        logger.info(f"Vector index backfilled for user {user_id} ({len(sources)} items)")
+
+    def flush(self, timeout=None):
+        """Wait for queued index updates to be applied"""
+        self._executor.submit(lambda: None).result(timeout=timeout)
+
+    def _load_user(self, user_id):
+        """In-memory matrix for a user, queueing a backfill if none was recorded"""
+        with self._lock:
+            user = self._users.get(user_id)
+        if user is not None:
+            return user
+
+        projection = {"source": 1, "source_id": 1, "text": 1, "semantic_text": 1, "tokens": 1, "embedding": 1}
+        docs = list(self.collection.find({"user_id": user_id}, projection))
+        backfilled = self.state.find_one({"user_id": user_id}) is not None
+
+        with self._lock:
+            user = self._users.setdefault(user_id, _UserMatrix(docs))
+            if not backfilled and user_id not in self._backfilling:
+                self._backfilling.add(user_id)
+                self._executor.submit(self._backfill, user_id)
+        return user
+
+    def _backfill(self, user_id):
+        """Run rebuild_user on the index worker; a failure is retried on the next search"""
+        try:
+            self.rebuild_user(user_id)
+        except Exception as e:
+            logger.warning(f"Vector index backfill failed for user {user_id}: {e}")
+            with self._lock:
+                self._users.pop(user_id, None)
+        finally:
+            with self._lock:
+                self._backfilling.discard(user_id)
+
+    def _apply_change(self, collection, operation, doc_id, user_id):
+        """Apply one queued change; failures are logged and skipped"""
+        try:
+            if operation == "delete":
+                self._remove({"source_id": str(doc_id)}, user_id, {str(doc_id)})
+            elif operation == "clear":
+                source = INDEXED_COLLECTIONS[collection]
+                removed = {doc["source_id"] for doc in self.collection.find({"user_id": user_id, "source": source}, {"source_id": 1})}
+                self._remove({"user_id": user_id, "source": source}, user_id, removed)
+            else:
+                doc = self.db[collection].find_one({"_id": ObjectId(doc_id)})
+                if doc is not None:
+                    self._index_document(collection, doc)
+        except Exception as e:
+            logger.warning(f"Vector index update failed for {collection} {operation} {doc_id}: {e}")
+
+    def _index_document(self, collection, doc):
+        """Upsert one source document, re-embedding only if its meaning changed"""
+        self._index_documents([(collection, doc)])
+
+    def _index_documents(self, sources):
+        """Upsert (collection, doc) pairs, embedding the changed ones in one batch"""
+        pending = []
+        for collection, doc in sources:
+            semantic, display = _describe(collection, doc)
+            if semantic.strip():
+                pending.append((collection, doc["user_id"], str(doc["_id"]), semantic, display))
+        if not pending:
+            return
+
+        existing = {
+            (row["user_id"], row["source_id"]): row.get("semantic_hash")
+            for row in self.collection.find(
+                {"source_id": {"$in": [item[2] for item in pending]}},
+                {"user_id": 1, "source_id": 1, "semantic_hash": 1}
+            )
+        }
+
+        changed = []
+        for collection, user_id, source_id, semantic, display in pending:
+            if existing.get((user_id, source_id)) != _text_hash(semantic):
+                changed.append((collection, user_id, source_id, semantic, display))
+                continue
+            # Same meaning: only the display text (e.g. progress) is refreshed
+            tokens = estimate_tokens(display)
+            self.collection.update_one(
+                {"user_id": user_id, "source_id": source_id},
+                {"$set": {"text": display, "tokens": tokens, "updated": datetime.now()}}
+            )
+            with self._lock:
+                if user_id in self._users:
+                    self._users[user_id].update_text(source_id, display, tokens)
+
+        if not changed:
+            return
+        embeddings = embed_texts([item[3] for item in changed])
+        for (collection, user_id, source_id, semantic, display), embedding in zip(changed, embeddings):
+            entry = {
+                "user_id": user_id,
+                "source": INDEXED_COLLECTIONS[collection],
+                "source_id": source_id,
+                "text": display,
+                "semantic_text": semantic,
+                "semantic_hash": _text_hash(semantic),
+                "tokens": estimate_tokens(display),
+                "embedding": np.asarray(embedding, dtype=np.float32).tolist(),
+                "updated": datetime.now(),
+            }
+            self.collection.update_one({"user_id": user_id, "source_id": source_id}, {"$set": entry}, upsert=True)
+            with self._lock:
+                if user_id in self._users:
+                    self._users[user_id].upsert(entry)
+
+    def _remove(self, query, user_id, source_ids):
+        self.collection.delete_many(query)
+        with self._lock:
+            users = [self._users[user_id]] if user_id in self._users else list(self._users.values())
+            for user in users:
+                user.remove(source_ids)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index(db_manager):
+    """Process-wide vector index, or None when VECTOR_INDEX_ENABLED is false"""
+    global _index
+    if not settings.VECTOR_INDEX_ENABLED:
+        return None
+
+    with _index_lock:
+        if _index is None:
+            _index = UserVectorIndex(db_manager)
+        return _index
@@ -1,64 +1,116 @@
-from langchain_groq import ChatGroq
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 # from langchain.prompts import PromptTemplate
 from langchain_core.prompts import PromptTemplate
 from src.config.settings import settings
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
-
-# HuggingFace imports
-from sentence_transformers import SentenceTransformer
-from transformers import pipeline
-import torch
+from src.common.model_registry import LazyModel, EMBEDDING_TASK, SENTIMENT_TASK
+from src.common.inference_batcher import embed_text, classify_sentiment
+from src.common.tiered_sentiment import TieredSentimentAnalyzer
+from src.database.db_manager import hash_plan_inputs
+from src.database.vector_index import get_vector_index
+from src.generators.conversation_memory import ConversationMemory
+from src.prompts.career_templates import goal_breakdown_template, skill_gap_analysis_template
+from src.llm.cache import get_llm_cache
+from src.llm.semantic_cache import get_semantic_cache, context_fingerprint
+from src.llm.backends import create_chat_model
+from src.llm.scheduler import get_llm_scheduler, PRIORITY_INTERACTIVE, PRIORITY_STANDARD
 
 logger = get_logger(__name__)
 
+PLAN_MILESTONES = "milestones"
+PLAN_SKILL_GAP = "skill_gap"
+
 class CareerAdvisor:
-    def __init__(self):
-        """Initialize Career Advisor with Groq LLM and HuggingFace models"""
-        # Groq for main generation
-        self.llm = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
-            model=settings.GROQ_MODEL,
-            temperature=settings.GROQ_TEMPERATURE
-        )
+    def __init__(self, db_manager=None):
+        """Initialize Career Advisor with Groq LLM and HuggingFace models
         
-        # HuggingFace embeddings for context retrieval
-        try:
-            self.embedding_model = SentenceTransformer(settings.HF_EMBEDDING_MODEL)
-            logger.info(f"Loaded HuggingFace embedding model: {settings.HF_EMBEDDING_MODEL}")
-        except Exception as e:
-            logger.warning(f"Failed to load embeddings: {e}")
-            self.embedding_model = None
+        With a db_manager, chat context is retrieved from the per-user
+        vector index instead of the first few goals and tasks, and prompts
+        carry a bounded conversation history
+        """
+        # Groq (or the offline backend selected by LLM_BACKEND) for main generation
+        self.llm = create_chat_model()
         
-        # HuggingFace sentiment analysis for user emotion detection
-        try:
-            self.sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model=settings.HF_SENTIMENT_MODEL,
-                device=0 if torch.cuda.is_available() else -1
-            )
-            logger.info(f"Loaded HuggingFace sentiment model: {settings.HF_SENTIMENT_MODEL}")
-        except Exception as e:
-            logger.warning(f"Failed to load sentiment analyzer: {e}")
-            self.sentiment_analyzer = None
+        # HuggingFace models are shared through the model registry and only
+        # loaded on first use, so constructing the advisor stays cheap
+        self._embedding = LazyModel(settings.HF_EMBEDDING_MODEL, EMBEDDING_TASK)
+        self._sentiment = LazyModel(settings.HF_SENTIMENT_MODEL, SENTIMENT_TASK)
+        
+        # TextBlob handles clear-cut messages; only ambiguous ones reach RoBERTa
+        self.sentiment_tiers = TieredSentimentAnalyzer(
+            self._transformer_sentiment,
+            threshold=settings.SENTIMENT_FAST_THRESHOLD,
+            memo_size=settings.SENTIMENT_MEMO_SIZE
+        ) if settings.SENTIMENT_TIERED_ENABLED else None
+        
+        self.db_manager = db_manager
+        self.vector_index = get_vector_index(db_manager) if db_manager is not None else None
+        self.memory = (
+            ConversationMemory(db_manager, self.llm)
+            if db_manager is not None and settings.CHAT_MEMORY_ENABLED else None
+        )
+        
+        # Pre-LLM stages of a chat turn (sentiment, data loads, retrieval,
+        # history) run concurrently on this pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.CHAT_PIPELINE_WORKERS, thread_name_prefix="chat-turn"
+        )
+        self._stage_timings = {}
+        self._timings_lock = threading.Lock()
         
         self.logger = get_logger(self.__class__.__name__)
     
+    @property
+    def embedding_model(self):
+        """Shared embedding model for context retrieval, or None if unavailable"""
+        return self._embedding.get()
+    
+    @property
+    def sentiment_analyzer(self):
+        """Shared sentiment pipeline for user emotion detection, or None if unavailable"""
+        return self._sentiment.get()
+    
+    def _invoke_llm(self, prompt: str, use_cache: bool = True, priority: int = PRIORITY_INTERACTIVE) -> str:
+        """Invoke the LLM through the shared scheduler, serving identical prompts from the response cache when allowed"""
+        scheduler = get_llm_scheduler()
+        invoke = lambda text: scheduler.invoke(self.llm, text, priority=priority)
+        
+        cache = get_llm_cache() if use_cache else None
+        if cache is None:
+            return invoke(prompt).content
+        return cache.invoke(self.llm, prompt, invoke_fn=invoke)
+    
     def analyze_user_sentiment(self, user_message: str) -> dict:
         """
-        Analyze sentiment of user message using HuggingFace
+        Analyze sentiment of user message, escalating to HuggingFace only
+        when the lexicon pass is not confident
         Returns: {'label': 'positive/negative/neutral', 'score': float}
         """
+        if self.sentiment_tiers is not None:
+            result = self.sentiment_tiers.analyze(user_message)
+            logger.info(f"Sentiment: {result['label']} ({result['score']:.2f}, {result['tier']})")
+            return result
+        
+        return self._transformer_sentiment(user_message) or {"label": "neutral", "score": 0.5}
+    
+    def _transformer_sentiment(self, user_message: str):
+        """RoBERTa sentiment for a message, or None if the model is unavailable"""
         if not self.sentiment_analyzer:
-            return {"label": "neutral", "score": 0.5}
+            return None
         
         try:
-            result = self.sentiment_analyzer(user_message[:512])[0]  # Limit to 512 chars
-            logger.info(f"Sentiment: {result['label']} ({result['score']:.2f})")
+            # Batched with other sessions' messages; limit to 512 chars
+            result = classify_sentiment(user_message[:512], settings.HF_SENTIMENT_MODEL)
+            logger.info(f"Transformer sentiment: {result['label']} ({result['score']:.2f})")
             return result
         except Exception as e:
             logger.warning(f"Sentiment analysis failed: {e}")
-            return {"label": "neutral", "score": 0.5}
+            return None
     
     def get_context_embedding(self, context: str):
         """Get embedding for context using HuggingFace"""
@@ -66,36 +118,156 @@ class CareerAdvisor:
             return None
         
         try:
-            embedding = self.embedding_model.encode(context)
+            embedding = embed_text(context, settings.HF_EMBEDDING_MODEL)
             return embedding
         except Exception as e:
             logger.warning(f"Embedding generation failed: {e}")
             return None
     
-    def generate_career_advice(self, user_query: str, career_goals: list, personal_goals: list, tasks: list) -> str:
+    def generate_career_advice(self, user_query: str, career_goals: list, personal_goals: list, tasks: list, use_cache: bool = True, user_id: str = None) -> str:
         """
         Generate personalized career advice based on user goals and current state
         Uses HuggingFace for sentiment analysis and Groq for generation
+        Identical prompts (same question, goals and tone) are served from the
+        LLM response cache, and near-identical self-contained questions in the
+        same context from the semantic cache, unless use_cache is False
         """
         try:
-            # Analyze user sentiment
-            sentiment = self.analyze_user_sentiment(user_query)
+            formatted_prompt, fingerprint = self._build_advice_prompt(user_query, career_goals, personal_goals, tasks, user_id)
             
-            # Build context from user data
-            context = self._build_context(career_goals, personal_goals, tasks)
+            semantic_cache = get_semantic_cache() if use_cache and fingerprint is not None else None
+            query_embedding = None
+            if semantic_cache is not None:
+                cached, query_embedding = semantic_cache.lookup(user_query, fingerprint, user_id)
+                if cached is not None:
+                    return cached
             
-            # Adjust tone based on sentiment
-            tone_instruction = self._get_tone_instruction(sentiment)
+            # Generate response with Groq
+            response = self._invoke_llm(formatted_prompt, use_cache=use_cache)
+            if semantic_cache is not None:
+                semantic_cache.store(user_query, fingerprint, response, user_id, query_embedding)
+            
+            self.logger.info("Career advice generated successfully")
+            return response
+        
+        except Exception as e:
+            self.logger.error(f"Failed to generate career advice: {e}")
+            raise CustomException("Career advice generation failed", e)
+    
+    def stream_career_advice(self, user_query: str, career_goals: list, personal_goals: list, tasks: list, use_cache: bool = True, user_id: str = None):
+        """
+        Streaming variant of generate_career_advice that yields text chunks as
+        the LLM produces them. A cached answer is yielded in one piece, and a
+        completed stream is written back to both caches. Time-to-first-token is
+        logged for every turn.
+        """
+        started = time.perf_counter()
+        try:
+            formatted_prompt, fingerprint = self._build_advice_prompt(user_query, career_goals, personal_goals, tasks, user_id)
+            
+            semantic_cache = get_semantic_cache() if use_cache and fingerprint is not None else None
+            query_embedding = None
+            if semantic_cache is not None:
+                cached, query_embedding = semantic_cache.lookup(user_query, fingerprint, user_id)
+                if cached is not None:
+                    self.logger.info(f"Career advice served from semantic cache in {(time.perf_counter() - started) * 1000:.0f}ms")
+                    yield cached
+                    return
+            
+            cache = get_llm_cache() if use_cache else None
+            if cache is not None:
+                key = cache.key_for(self.llm, formatted_prompt)
+                cached = cache.get(key)
+                if cached is not None:
+                    self.logger.info(f"Career advice served from cache in {(time.perf_counter() - started) * 1000:.0f}ms")
+                    yield cached
+                    return
+            
+            parts = []
+            ttft_ms = None
+            # The scheduler retries failures before the first chunk with backoff
+            llm_started = time.perf_counter()
+            for chunk in get_llm_scheduler().stream(self.llm, formatted_prompt, PRIORITY_INTERACTIVE):
+                if not chunk.content:
+                    continue
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                    self.logger.info(
+                        f"Career advice TTFT: {ttft_ms:.0f}ms "
+                        f"(LLM {(time.perf_counter() - llm_started) * 1000:.0f}ms)"
+                    )
+                parts.append(chunk.content)
+                yield chunk.content
+            
+            response = "".join(parts)
+            if cache is not None and response:
+                cache.set(key, response)
+            if semantic_cache is not None:
+                semantic_cache.store(user_query, fingerprint, response, user_id, query_embedding)
+            
+            self.logger.info(
+                f"Career advice streamed: {len(parts)} chunks, "
+                f"total {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+        
+        except Exception as e:
+            self.logger.error(f"Failed to stream career advice: {e}")
+            raise CustomException("Career advice generation failed", e)
+    
+    def _build_advice_prompt(self, user_query: str, career_goals, personal_goals, tasks, user_id: str = None) -> tuple:
+        """Render the sentiment-aware career advice prompt
+        
+        Returns (prompt, fingerprint), where the fingerprint hashes the tone
+        and the goal and task items in the context for the semantic cache.
+        The fingerprint is None when the prompt carries conversation history:
+        the answer may then depend on earlier turns ("tell me more"), which
+        question similarity alone cannot tell apart, so it is not cached
+        
+        career_goals, personal_goals and tasks may be lists or zero-argument
+        loaders. Loaders start speculatively alongside the other stages, so
+        the fallback never waits for retrieval first; their results are
+        only used when retrieval gives no context. They are called on
+        worker threads, so they must not touch Streamlit APIs such as
+        st.cache_data. Every stage is timed
+        """
+        sources = {"career_goals": career_goals, "personal_goals": personal_goals, "tasks": tasks}
+        stages = {
+            "sentiment": lambda: self.analyze_user_sentiment(user_query),
+            # Most relevant user data items; None means fall back to the latest goals and tasks
+            "retrieval": lambda: self._retrieve_context(user_id, user_query),
+            # Rolling summary plus the latest messages, within a fixed budget
+            "history": lambda: self.memory.build_history(user_id, user_query) if self.memory and user_id else "",
+            # Latest goals and tasks, discarded when retrieval finds context
+            **{name: self._speculative(name, source) for name, source in sources.items() if callable(source)},
+        }
+        results = self._run_stages(stages)
+        sentiment = results["sentiment"]
+        history = results["history"]
+        items = results["retrieval"]
+        if items:
+            context = "\n".join(f"- {item['text']}" for item in items)
+            # Past chat turns are context for the prompt, not for the cache
+            # key: a repeated question retrieves its own earlier exchange
+            user_data = sorted(item["text"] for item in items if item["source"] != "chat")
+        else:
+            fallback = {name: results.get(name, source) for name, source in sources.items()}
+            context = self._build_context(fallback["career_goals"], fallback["personal_goals"], fallback["tasks"])
+            user_data = [context]
+        
+        history_section = f"\nConversation So Far:\n{history}\n" if history else ""
+        
+        # Adjust tone based on sentiment
+        tone_instruction = self._get_tone_instruction(sentiment)
+        
+        # Create prompt
+        prompt = PromptTemplate(
+            template="""You are an expert career coach and life advisor. 
             
-            # Create prompt
-            prompt = PromptTemplate(
-                template="""You are an expert career coach and life advisor. 
-                
 {tone_instruction}
 
 User Context:
 {context}
-
+{history}
 User Question: {query}
 
 Provide personalized, actionable advice that:
@@ -105,24 +277,105 @@ Provide personalized, actionable advice that:
 4. Is encouraging and supportive
 
 Response:""",
-                input_variables=["tone_instruction", "context", "query"]
-            )
-            
-            formatted_prompt = prompt.format(
-                tone_instruction=tone_instruction,
-                context=context,
-                query=user_query
+            input_variables=["tone_instruction", "context", "history", "query"]
+        )
+        
+        formatted_prompt = prompt.format(
+            tone_instruction=tone_instruction,
+            context=context,
+            history=history_section,
+            query=user_query
+        )
+        # Retrieved chat turns are left out of the key (a repeated question
+        # retrieves its own earlier exchange); a conversation-dependent
+        # prompt is not semantically cached at all
+        if history:
+            return formatted_prompt, None
+        return formatted_prompt, context_fingerprint(tone_instruction, *user_data)
+    
+    def _run_stages(self, stages: dict) -> dict:
+        """Run independent stages in parallel and record how long each took"""
+        started = time.perf_counter()
+        
+        def timed(fn):
+            stage_started = time.perf_counter()
+            result = fn()
+            return result, (time.perf_counter() - stage_started) * 1000
+        
+        futures = {name: self._executor.submit(timed, fn) for name, fn in stages.items()}
+        results, timings = {}, {}
+        for name, future in futures.items():
+            results[name], timings[name] = future.result()
+        timings["prepare_total"] = (time.perf_counter() - started) * 1000
+        
+        with self._timings_lock:
+            for name, ms in timings.items():
+                self._stage_timings.setdefault(name, deque(maxlen=200)).append(ms)
+        
+        self.logger.info(
+            "Chat turn prepared in {:.0f}ms ({})".format(
+                timings["prepare_total"],
+                ", ".join(f"{name}={ms:.0f}ms" for name, ms in timings.items() if name != "prepare_total")
             )
-            
-            # Generate response with Groq
-            response = self.llm.invoke(formatted_prompt)
-            
-            self.logger.info("Career advice generated successfully")
-            return response.content
+        )
+        return results
+    
+    def _speculative(self, name: str, loader):
+        """Wrap a fallback loader so its failure cannot fail a turn that has retrieved context"""
+        def run():
+            try:
+                return loader()
+            except Exception as e:
+                self.logger.warning(f"Fallback {name} load failed: {e}")
+                return []
+        return run
+    
+    def pipeline_metrics(self) -> list:
+        """Average, p95 and max milliseconds per pre-LLM stage over recent turns"""
+        with self._timings_lock:
+            timings = {name: sorted(values) for name, values in self._stage_timings.items()}
         
+        return [
+            {
+                "stage": name,
+                "turns": len(values),
+                "avg_ms": sum(values) / len(values),
+                "p95_ms": values[int(0.95 * (len(values) - 1))],
+                "max_ms": values[-1],
+            }
+            for name, values in timings.items() if values
+        ]
+    
+    def update_conversation_memory(self, user_id: str):
+        """Fold older messages into the user's rolling summary in the background"""
+        if self.memory and user_id:
+            self.memory.schedule_update(user_id)
+    
+    def _retrieve_context(self, user_id: str, user_query: str):
+        """Top-k goals, tasks and past messages relevant to the query, within CONTEXT_TOKEN_BUDGET
+        
+        Returns the vector index items, or None when retrieval is unavailable
+        or fails, or nothing clears CONTEXT_MIN_SCORE (e.g. "what should I do
+        next?"), so the caller falls back to the latest goals and tasks
+        """
+        if self.vector_index is None or not user_id:
+            return None
+        
+        started = time.perf_counter()
+        try:
+            items = self.vector_index.search(user_id, user_query, exclude_text=user_query)
         except Exception as e:
-            self.logger.error(f"Failed to generate career advice: {e}")
-            raise CustomException("Career advice generation failed", e)
+            # e.g. a transient MongoDB error loading the user's vectors
+            self.logger.warning(f"Context retrieval failed, using latest goals and tasks: {e}")
+            return None
+        if items is None:
+            return None
+        
+        self.logger.info(
+            f"Retrieved {len(items)} context items ({sum(i['tokens'] for i in items)} tokens) "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return items or None
     
     def _build_context(self, career_goals: list, personal_goals: list, tasks: list) -> str:
         """Build context string from user data"""
@@ -154,7 +407,7 @@ Response:""",
         else:
             return "Maintain a balanced, professional yet warm tone."
     
-    def generate_goal_suggestions(self, user_profile: dict, goal_type: str = "career") -> list:
+    def generate_goal_suggestions(self, user_profile: dict, goal_type: str = "career", use_cache: bool = True) -> list:
         """
         Generate personalized goal suggestions based on user profile
         
@@ -183,13 +436,13 @@ Goals:""",
             
             profile_str = "\n".join([f"{k}: {v}" for k, v in user_profile.items()])
             
-            response = self.llm.invoke(prompt.format(
+            response = self._invoke_llm(prompt.format(
                 goal_type=goal_type,
                 profile=profile_str
-            ))
+            ), use_cache=use_cache, priority=PRIORITY_STANDARD)
             
             # Parse numbered list
-            goals = [line.strip() for line in response.content.split('\n') if line.strip() and line[0].isdigit()]
+            goals = [line.strip() for line in response.split('\n') if line.strip() and line[0].isdigit()]
             
             self.logger.info(f"Generated {len(goals)} {goal_type} goal suggestions")
             return goals[:5]
@@ -197,3 +450,85 @@ Goals:""",
         except Exception as e:
             self.logger.error(f"Failed to generate goal suggestions: {e}")
             return []
+    
+    @staticmethod
+    def goal_breakdown_inputs(goal: str, deadline: str, progress: int) -> dict:
+        """Inputs a milestone plan depends on; progress only counts per PLAN_PROGRESS_BUCKET"""
+        bucket = max(1, settings.PLAN_PROGRESS_BUCKET)
+        return {
+            "goal": " ".join(str(goal).split()),
+            "deadline": str(deadline),
+            "progress": min(100, int(progress) // bucket * bucket),
+        }
+    
+    @staticmethod
+    def skill_gap_inputs(current_role: str, target_role: str, current_skills) -> dict:
+        """Inputs a skill-gap report depends on, normalized so reordering skills is a no-op"""
+        if isinstance(current_skills, str):
+            current_skills = current_skills.split(",")
+        skills = sorted({s.strip().lower() for s in current_skills if s.strip()})
+        return {
+            "current_role": " ".join(current_role.split()).lower(),
+            "target_role": " ".join(target_role.split()).lower(),
+            "current_skills": skills,
+        }
+    
+    @staticmethod
+    def plan_input_hash(kind: str, inputs: dict, goal_id: str = None) -> str:
+        """Key a stored plan is looked up by; goal plans are keyed per goal"""
+        if goal_id is not None:
+            return hash_plan_inputs({"kind": kind, "goal_id": goal_id, **inputs})
+        return hash_plan_inputs({"kind": kind, **inputs})
+    
+    def get_goal_breakdown(self, user_id: str, goal: str, deadline: str, progress: int, goal_id: str = None, force: bool = False) -> dict:
+        """
+        Milestone plan for a career goal, generated only when the goal text,
+        deadline or progress bucket changed since the stored plan
+        
+        Returns: {'content': str, 'created': datetime, 'cached': bool}
+        """
+        inputs = self.goal_breakdown_inputs(goal, deadline, progress)
+        prompt = goal_breakdown_template.format(**inputs)
+        return self._get_or_create_plan(user_id, PLAN_MILESTONES, inputs, prompt, goal_id, force)
+    
+    def get_skill_gap_analysis(self, user_id: str, current_role: str, target_role: str, current_skills, force: bool = False) -> dict:
+        """
+        Skill-gap report for a career transition, generated only for new
+        (current role, target role, skills) combinations
+        
+        Returns: {'content': str, 'created': datetime, 'cached': bool}
+        """
+        inputs = self.skill_gap_inputs(current_role, target_role, current_skills)
+        prompt = skill_gap_analysis_template.format(
+            current_role=inputs["current_role"],
+            target_role=inputs["target_role"],
+            current_skills=", ".join(inputs["current_skills"]) or "none listed"
+        )
+        return self._get_or_create_plan(user_id, PLAN_SKILL_GAP, inputs, prompt, None, force)
+    
+    def _get_or_create_plan(self, user_id, kind, inputs, prompt, goal_id, force):
+        """Serve a stored plan for identical inputs, otherwise generate and persist one"""
+        input_hash = self.plan_input_hash(kind, inputs, goal_id)
+        
+        if self.db_manager is not None and not force:
+            stored = self.db_manager.get_career_plan(user_id, kind, input_hash)
+            if stored is not None:
+                self.logger.info(f"Reusing stored {kind} plan")
+                return {"content": stored["content"], "created": stored["created"], "cached": True}
+        
+        try:
+            content = self._invoke_llm(prompt, use_cache=not force, priority=PRIORITY_STANDARD)
+        except Exception as e:
+            self.logger.error(f"Failed to generate {kind} plan: {e}")
+            raise CustomException(f"{kind} plan generation failed", e)
+        
+        if self.db_manager is not None:
+            self.db_manager.save_career_plan(user_id, kind, input_hash, inputs, content, goal_id)
+        self.logger.info(f"Generated {kind} plan")
+        return {"content": content, "created": datetime.now(), "cached": False}
+    
+    def close(self):
+        """Release shared HuggingFace models back to the registry"""
+        self._executor.shutdown(wait=False)
+        self._embedding.release()
+        self._sentiment.release()
@@ -0,0 +1,128 @@
+import threading
+import time
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.prompts.career_templates import conversation_summary_template
+from src.llm.scheduler import get_llm_scheduler, estimate_tokens, PRIORITY_BACKGROUND
+
+logger = get_logger(__name__)
+
+# Longest slice of a single raw message kept in the prompt
+MESSAGE_MAX_CHARS = 600
+
+# Oldest unsummarized messages folded into the summary per update
+MAX_MESSAGES_PER_UPDATE = 40
+
+
+def _format_message(message):
+    return f"{message['role']}: {str(message['content'])[:MESSAGE_MAX_CHARS]}"
+
+
+class ConversationMemory:
+    """Bounded chat history for advice prompts
+
+    Each prompt gets the user's rolling summary plus the newest raw
+    messages that fit in CHAT_HISTORY_TOKEN_BUDGET. Once enough messages
+    have scrolled out of the raw window, they are folded into the summary
+    by a background LLM call, so prompt size stays flat however long the
+    conversation runs.
+    """
+
+    def __init__(self, db_manager, llm):
+        self.db = db_manager
+        self.llm = llm
+        self._updating = set()
+        self._lock = threading.Lock()
+
+    def build_history(self, user_id, current_query=None):
+        """Summary plus recent messages for the prompt, or "" for a new conversation"""
+        recent_limit = settings.CHAT_RECENT_MESSAGES
+        recent = self.db.get_recent_chat_messages(user_id, recent_limit + 1)
+        # The current question is saved before the reply is generated
+        if recent and recent[-1]["role"] == "user" and recent[-1]["content"] == current_query:
+            recent = recent[:-1]
+        recent = recent[-recent_limit:] if recent_limit > 0 else []
+
+        budget = settings.CHAT_HISTORY_TOKEN_BUDGET
+        summary_doc = self.db.get_chat_summary(user_id)
+        summary = (summary_doc or {}).get("summary", "")
+        if summary and estimate_tokens(summary) > budget // 2:
+            summary = summary[:(budget // 2) * 4]
+        summary_tokens = estimate_tokens(summary) if summary else 0
+
+        remaining = budget - summary_tokens
+        lines = []
+        for message in reversed(recent):
+            line = _format_message(message)
+            tokens = estimate_tokens(line)
+            if tokens > remaining:
+                break
+            lines.insert(0, line)
+            remaining -= tokens
+
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation: {summary}")
+        if lines:
+            parts.append("Recent messages:\n" + "\n".join(lines))
+
+        if parts:
+            logger.info(
+                f"Chat history: summary {summary_tokens} tokens + {len(lines)} messages "
+                f"{budget - summary_tokens - remaining} tokens (budget {budget})"
+            )
+        return "\n\n".join(parts)
+
+    def update_summary(self, user_id):
+        """Fold messages older than the raw window into the summary; returns True if it changed"""
+        summary_doc = self.db.get_chat_summary(user_id) or {}
+        summarized_until = summary_doc.get("summarized_until")
+
+        pending = self.db.count_chat_messages_after(user_id, summarized_until)
+        if pending < settings.CHAT_RECENT_MESSAGES + settings.CHAT_SUMMARY_EVERY:
+            return False
+
+        # Messages still inside the raw window stay out of the summary
+        recent = self.db.get_recent_chat_messages(user_id, settings.CHAT_RECENT_MESSAGES)
+        boundary = recent[0]["timestamp"] if recent and settings.CHAT_RECENT_MESSAGES > 0 else None
+        to_fold = self.db.get_chat_messages_between(user_id, summarized_until, boundary, limit=MAX_MESSAGES_PER_UPDATE)
+        if not to_fold:
+            return False
+
+        started = time.perf_counter()
+        prompt = conversation_summary_template.format(
+            summary=summary_doc.get("summary") or "(none yet)",
+            messages="\n".join(_format_message(message) for message in to_fold),
+            max_words=settings.CHAT_SUMMARY_MAX_WORDS
+        )
+        summary = get_llm_scheduler().invoke(self.llm, prompt, priority=PRIORITY_BACKGROUND).content.strip()
+
+        self.db.save_chat_summary(
+            user_id,
+            summary,
+            to_fold[-1]["timestamp"],
+            summary_doc.get("summarized_messages", 0) + len(to_fold)
+        )
+        logger.info(
+            f"Chat summary updated with {len(to_fold)} messages "
+            f"({estimate_tokens(summary)} tokens) in {time.perf_counter() - started:.2f}s"
+        )
+        return True
+
+    def schedule_update(self, user_id):
+        """Update the summary on a background thread, at most one per user at a time"""
+        with self._lock:
+            if user_id in self._updating:
+                return
+            self._updating.add(user_id)
+
+        def run():
+            try:
+                self.update_summary(user_id)
+            except Exception as e:
+                logger.warning(f"Chat summary update failed for {user_id}: {e}")
+            finally:
+                with self._lock:
+                    self._updating.discard(user_id)
+
+        threading.Thread(target=run, name="chat-summary", daemon=True).start()
@@ -0,0 +1,113 @@
+import threading
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.generators.question_generator import QuestionGenerator
+from src.llm.scheduler import PRIORITY_BACKGROUND
+from src.utils.helpers import QuizManager
+
+logger = get_logger(__name__)
+
+
+class QuestionBank:
+    """Pre-generated quiz questions stored in MongoDB
+
+    Questions are keyed by (subject, topic, difficulty, question_type).
+    Quizzes draw unseen questions from the bank and only fall back to live
+    generation for the shortfall; a background refiller keeps the most
+    requested keys above a low-water mark.
+    """
+
+    def __init__(self, db_manager, generator=None):
+        self.db = db_manager
+        self._generator = generator
+        self._stop_event = threading.Event()
+        self._refill_thread = None
+        self._refill_lock = threading.Lock()
+
+    def draw(self, user_id, subject, topic, difficulty, question_type, count):
+        """Return up to `count` quiz-ready questions the user has not seen"""
+        self.db.record_bank_request(subject, topic, difficulty, question_type)
+
+        questions = self.db.draw_bank_questions(user_id, subject, topic, difficulty, question_type, count)
+        for q in questions:
+            q['subject'] = subject
+            q['difficulty'] = difficulty
+            if q['type'] != 'MCQ':
+                q.pop('options', None)
+
+        logger.info(f"Question bank: drew {len(questions)}/{count} for '{topic}' ({difficulty})")
+        return questions
+
+    def deposit(self, subject, topic, difficulty, question_type, questions):
+        """Add freshly generated questions so later quizzes can reuse them"""
+        return self.db.add_bank_questions(subject, topic, difficulty, question_type, questions)
+
+    def refill_key(self, subject, topic, difficulty, question_type, target=None):
+        """Top a bank key up to `target` questions; returns how many were added"""
+        target = target or settings.QUESTION_BANK_TARGET
+        available = self.db.count_bank_questions(subject, topic, difficulty, question_type)
+        if available >= settings.QUESTION_BANK_LOW_WATER:
+            return 0
+
+        missing = target - available
+        generator = self._get_generator()
+        generator.clear_question_history()
+
+        # Keep every question the stream produced, even if some slots failed
+        manager = QuizManager()
+        produced = [
+            question for _, question in manager.stream_questions(
+                generator, subject, topic, question_type, difficulty.capitalize(), missing
+            )
+        ]
+        if len(produced) < missing:
+            logger.warning(
+                f"Question bank refill for '{topic}' ({difficulty}) produced "
+                f"{len(produced)}/{missing} questions"
+            )
+        if not produced:
+            return 0
+
+        return self.deposit(subject, topic, difficulty, question_type, produced)
+
+    def refill_popular(self):
+        """Refill every popular key that has dropped below the low-water mark"""
+        added = 0
+        with self._refill_lock:
+            for key in self.db.get_popular_bank_keys(settings.QUESTION_BANK_POPULAR_KEYS):
+                if self._stop_event.is_set():
+                    break
+                try:
+                    added += self.refill_key(key['subject'], key['topic'], key['difficulty'], key['question_type'])
+                except Exception as e:
+                    logger.error(f"Question bank refill error for {key}: {e}")
+        return added
+
+    def start_refiller(self):
+        """Start the background refill loop (idempotent)"""
+        if self._refill_thread is not None and self._refill_thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._refill_thread = threading.Thread(target=self._refill_loop, name="question-bank-refill", daemon=True)
+        self._refill_thread.start()
+        logger.info("Question bank refiller started")
+
+    def stop_refiller(self):
+        """Signal the refill loop to stop after its current key"""
+        self._stop_event.set()
+
+    def _refill_loop(self):
+        """Periodically refill popular keys until stopped"""
+        while not self._stop_event.wait(settings.QUESTION_BANK_REFILL_INTERVAL):
+            added = self.refill_popular()
+            if added:
+                logger.info(f"Question bank refiller added {added} questions")
+
+    def _get_generator(self):
+        """Dedicated generator so refills never touch a user's duplicate history"""
+        if self._generator is None:
+            self._generator = QuestionGenerator()
+            # Refills must never delay interactive chat or live quizzes
+            self._generator.priority = PRIORITY_BACKGROUND
+        return self._generator
@@ -1,100 +1,298 @@
+import json
+
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_groq import ChatGroq
+from langchain_core.utils.json import parse_json_markdown
 
 from src.models.question_schemas import MCQQuestion, FillBlankQuestion
 from src.prompts.quiz_templates import (
     mcq_prompt_template,
     fill_blank_prompt_template,
+    mcq_batch_prompt_template,
+    fill_blank_batch_prompt_template,
 )
 from src.config.settings import settings
 from src.common.logger import get_logger
 from src.common.custom_exception import CustomException
+from src.common.model_registry import LazyModel, EMBEDDING_TASK
+from src.common.inference_batcher import embed_text, embed_texts
+from src.llm.backends import create_chat_model
+from src.llm.scheduler import get_llm_scheduler, PRIORITY_STANDARD
 
-from sentence_transformers import SentenceTransformer
 import numpy as np
+import threading
 
 
 logger = get_logger(__name__)
 
 
-class QuestionGenerator:
-    def __init__(self) -> None:
-        """Initialize question generator with Groq LLM and HuggingFace embeddings."""
-        self.llm = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
-            model=settings.GROQ_MODEL,
-            temperature=settings.GROQ_TEMPERATURE,
-        )
+def _complete_json_items(text: str) -> list:
+    """Items of a truncated JSON array that were fully closed.
+
+    A cut-off tail is dropped rather than repaired, so a half-written
+    answer such as "Jupi" never reaches validation.
+    """
+    start = text.find("[")
+    if start == -1:
+        raise ValueError("Expected a JSON array of questions")
 
-        # Try to load HuggingFace embedding model for similarity checks
+    decoder = json.JSONDecoder()
+    items, index = [], start + 1
+    while True:
+        while index < len(text) and text[index] in " \t\r\n,":
+            index += 1
+        if index >= len(text) or text[index] == "]":
+            return items
         try:
-            self.embedding_model = SentenceTransformer(settings.HF_EMBEDDING_MODEL)
-            logger.info(
-                f"Loaded HuggingFace embedding model: {settings.HF_EMBEDDING_MODEL}"
-            )
-        except Exception as e:
-            logger.warning(f"Failed to load HuggingFace embeddings: {e}")
-            self.embedding_model = None
+            item, index = decoder.raw_decode(text, index)
+        except json.JSONDecodeError:
+            return items
+        items.append(item)
 
-        self.logger = get_logger(self.__class__.__name__)
-        self.generated_questions: list[str] = []
 
-    def _check_question_similarity(
-        self, new_question: str, threshold: float = 0.85
-    ) -> bool:
-        """Return True if new_question is too similar to previous ones."""
-        if not self.embedding_model or not self.generated_questions:
-            return False
+class QuestionListParser:
+    """List-aware counterpart of PydanticOutputParser.
+
+    Parses a JSON array of questions (fenced or bare; a truncated tail
+    keeps only the items that were complete) and validates each item on
+    its own, so one malformed item does not discard the rest of the batch.
+    """
+
+    def __init__(self, pydantic_object) -> None:
+        self.pydantic_object = pydantic_object
 
+    def parse(self, text: str) -> tuple[list, int]:
+        """Return (valid_items, rejected_count)."""
         try:
-            new_embedding = self.embedding_model.encode(new_question)
+            data = parse_json_markdown(text, parser=json.loads)
+        except json.JSONDecodeError:
+            data = _complete_json_items(text)
+
+        if isinstance(data, dict):
+            # Accept {"questions": [...]} style wrappers as well as bare arrays
+            data = next((v for v in data.values() if isinstance(v, list)), [data])
+        if not isinstance(data, list):
+            raise ValueError("Expected a JSON array of questions")
+
+        valid, rejected = [], 0
+        for item in data:
+            try:
+                valid.append(self.pydantic_object.model_validate(item))
+            except Exception as e:
+                rejected += 1
+                logger.info(f"Discarding invalid batch item: {e}")
 
-            for prev_question in self.generated_questions:
-                prev_embedding = self.embedding_model.encode(prev_question)
+        return valid, rejected
 
-                similarity = np.dot(new_embedding, prev_embedding) / (
-                    np.linalg.norm(new_embedding) * np.linalg.norm(prev_embedding)
-                )
 
-                if similarity > threshold:
-                    logger.info(
-                        f"Question too similar (similarity: {similarity:.2f}), regenerating..."
-                    )
-                    return True
+def _is_cancelled(cancel_event: threading.Event | None) -> bool:
+    """True once the quiz stream that asked for a question has been abandoned."""
+    return cancel_event is not None and cancel_event.is_set()
 
-            return False
+
+def _validate_mcq(question: MCQQuestion) -> None:
+    """Raise ValueError if the MCQ is not answerable as rendered."""
+    if len(question.options) != 4:
+        raise ValueError("Invalid MCQ: must have exactly 4 options")
+
+    if question.correct_answer not in question.options:
+        raise ValueError("Invalid MCQ: correct answer not in options")
+
+
+def _validate_fill_blank(question: FillBlankQuestion) -> None:
+    """Raise ValueError if the question has no blank to fill."""
+    if "___" not in question.question and "_____" not in question.question:
+        raise ValueError("Fill-in-blank must contain '___'")
+
+
+class QuestionGenerator:
+    def __init__(self) -> None:
+        """Initialize question generator with the configured LLM backend and HuggingFace embeddings."""
+        self.llm = create_chat_model()
+        # Scheduler priority for this generator's calls; background
+        # producers such as the question bank refiller lower it
+        self.priority = PRIORITY_STANDARD
+
+        # HuggingFace embedding model for similarity checks, shared through
+        # the model registry and only loaded on the first similarity check
+        self._embedding = LazyModel(settings.HF_EMBEDDING_MODEL, EMBEDDING_TASK)
+
+        self.logger = get_logger(self.__class__.__name__)
+        # Most recent QUESTION_HISTORY_LIMIT accepted questions, kept as a
+        # ring: once full, the oldest slot is overwritten
+        self.history_limit = max(1, settings.QUESTION_HISTORY_LIMIT)
+        self.generated_questions: list[str] = []
+        # L2-normalized embeddings, row i belongs to generated_questions[i].
+        # Capacity grows by doubling up to history_limit
+        self._embedding_buffer: np.ndarray | None = None
+        self._next_slot = 0
+        # Bumped on every accepted question so screening can tell whether
+        # its snapshot went stale
+        self._history_version = 0
+        # Guards the check-then-append on generated_questions so concurrent
+        # quiz workers cannot both accept the same near-duplicate question
+        self._history_lock = threading.Lock()
+
+    @property
+    def embedding_model(self):
+        """Shared embedding model, or None if it failed to load."""
+        return self._embedding.get()
+
+    @property
+    def question_embeddings(self) -> np.ndarray | None:
+        """Embedding rows of the remembered questions, or None if there are none."""
+        if self._embedding_buffer is None:
+            return None
+        return self._embedding_buffer[:len(self.generated_questions)]
+
+    def _encode_question(self, question: str):
+        """Encode a question once into an L2-normalized embedding row.
+
+        The forward pass is shared with concurrent quiz workers and chat
+        sessions through the embedding micro-batcher.
+        """
+        embedding = embed_text(question, settings.HF_EMBEDDING_MODEL)
+        return np.asarray(embedding, dtype=np.float32).reshape(-1)
+
+    def _encode_candidate(self, question: str) -> np.ndarray | None:
+        """Embedding for a candidate question, or None without a model.
+
+        Called outside _history_lock so concurrent quiz workers land in the
+        same embedding micro-batch.
+        """
+        if not self.embedding_model:
+            return None
+
+        try:
+            return self._encode_question(question)
         except Exception as e:
             logger.warning(f"Similarity check failed: {e}")
+            return None
+
+    def _check_question_similarity(
+        self, new_embedding: np.ndarray | None, matrix: np.ndarray | None, threshold: float = 0.85
+    ) -> bool:
+        """Return True if new_embedding is too similar to any row of matrix.
+
+        Scores the candidate against every accepted question with a single
+        matrix-vector product.
+        """
+        if new_embedding is None or matrix is None or len(matrix) == 0:
             return False
 
-    def _retry_and_parse(self, prompt, parser, topic, difficulty, subject=None):
-        """Generic retry loop with parsing and similarity checking."""
-        for attempt in range(settings.MAX_RETRIES):
-            try:
-                self.logger.info(
-                    f"Generating question for topic '{topic}' "
-                    f"with difficulty '{difficulty}' (attempt {attempt + 1})"
-                )
+        # Rows are unit length, so the dot product is the cosine similarity
+        similarities = matrix @ new_embedding
+        best_index = int(np.argmax(similarities))
+        best_similarity = float(similarities[best_index])
 
-                response = self.llm.invoke(
-                    prompt.format(
-                        topic=topic,
-                        difficulty=difficulty,
-                        subject=subject or topic,
-                    )
-                )
+        if best_similarity > threshold:
+            logger.info(
+                f"Question too similar (similarity: {best_similarity:.2f} "
+                f"to question #{best_index + 1} of {len(similarities)}), regenerating..."
+            )
+            return True
+
+        return False
+
+    def _screen_question(self, question: str) -> tuple[bool, tuple]:
+        """Encode and pre-score a candidate without holding _history_lock.
+
+        Returns (is_too_similar, embedding). The caller must call
+        _recheck_question under the lock before accepting it.
+        """
+        embedding = self._encode_candidate(question)
+        with self._history_lock:
+            version = self._history_version
+            snapshot = self.question_embeddings
+        return self._check_question_similarity(embedding, snapshot), (embedding, version)
+
+    def _recheck_question(self, screened) -> bool:
+        """Under _history_lock: re-score if questions were accepted meanwhile."""
+        embedding, version = screened
+        if self._history_version == version:
+            return False
+        return self._check_question_similarity(embedding, self.question_embeddings)
+
+    def _remember_question(self, question: str, embedding: np.ndarray | None) -> None:
+        """Store an accepted question and its embedding, keeping rows aligned.
+
+        Writes into a preallocated buffer; once history_limit questions are
+        remembered, the oldest one is overwritten.
+        """
+        slot = self._next_slot
+        if slot < len(self.generated_questions):
+            self.generated_questions[slot] = question
+        else:
+            self.generated_questions.append(question)
+        self._next_slot = (slot + 1) % self.history_limit
+        self._history_version += 1
+
+        if not self.embedding_model:
+            return
+
+        if embedding is None:
+            # Keep the matrix aligned with generated_questions; a zero row
+            # never matches anything
+            dimension = self.embedding_model.get_sentence_embedding_dimension()
+            embedding = np.zeros(dimension, dtype=np.float32)
+
+        buffer = self._embedding_buffer
+        if buffer is None or slot >= len(buffer):
+            # Amortized growth; earlier snapshots keep the old array
+            capacity = min(self.history_limit, max(16, slot + 1, 2 * (0 if buffer is None else len(buffer))))
+            grown = np.zeros((capacity, embedding.shape[-1]), dtype=np.float32)
+            if buffer is not None:
+                grown[:len(buffer)] = buffer
+            self._embedding_buffer = buffer = grown
+        buffer[slot] = embedding
+
+    def _retry_and_parse(self, prompt, parser, validate, topic, difficulty, subject=None, cancel_event=None):
+        """Generic retry loop with parsing, validation and similarity checking.
+
+        Only unusable answers are retried here, up to MAX_RETRIES calls;
+        rate limits and transport errors are retried by the LLM scheduler,
+        and a call it gives up on fails the question. Stops before the next
+        LLM call, and without remembering the result, once cancel_event is set.
+        """
+        for attempt in range(settings.MAX_RETRIES):
+            if _is_cancelled(cancel_event):
+                break
 
-                parsed = parser.parse(response.content)
+            self.logger.info(
+                f"Generating question for topic '{topic}' "
+                f"with difficulty '{difficulty}' (attempt {attempt + 1})"
+            )
 
-                # Similarity check
-                if self._check_question_similarity(parsed.question):
-                    if attempt < settings.MAX_RETRIES - 1:
-                        continue
-                    logger.warning(
-                        "Max retries reached, using potentially similar question"
-                    )
+            # Deliberately bypasses the LLM response cache: replaying a
+            # cached completion would hand out the same question again
+            response = get_llm_scheduler().invoke(
+                self.llm,
+                prompt.format(
+                    topic=topic,
+                    difficulty=difficulty,
+                    subject=subject or topic,
+                ),
+                priority=self.priority,
+            )
 
-                self.generated_questions.append(parsed.question)
+            try:
+                parsed = parser.parse(response.content)
+                validate(parsed)
+
+                # Encode outside the lock; the final check and the history
+                # update happen atomically
+                is_similar, screened = self._screen_question(parsed.question)
+                with self._history_lock:
+                    is_similar = is_similar or self._recheck_question(screened)
+                    if is_similar:
+                        if attempt < settings.MAX_RETRIES - 1:
+                            continue
+                        logger.warning(
+                            "Max retries reached, using potentially similar question"
+                        )
+
+                    if _is_cancelled(cancel_event):
+                        break
+                    self._remember_question(parsed.question, screened[0])
 
                 self.logger.info("Successfully parsed and validated question")
                 return parsed
@@ -106,8 +304,14 @@ class QuestionGenerator:
                         f"Generation failed after {settings.MAX_RETRIES} attempts", e
                     )
 
+        raise CustomException("Generation cancelled", "quiz stream closed")
+
     def generate_mcq(
-        self, topic: str, difficulty: str = "medium", subject: str | None = None
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        subject: str | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> MCQQuestion:
         """Generate a multiple-choice question."""
         try:
@@ -116,17 +320,13 @@ class QuestionGenerator:
             question: MCQQuestion = self._retry_and_parse(
                 mcq_prompt_template,
                 parser,
+                _validate_mcq,
                 topic,
                 difficulty,
                 subject,
+                cancel_event,
             )
 
-            if len(question.options) != 4:
-                raise ValueError("Invalid MCQ: must have exactly 4 options")
-
-            if question.correct_answer not in question.options:
-                raise ValueError("Invalid MCQ: correct answer not in options")
-
             question.difficulty = difficulty
             question.subject = subject or topic
 
@@ -138,7 +338,11 @@ class QuestionGenerator:
             raise CustomException("MCQ generation failed", e)
 
     def generate_fill_blank(
-        self, topic: str, difficulty: str = "medium", subject: str | None = None
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        subject: str | None = None,
+        cancel_event: threading.Event | None = None,
     ) -> FillBlankQuestion:
         """Generate a fill-in-the-blank question."""
         try:
@@ -147,14 +351,13 @@ class QuestionGenerator:
             question: FillBlankQuestion = self._retry_and_parse(
                 fill_blank_prompt_template,
                 parser,
+                _validate_fill_blank,
                 topic,
                 difficulty,
                 subject,
+                cancel_event,
             )
 
-            if "___" not in question.question and "_____" not in question.question:
-                raise ValueError("Fill-in-blank must contain '___'")
-
             question.difficulty = difficulty
             question.subject = subject or topic
 
@@ -165,7 +368,162 @@ class QuestionGenerator:
             self.logger.error(f"Failed to generate fill-in-blank: {str(e)}")
             raise CustomException("Fill-in-blank generation failed", e)
 
+    def _generate_batch(
+        self, prompt, schema, validate, topic, difficulty, subject, count, cancel_event=None
+    ) -> list:
+        """Generate `count` questions in as few LLM calls as possible.
+
+        Each call asks for the current shortfall as one JSON array. Valid,
+        non-duplicate items are kept and only the missing number is asked
+        for again, up to MAX_RETRIES calls. May return fewer than `count`,
+        and stops early once cancel_event is set.
+
+        A call the LLM scheduler gives up on (after its own backoff) ends
+        the batch: it raises if nothing was accepted yet, otherwise the
+        questions accepted so far are returned.
+        """
+        parser = QuestionListParser(schema)
+        accepted = []
+
+        for attempt in range(settings.MAX_RETRIES):
+            shortfall = count - len(accepted)
+            if shortfall <= 0 or _is_cancelled(cancel_event):
+                break
+
+            self.logger.info(
+                f"Generating batch of {shortfall} for topic '{topic}' "
+                f"with difficulty '{difficulty}' (attempt {attempt + 1})"
+            )
+
+            try:
+                # Not cached, for the same reason as _retry_and_parse
+                response = get_llm_scheduler().invoke(
+                    self.llm,
+                    prompt.format(
+                        topic=topic,
+                        difficulty=difficulty,
+                        subject=subject or topic,
+                        count=shortfall,
+                    ),
+                    priority=self.priority,
+                )
+            except Exception as e:
+                if not accepted:
+                    raise CustomException("Batch generation failed", e)
+                self.logger.error(f"Batch attempt {attempt + 1} failed, keeping {len(accepted)}/{count}: {str(e)}")
+                break
+
+            try:
+                items, rejected = parser.parse(response.content)
+            except Exception as e:
+                self.logger.error(f"Batch attempt {attempt + 1} failed: {str(e)}")
+                continue
+
+            for question in items:
+                if len(accepted) >= count:
+                    break
+
+                try:
+                    validate(question)
+                except ValueError as e:
+                    rejected += 1
+                    logger.info(f"Discarding batch item: {e}")
+                    continue
+
+                is_similar, screened = self._screen_question(question.question)
+                with self._history_lock:
+                    if is_similar or self._recheck_question(screened):
+                        rejected += 1
+                        continue
+                    if _is_cancelled(cancel_event):
+                        return accepted
+                    self._remember_question(question.question, screened[0])
+
+                question.difficulty = difficulty
+                question.subject = subject or topic
+                accepted.append(question)
+
+            self.logger.info(
+                f"Batch attempt {attempt + 1}: kept {len(accepted)}/{count}, "
+                f"rejected {rejected}"
+            )
+
+        return accepted
+
+    def generate_mcq_batch(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        subject: str | None = None,
+        count: int = 5,
+        cancel_event: threading.Event | None = None,
+    ) -> list[MCQQuestion]:
+        """Generate up to `count` multiple-choice questions per LLM call."""
+        return self._generate_batch(
+            mcq_batch_prompt_template,
+            MCQQuestion,
+            _validate_mcq,
+            topic,
+            difficulty,
+            subject,
+            count,
+            cancel_event,
+        )
+
+    def generate_fill_blank_batch(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        subject: str | None = None,
+        count: int = 5,
+        cancel_event: threading.Event | None = None,
+    ) -> list[FillBlankQuestion]:
+        """Generate up to `count` fill-in-the-blank questions per LLM call."""
+        return self._generate_batch(
+            fill_blank_batch_prompt_template,
+            FillBlankQuestion,
+            _validate_fill_blank,
+            topic,
+            difficulty,
+            subject,
+            count,
+            cancel_event,
+        )
+
+    def seed_question_history(self, questions: list[str]) -> None:
+        """Remember questions served from elsewhere (e.g. the question bank).
+
+        Live questions generated afterwards are checked against them, so a
+        quiz mixing bank and live questions has no near-duplicates.
+        """
+        with self._history_lock:
+            questions = [q for q in dict.fromkeys(questions) if q not in self.generated_questions]
+        if not questions:
+            return
+
+        embeddings = [None] * len(questions)
+        if self.embedding_model:
+            try:
+                embeddings = [
+                    np.asarray(embedding, dtype=np.float32).reshape(-1)
+                    for embedding in embed_texts(questions, settings.HF_EMBEDDING_MODEL)
+                ]
+            except Exception as e:
+                logger.warning(f"Could not encode seeded questions: {e}")
+
+        with self._history_lock:
+            for question, embedding in zip(questions, embeddings):
+                self._remember_question(question, embedding)
+
     def clear_question_history(self) -> None:
         """Clear the history of generated questions."""
-        self.generated_questions = []
+        with self._history_lock:
+            self.generated_questions = []
+            self._embedding_buffer = None
+            self._next_slot = 0
+            self._history_version += 1
         logger.info("Question generation history cleared")
+
+    def close(self) -> None:
+        """Release the shared embedding model back to the registry."""
+        self._embedding.release()
@@ -0,0 +1,304 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.llm.scheduler import estimate_tokens
+
+logger = get_logger(__name__)
+
+LLM_BACKENDS = ("groq", "record", "replay", "synthetic")
+
+
+def _prompt_text(messages):
+    """Flatten chat messages back into the rendered prompt text"""
+    return "\n".join(str(message.content) for message in messages)
+
+
+def prompt_hash(prompt):
+    """Fixture key for a rendered prompt"""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _result(prompt, content):
+    """Wrap content in a ChatResult with approximate usage metadata"""
+    input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(content)
+    message = AIMessage(
+        content=content,
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    )
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class SyntheticLLMError(RuntimeError):
+    """Injected failure from the synthetic backend"""
+
+
+class RecordingChatModel(BaseChatModel):
+    """Pass-through to a live model that appends every exchange to a fixture file"""
+
+    delegate: Any
+    fixture_path: str
+    model_name: str = "record"
+    temperature: Optional[float] = None
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        response = self.delegate.invoke(messages, stop=stop, **kwargs)
+
+        record = {"prompt_hash": prompt_hash(prompt), "prompt": prompt, "response": response.content}
+        with self._lock:
+            directory = os.path.dirname(self.fixture_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.fixture_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+
+class ReplayChatModel(BaseChatModel):
+    """Serves recorded responses from a fixture file instead of calling an API
+
+    Responses are matched by prompt hash; repeated recordings of the same
+    prompt are replayed in turn. In non-strict mode unmatched prompts get
+    the recorded responses in round-robin order so a benchmark can run on
+    prompts that were never recorded verbatim.
+    """
+
+    fixture_path: str
+    strict: bool = False
+    model_name: str = "replay"
+    temperature: Optional[float] = None
+
+    _by_hash: dict = PrivateAttr(default_factory=dict)
+    _positions: dict = PrivateAttr(default_factory=dict)
+    _all_responses: list = PrivateAttr(default_factory=list)
+    _fallback: Any = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context):
+        with open(self.fixture_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = record.get("prompt_hash") or prompt_hash(record["prompt"])
+                self._by_hash.setdefault(key, []).append(record["response"])
+                self._all_responses.append(record["response"])
+
+        if not self._all_responses:
+            raise ValueError(f"No recorded responses in {self.fixture_path}")
+        self._fallback = itertools.cycle(self._all_responses)
+        logger.info(f"Replay backend loaded {len(self._all_responses)} responses from {self.fixture_path}")
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+        key = prompt_hash(prompt)
+
+        with self._lock:
+            responses = self._by_hash.get(key)
+            if responses:
+                position = self._positions.get(key, 0)
+                self._positions[key] = position + 1
+                content = responses[position % len(responses)]
+            elif self.strict:
+                raise KeyError(f"No recorded response for prompt {key[:12]}")
+            else:
+                content = next(self._fallback)
+
+        return _result(prompt, content)
+
+
+class SyntheticChatModel(BaseChatModel):
+    """Offline backend with configurable latency and failure rate
+
+    Produces well-formed answers for the quiz and career prompts, so the
+    full pipeline (parsing, retries, similarity checks, DB writes) can be
+    exercised and profiled without network latency in the way.
+    Latency is drawn from a log-normal distribution around the median.
+    """
+
+    latency_ms: float = 400.0
+    latency_sigma: float = 0.5
+    failure_rate: float = 0.0
+    seed: Optional[int] = None
+    model_name: str = "synthetic"
+    temperature: Optional[float] = None
+
+    _rng: Any = PrivateAttr(default=None)
+    _counter: Any = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context):
+        self._rng = random.Random(self.seed)
+        self._counter = itertools.count(1)
+
+    @property
+    def _llm_type(self) -> str:
+        return "synthetic"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = _prompt_text(messages)
+
+        with self._lock:
+            delay = self._sample_latency()
+            fail = self._rng.random() < self.failure_rate
+        time.sleep(delay)
+
+        if fail:
+            raise SyntheticLLMError("Synthetic backend injected failure")
+        return _result(prompt, self._respond(prompt))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        """Stream the response word by word; the first word arrives after the sampled latency"""
+        result = self._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+        message = result.generations[0].message
+        words = re.findall(r"\S+\s*", message.content)
+
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.latency_ms / 1000 / 50)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+            if run_manager:
+                run_manager.on_llm_new_token(word, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=message.usage_metadata))
+
+    def _sample_latency(self):
+        """Seconds to sleep for one call"""
+        if self.latency_ms <= 0:
+            return 0.0
+        return self._rng.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000
+
+    def _respond(self, prompt):
+        """Build a response shaped like the one the prompt asks for"""
+        lowered = prompt.lower()
+        count_match = re.search(r"create (\d+) distinct", lowered)
+        count = int(count_match.group(1)) if count_match else 1
+
+        if "multiple-choice" in lowered:
+            items = [self._mcq() for _ in range(count)]
+        elif "fill-in-the-blank" in lowered:
+            items = [self._fill_blank() for _ in range(count)]
+        elif "numbered list" in lowered:
+            return "\n".join(f"{i}. Synthetic goal {next(self._counter)}" for i in range(1, 6))
+        else:
+            return (
+                f"Synthetic advice #{next(self._counter)}: break your goal into weekly milestones, "
+                "review progress every Friday, and focus on one skill at a time."
+            )
+
+        payload = items if count_match else items[0]
+        return f"```json\n{json.dumps(payload)}\n```"
+
+    def _mcq(self):
+        """One unique, valid MCQ"""
+        n = next(self._counter)
+        options = [f"Option {n}-{k}" for k in "ABCD"]
+        return {
+            "question": f"Synthetic question {n}: which statement about concept {n * 7919 % 10007} holds?",
+            "options": options,
+            "correct_answer": options[n % 4],
+            "explanation": "Synthetic explanation.",
+        }
+
+    def _fill_blank(self):
+        """One unique, valid fill-in-the-blank question"""
+        n = next(self._counter)
+        return {
+            "question": f"Synthetic statement {n}: concept {n * 7919 % 10007} is also known as _____.",
+            "answer": f"term{n}",
+            "explanation": "Synthetic explanation.",
+        }
+
+
+_groq_clients = {}
+_groq_clients_lock = threading.Lock()
+
+
+def _shared_groq(temperature):
+    """One ChatGroq per temperature, all on the shared pooled HTTP client"""
+    from langchain_groq import ChatGroq
+    from src.llm.http_pool import get_http_pool
+
+    with _groq_clients_lock:
+        groq = _groq_clients.get(temperature)
+        if groq is None:
+            groq = ChatGroq(
+                api_key=settings.GROQ_API_KEY,
+                model=settings.GROQ_MODEL,
+                temperature=temperature,
+                http_client=get_http_pool().client,
+                timeout=settings.LLM_HTTP_TIMEOUT_SECONDS,
+                # Retries and backoff are owned by the LLM scheduler
+                max_retries=0
+            )
+            _groq_clients[temperature] = groq
+        return groq
+
+
+def create_chat_model(temperature=None):
+    """Build the chat model selected by settings.LLM_BACKEND
+
+    Groq-backed models are shared per temperature and reuse one pooled,
+    keep-alive HTTP client across every generator and session.
+    """
+    backend = settings.LLM_BACKEND
+    temperature = settings.GROQ_TEMPERATURE if temperature is None else temperature
+
+    if backend not in LLM_BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{backend}', expected one of {LLM_BACKENDS}")
+
+    if backend == "synthetic":
+        return SyntheticChatModel(
+            latency_ms=settings.LLM_SYNTHETIC_LATENCY_MS,
+            latency_sigma=settings.LLM_SYNTHETIC_LATENCY_SIGMA,
+            failure_rate=settings.LLM_SYNTHETIC_FAILURE_RATE,
+            seed=settings.LLM_SYNTHETIC_SEED,
+            temperature=temperature,
+        )
+
+    if backend == "replay":
+        return ReplayChatModel(
+            fixture_path=settings.LLM_FIXTURE_PATH,
+            strict=settings.LLM_REPLAY_STRICT,
+            temperature=temperature,
+        )
+
+    groq = _shared_groq(temperature)
+
+    if backend == "record":
+        return RecordingChatModel(
+            delegate=groq,
+            fixture_path=settings.LLM_FIXTURE_PATH,
+            model_name=settings.GROQ_MODEL,
+            temperature=temperature,
+        )
+    return groq
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Memory hits refresh the disk row's last_access in batches at most this often
+TOUCH_FLUSH_SECONDS = 30
+
+
+def _llm_identity(llm):
+    """(model, temperature) of a chat model, used as part of the cache key"""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", "")
+    temperature = getattr(llm, "temperature", None)
+    return str(model), temperature
+
+
+class LLMResponseCache:
+    """Content-addressed cache for LLM completions
+
+    Responses are keyed by a hash of (model, temperature, rendered prompt).
+    Lookups hit an in-memory LRU first and a SQLite file second; disk
+    entries expire after `ttl_seconds` and the least recently used ones
+    are evicted once the file holds more than `max_disk_bytes` of content.
+    Memory hits count as use on disk too; their last_access updates are
+    written in batches, and always before eviction runs.
+    """
+
+    def __init__(self, path, ttl_seconds=86400, max_memory_entries=256, max_disk_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        # key -> last memory hit not yet written to the disk row
+        self._touched = {}
+        self._last_flush = time.time()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, temperature, prompt):
+        """Content address for a rendered prompt under a given model config"""
+        payload = f"{model}\x1f{temperature}\x1f{prompt}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def key_for(self, llm, prompt):
+        """Cache key for sending `prompt` to `llm`"""
+        model, temperature = _llm_identity(llm)
+        return self.make_key(model, temperature, prompt)
+
+    def get(self, key):
+        """Return the cached content for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                content, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    self._touched[key] = now
+                    if now - self._last_flush >= TOUCH_FLUSH_SECONDS:
+                        self._flush_touches(now)
+                        self._conn.commit()
+                    return content
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] <= self.ttl_seconds:
+                self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self._remember(key, row[0], row[1])
+                self._counters["disk_hits"] += 1
+                return row[0]
+
+            if row is not None:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key, content):
+        """Store content in both tiers and enforce the disk size limit"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, content, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, content, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, content, len(content.encode("utf-8")), now, now)
+            )
+            self._counters["writes"] += 1
+            self._flush_touches(now)
+            self._evict(now)
+            self._conn.commit()
+
+    def invoke(self, llm, prompt, invoke_fn=None):
+        """Return llm's response content for prompt, calling the LLM only on a miss
+
+        invoke_fn(prompt) replaces llm.invoke for the miss path, e.g. to route
+        the call through the LLM scheduler.
+        """
+        key = self.key_for(llm, prompt)
+        content = self.get(key)
+        if content is not None:
+            return content
+
+        content = (invoke_fn or llm.invoke)(prompt).content
+        self.set(key, content)
+        return content
+
+    def stats(self):
+        """Hit/miss counters plus current tier sizes"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"], stats["disk_bytes"] = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def _remember(self, key, content, created_at):
+        """Insert into the memory LRU, evicting the oldest entry when full"""
+        self._memory[key] = (content, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touches(self, now):
+        """Write pending memory-hit access times to disk; caller holds self._lock and commits"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+        self._last_flush = now
+
+    def _evict(self, now):
+        """Remove expired rows, then least recently used rows over the size limit
+
+        Called with self._lock held.
+        """
+        cursor = self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        evicted = cursor.rowcount
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total > self.max_disk_bytes:
+            freed = 0
+            stale_keys = []
+            for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+                if total - freed <= self.max_disk_bytes:
+                    break
+                stale_keys.append((key,))
+                freed += size
+            self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", stale_keys)
+            # Keep the memory tier from serving rows the size limit just dropped
+            for (key,) in stale_keys:
+                self._memory.pop(key, None)
+                self._touched.pop(key, None)
+            evicted += len(stale_keys)
+
+        if evicted:
+            self._counters["evictions"] += evicted
+            logger.info(f"LLM cache evicted {evicted} entries")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Process-wide response cache, or None when LLM_CACHE_ENABLED is false"""
+    global _cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache(
+                settings.LLM_CACHE_PATH,
+                ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+                max_memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+                max_disk_bytes=settings.LLM_CACHE_MAX_DISK_MB * 1024 * 1024
+            )
+            logger.info(f"LLM response cache opened at {settings.LLM_CACHE_PATH}")
+        return _cache
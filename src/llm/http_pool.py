@@ -0,0 +1,151 @@
+import threading
+import httpx
+from src.config.settings import settings
+from src.common.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _CountedStream(httpx.SyncByteStream):
+    """Response body that reports the request done once the body is closed
+
+    Streamed completions keep their connection busy until the last chunk
+    is read, so a request only stops counting as in flight here rather
+    than when the headers arrive.
+    """
+
+    def __init__(self, stream, pool):
+        self._stream = stream
+        self._pool = pool
+        self._failed = False
+        self._closed = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._stream:
+                yield chunk
+        except Exception:
+            self._failed = True
+            raise
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._pool._on_done(self._failed)
+
+
+class _CountingTransport(httpx.BaseTransport):
+    """Wraps the pool's transport so every send is counted, including ones that fail"""
+
+    def __init__(self, transport, pool):
+        self._transport = transport
+        self._pool = pool
+
+    def handle_request(self, request):
+        self._pool._on_send()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self._pool._on_done(True)
+            raise
+        # Done is reported when the body is closed, not when headers arrive
+        response.stream = _CountedStream(response.stream, self._pool)
+        return response
+
+    def close(self):
+        self._transport.close()
+
+
+class PooledHTTPClient:
+    """One keep-alive httpx client shared by every LLM client in the process
+
+    Connections (and their TLS sessions) are reused across generators and
+    Streamlit sessions. The pool is capped at `max_connections`, idle
+    connections are kept for `keepalive_seconds`, and a wrapping
+    transport counts traffic so pool utilization can be reported.
+    """
+
+    def __init__(self, max_connections=20, max_keepalive=10, keepalive_seconds=60.0,
+                 timeout_seconds=60.0, connect_timeout_seconds=10.0):
+        self.max_connections = max_connections
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "responses": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+
+        self._transport = httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_seconds,
+            )
+        )
+        self.client = httpx.Client(
+            transport=_CountingTransport(self._transport, self),
+            timeout=httpx.Timeout(timeout_seconds, connect=connect_timeout_seconds),
+        )
+        logger.info(
+            f"LLM HTTP pool created (max {max_connections} connections, "
+            f"{timeout_seconds:.0f}s timeout, {keepalive_seconds:.0f}s keep-alive)"
+        )
+
+    def metrics(self):
+        """Request counters plus open / busy / idle connections in the pool"""
+        with self._lock:
+            metrics = dict(self._counters)
+
+        open_connections = busy = 0
+        try:
+            # httpcore does not expose pool stats publicly
+            connections = list(self._transport._pool.connections)
+            open_connections = len(connections)
+            busy = sum(1 for connection in connections if not connection.is_idle())
+        except Exception:
+            pass
+
+        metrics["max_connections"] = self.max_connections
+        metrics["open_connections"] = open_connections
+        metrics["busy_connections"] = busy
+        metrics["idle_connections"] = open_connections - busy
+        metrics["utilization"] = busy / self.max_connections if self.max_connections else 0.0
+        return metrics
+
+    def close(self):
+        self.client.close()
+
+    def _on_send(self):
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["in_flight"] += 1
+            self._counters["peak_in_flight"] = max(self._counters["peak_in_flight"], self._counters["in_flight"])
+
+    def _on_done(self, failed):
+        """Called once per send, when the response body is closed or the request failed"""
+        with self._lock:
+            self._counters["errors" if failed else "responses"] += 1
+            self._counters["in_flight"] -= 1
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_http_pool():
+    """Process-wide pooled HTTP client for LLM API calls"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PooledHTTPClient(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_seconds=settings.LLM_HTTP_KEEPALIVE_SECONDS,
+                timeout_seconds=settings.LLM_HTTP_TIMEOUT_SECONDS,
+                connect_timeout_seconds=settings.LLM_HTTP_CONNECT_TIMEOUT_SECONDS,
+            )
+        return _pool
+
+
+def http_pool_metrics():
+    """Pool metrics, or None if no LLM HTTP traffic has been set up yet"""
+    return _pool.metrics() if _pool is not None else None
@@ -0,0 +1,317 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0   # career chat turns
+PRIORITY_STANDARD = 1      # user-triggered quiz and goal generation
+PRIORITY_BACKGROUND = 2    # question bank refills, summaries, warm caches
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_STANDARD: "standard",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Error class names treated as transient when no HTTP status is available
+_RETRYABLE_ERRORS = {
+    "RateLimitError", "APIConnectionError", "APITimeoutError",
+    "InternalServerError", "SyntheticLLMError",
+}
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _status_code(error):
+    """HTTP status carried by an API error, if any"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def _retry_after_seconds(error):
+    """Server-requested delay from a Retry-After header, if present"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error):
+    """Rate limits, timeouts and server errors are worth retrying"""
+    status = _status_code(error)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return type(error).__name__ in _RETRYABLE_ERRORS
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount, now):
+        """Seconds until `amount` can be taken (0 if unlimited or available now)"""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount):
+        if self.capacity > 0:
+            self.available -= amount
+
+    def give_back(self, amount):
+        """Correct an estimate once the real usage is known (may go negative)"""
+        if self.capacity > 0:
+            self.available = min(self.capacity, self.available + amount)
+
+
+class LLMScheduler:
+    """Central gate every LLM call goes through
+
+    Enforces requests-per-minute and tokens-per-minute budgets shared by
+    all sessions, serves waiting callers strictly by priority (then FIFO),
+    and retries rate limits and transient errors with jittered exponential
+    backoff that honors Retry-After. A Retry-After pauses every caller,
+    not just the one that hit it.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute, max_attempts=4,
+                 base_backoff=1.0, max_backoff=30.0, completion_tokens=256):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self.max_attempts = max(1, max_attempts)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.completion_tokens = completion_tokens
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._blocked_until = 0.0
+
+        self._waits = {priority: deque(maxlen=500) for priority in PRIORITY_NAMES}
+        self._counters = {"requests": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+
+    def invoke(self, llm, prompt, priority=PRIORITY_STANDARD):
+        """Call llm.invoke(prompt) within budget, retrying transient failures"""
+        for attempt in range(self.max_attempts):
+            with self.reserve(prompt, priority) as reservation:
+                try:
+                    response = llm.invoke(prompt)
+                except Exception as e:
+                    if not _is_retryable(e) or attempt == self.max_attempts - 1:
+                        self._record_failure(e)
+                        raise
+                    error = e
+                    delay = self._backoff(e, attempt)
+                else:
+                    reservation.record_usage(response)
+                    return response
+
+            logger.warning(f"LLM call failed ({error}); retrying in {delay:.1f}s (attempt {attempt + 2})")
+            time.sleep(delay)
+
+        raise CustomException("LLM scheduler exhausted retries", "no attempts left")
+
+    def stream(self, llm, prompt, priority=PRIORITY_STANDARD):
+        """Yield llm.stream(prompt) chunks within budget
+
+        Failures before the first chunk are retried like invoke(). Once
+        chunks have reached the caller the stream cannot be replayed, so a
+        later failure is raised, but its Retry-After still pauses everyone.
+        """
+        for attempt in range(self.max_attempts):
+            started = False
+            with self.reserve(prompt, priority) as reservation:
+                usage = None
+                try:
+                    for chunk in llm.stream(prompt):
+                        if getattr(chunk, "usage_metadata", None):
+                            usage = chunk if usage is None else usage + chunk
+                        started = True
+                        yield chunk
+                except Exception as e:
+                    if started or not _is_retryable(e) or attempt == self.max_attempts - 1:
+                        self._record_failure(e)
+                        raise
+                    error = e
+                    delay = self._backoff(e, attempt)
+                else:
+                    if usage is not None:
+                        reservation.record_usage(usage)
+                    return
+
+            logger.warning(f"LLM stream failed ({error}); retrying in {delay:.1f}s (attempt {attempt + 2})")
+            time.sleep(delay)
+
+        raise CustomException("LLM scheduler exhausted retries", "no attempts left")
+
+    @contextmanager
+    def reserve(self, prompt, priority=PRIORITY_STANDARD):
+        """Wait for budget for one call on `prompt`"""
+        estimate = estimate_tokens(prompt) + self.completion_tokens
+        self._acquire(priority, estimate)
+        reservation = _Reservation(self, estimate)
+        try:
+            yield reservation
+        finally:
+            # Reconcile even when the call raised, so usage reported before
+            # the failure is not lost from the token budget
+            reservation.settle()
+
+    def metrics(self):
+        """Queue depth, counters and wait-time stats per priority"""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiting:
+                depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            waits = {priority: list(values) for priority, values in self._waits.items()}
+            metrics = dict(self._counters)
+            metrics["queue_depth"] = len(self._waiting)
+            metrics["queue_depth_by_priority"] = depth
+            metrics["paused_for_seconds"] = max(0.0, self._blocked_until - time.monotonic())
+
+        metrics["wait_ms"] = {}
+        for priority, values in waits.items():
+            ordered = sorted(values)
+            metrics["wait_ms"][PRIORITY_NAMES.get(priority, str(priority))] = {
+                "count": len(ordered),
+                "avg": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+                "p95": ordered[int(0.95 * (len(ordered) - 1))] * 1000 if ordered else 0.0,
+                "max": ordered[-1] * 1000 if ordered else 0.0,
+            }
+        return metrics
+
+    def _acquire(self, priority, tokens):
+        """Block until this caller is first in line and both budgets allow it"""
+        ticket = (priority, next(self._sequence))
+        enqueued = time.monotonic()
+
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        now = time.monotonic()
+                        wait_seconds = max(
+                            self._blocked_until - now,
+                            self._requests.time_until(1, now),
+                            self._tokens.time_until(tokens, now),
+                        )
+                        if wait_seconds <= 0:
+                            heapq.heappop(self._waiting)
+                            self._requests.take(1)
+                            self._tokens.take(tokens)
+                            self._counters["requests"] += 1
+                            self._waits.setdefault(priority, deque(maxlen=500)).append(now - enqueued)
+                            self._cond.notify_all()
+                            return
+                        self._cond.wait(wait_seconds)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def _settle(self, estimate, actual):
+        """Return over-reserved tokens (or charge the overrun) to the bucket"""
+        with self._cond:
+            self._tokens.give_back(estimate - actual)
+            self._cond.notify_all()
+
+    def _backoff(self, error, attempt):
+        """Jittered exponential delay, never shorter than Retry-After"""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** attempt)) * random.uniform(0.5, 1.5)
+        retry_after = self._record_block(error)
+
+        with self._cond:
+            self._counters["retries"] += 1
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def _record_failure(self, error):
+        """Count a call that will not be retried, still honoring its Retry-After"""
+        self._record_block(error)
+        with self._cond:
+            self._counters["failures"] += 1
+
+    def _record_block(self, error):
+        """Count rate limits and pause every caller for Retry-After; returns it"""
+        retry_after = _retry_after_seconds(error)
+
+        with self._cond:
+            if _status_code(error) == 429 or type(error).__name__ == "RateLimitError":
+                self._counters["rate_limited"] += 1
+            if retry_after is not None:
+                # Everyone waits out the server's requested pause
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        return retry_after
+
+
+class _Reservation:
+    """Budget taken for one call, reconciled against reported token usage"""
+
+    def __init__(self, scheduler, estimate):
+        self._scheduler = scheduler
+        self.estimate = estimate
+        self.actual = None
+
+    def record_usage(self, message):
+        """Read token usage from an AIMessage, if the backend reports it"""
+        usage = getattr(message, "usage_metadata", None) or {}
+        if usage.get("total_tokens"):
+            self.actual = usage["total_tokens"]
+
+    def settle(self):
+        if self.actual is not None:
+            self._scheduler._settle(self.estimate, self.actual)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler():
+    """Process-wide scheduler shared by every generator and session"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler(
+                settings.LLM_RPM_LIMIT,
+                settings.LLM_TPM_LIMIT,
+                max_attempts=settings.LLM_MAX_ATTEMPTS,
+                base_backoff=settings.LLM_BACKOFF_BASE_SECONDS,
+                max_backoff=settings.LLM_BACKOFF_MAX_SECONDS,
+                completion_tokens=settings.LLM_COMPLETION_TOKEN_ESTIMATE,
+            )
+        return _scheduler
@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from src.config.settings import settings
+from src.common.logger import get_logger
+from src.common.model_registry import EMBEDDING_TASK
+from src.common.inference_batcher import get_batcher
+
+logger = get_logger(__name__)
+
+SEMANTIC_CACHE_SCOPES = ("user", "global")
+
+
+def context_fingerprint(*parts):
+    """Hash of the normalized context (tone, goal and task data) an answer was written for
+
+    Only case and whitespace are normalized: numbers such as progress or
+    deadlines are part of the context, so advice written for 10% progress
+    is never served at 90%. Contexts are compared exactly, never by
+    embedding similarity.
+    """
+    text = " ".join(str(part) for part in parts if part)
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class SemanticResponseCache:
+    """Answers reused for near-identical questions asked in a similar context
+
+    An entry matches when its context fingerprint is identical and the
+    cosine similarity of the question embeddings is at least `threshold`.
+    Entries live in memory, are scoped per user or
+    shared globally, expire after `ttl_seconds` and are evicted least
+    recently used first once `max_entries` is reached.
+    """
+
+    def __init__(self, threshold=0.92, max_entries=1000, ttl_seconds=604800, scope="user"):
+        if scope not in SEMANTIC_CACHE_SCOPES:
+            raise ValueError(f"Unknown semantic cache scope '{scope}', expected one of {SEMANTIC_CACHE_SCOPES}")
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.scope = scope
+
+        self._entries = OrderedDict()
+        self._matrices = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+
+    def lookup(self, query, fingerprint, user_id=None):
+        """(cached answer or None, query embedding or None) for a question and context
+
+        The embedding is only computed when the scope has candidate
+        entries; pass it on to store() so a miss is not encoded twice.
+        """
+        with self._lock:
+            self._counters["lookups"] += 1
+            self._expire(time.time())
+            ids, queries = self._matrix((self._scope_key(user_id), fingerprint))
+            if not ids:
+                self._counters["misses"] += 1
+                return None, None
+
+        query_embedding = self._embed(query)
+        if query_embedding is None:
+            return None, None
+
+        with self._lock:
+            ids, queries = self._matrix((self._scope_key(user_id), fingerprint))
+            if ids:
+                scores = queries @ query_embedding
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry = self._entries[ids[best]]
+                    entry["hits"] += 1
+                    self._entries.move_to_end(ids[best])
+                    self._counters["hits"] += 1
+                    logger.info(f"Semantic cache hit (question {scores[best]:.3f})")
+                    return entry["answer"], query_embedding
+
+            self._counters["misses"] += 1
+            return None, query_embedding
+
+    def store(self, query, fingerprint, answer, user_id=None, query_embedding=None):
+        """Remember an answer for later similar questions, reusing lookup()'s embedding if given"""
+        if not answer:
+            return
+        if query_embedding is None:
+            query_embedding = self._embed(query)
+        if query_embedding is None:
+            return
+
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            scope_key = (self._scope_key(user_id), fingerprint)
+            self._entries[entry_id] = {
+                "scope": scope_key,
+                "query_embedding": query_embedding,
+                "answer": answer,
+                "created": time.time(),
+                "hits": 0,
+            }
+            self._matrices.pop(scope_key, None)
+            self._counters["writes"] += 1
+
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._matrices.pop(evicted["scope"], None)
+                self._counters["evictions"] += 1
+
+    def stats(self):
+        """Hit-rate metrics and current size"""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+    def clear(self):
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def _scope_key(self, user_id):
+        return user_id if self.scope == "user" and user_id else "*"
+
+    def _embed(self, query):
+        """Question embedding computed in the shared micro-batch, or None"""
+        try:
+            future = get_batcher(settings.HF_EMBEDDING_MODEL, EMBEDDING_TASK).submit(query)
+            return np.asarray(future.result(timeout=settings.INFERENCE_TIMEOUT_SECONDS), dtype=np.float32).reshape(-1)
+        except Exception as e:
+            with self._lock:
+                self._counters["errors"] += 1
+            logger.warning(f"Semantic cache embedding failed: {e}")
+            return None
+
+    def _matrix(self, scope_key):
+        """(entry ids, question matrix) for a (scope, fingerprint) key, rebuilt after changes"""
+        cached = self._matrices.get(scope_key)
+        if cached is None:
+            ids = [entry_id for entry_id, entry in self._entries.items() if entry["scope"] == scope_key]
+            queries = np.vstack([self._entries[i]["query_embedding"] for i in ids]) if ids else None
+            cached = self._matrices[scope_key] = (ids, queries)
+        return cached
+
+    def _expire(self, now):
+        """Drop entries older than the TTL"""
+        expired = [
+            entry_id for entry_id, entry in self._entries.items()
+            if now - entry["created"] > self.ttl_seconds
+        ]
+        for entry_id in expired:
+            entry = self._entries.pop(entry_id)
+            self._matrices.pop(entry["scope"], None)
+            self._counters["evictions"] += 1
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache():
+    """Process-wide semantic cache, or None when SEMANTIC_CACHE_ENABLED is false"""
+    global _cache
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticResponseCache(
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.SEMANTIC_CACHE_TTL_SECONDS,
+                scope=settings.SEMANTIC_CACHE_SCOPE,
+            )
+        return _cache
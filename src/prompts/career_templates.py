@@ -56,3 +56,20 @@ Provide:
 Response:""",
     input_variables=["current_role", "target_role", "current_skills"]
 )
+
+conversation_summary_template = PromptTemplate(
+    template="""You maintain a running summary of a career coaching conversation.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Update the summary so it captures the user's situation, goals, concerns,
+decisions made and advice already given. Drop small talk and repetition.
+Write plain prose in at most {max_words} words.
+
+Updated summary:""",
+    input_variables=["summary", "messages", "max_words"]
+)
@@ -19,3 +19,27 @@ Return the result in JSON with these fields:
 - answer: the correct word or phrase for the blank
 - explanation: short explanation of the answer
 """
+
+mcq_batch_prompt_template = """
+You are an expert exam question setter. Create {count} distinct multiple-choice questions (MCQs) about the topic: {topic}.
+Difficulty: {difficulty}
+Subject: {subject}
+Each question must test a different fact or concept.
+Return the result as a JSON array of {count} objects, each with these fields:
+- question: the question text
+- options: a list of 4 options
+- correct_answer: exactly one of the options
+- explanation: short explanation of the answer
+"""
+
+fill_blank_batch_prompt_template = """
+You are an expert exam question setter. Create {count} distinct fill-in-the-blank questions about the topic: {topic}.
+Difficulty: {difficulty}
+Subject: {subject}
+Each question must test a different fact or concept.
+Use '_____' in each question where the blank appears.
+Return the result as a JSON array of {count} objects, each with these fields:
+- question: the question text containing '_____'
+- answer: the correct word or phrase for the blank
+- explanation: short explanation of the answer
+"""
@@ -1,6 +1,9 @@
 import os
 import pandas as pd
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
+from src.config.settings import settings
 from src.models.question_schemas import QuizResult
 
 class QuizManager:
@@ -12,45 +15,200 @@ class QuizManager:
         self.results = []
         self.subject = None
         self.difficulty = None
+        self.generation_complete = False
+        self._cancel_event = None
+
+    def generate_questions(self, generator, subject: str, topic: str, question_type: str, difficulty: str, num_questions: int, max_workers: int = None, question_bank=None, user_id: str = None):
+        """Generate quiz questions using the question generator
+
+        Blocking wrapper around stream_questions(); returns True once every
+        question exists.
+        """
+        try:
+            for _ in self.stream_questions(generator, subject, topic, question_type, difficulty, num_questions, max_workers, question_bank, user_id):
+                pass
+            return self.generation_complete
+        
+        except Exception as e:
+            print(f"Error generating questions: {e}")
+            return False
+
+    def stream_questions(self, generator, subject: str, topic: str, question_type: str, difficulty: str, num_questions: int, max_workers: int = None, question_bank=None, user_id: str = None):
+        """Yield (index, question) pairs as soon as each question is ready
+
+        When a question bank and user are given, unseen bank questions are
+        yielded first and only the shortfall is generated live (and then
+        added to the bank for later quizzes).
+
+        Live questions are generated concurrently on a bounded thread pool.
+        A failing slot does not cancel the others. Questions may arrive in
+        any order, but self.questions is assembled by index once the stream
+        completes.
+
+        Starting a new stream, calling cancel(), or closing the iterator
+        stops any generation still in flight for the previous one.
+        """
+        self.cancel()
+        cancel_event = threading.Event()
+        self._cancel_event = cancel_event
 
-    def generate_questions(self, generator, subject: str, topic: str, question_type: str, difficulty: str, num_questions: int):
-        """Generate quiz questions using the question generator"""
         self.questions = []
         self.user_answers = []
         self.results = []
         self.subject = subject
         self.difficulty = difficulty
+        self.generation_complete = False
 
         try:
-            for _ in range(num_questions):
-                if question_type == "Multiple Choice":
-                    question = generator.generate_mcq(topic, difficulty.lower(), subject)
-
-                    self.questions.append({
-                        'type': 'MCQ',
-                        'question': question.question,
-                        'options': question.options,
-                        'correct_answer': question.correct_answer,
-                        'subject': subject,
-                        'difficulty': difficulty
-                    })
-
-                else:  # Fill in the blank
-                    question = generator.generate_fill_blank(topic, difficulty.lower(), subject)
-
-                    self.questions.append({
-                        'type': 'Fill in the blank',
-                        'question': question.question,
-                        'correct_answer': question.answer,
-                        'subject': subject,
-                        'difficulty': difficulty
-                    })
-            
-            return True
-        
-        except Exception as e:
-            print(f"Error generating questions: {e}")
-            return False
+            slots = [None] * num_questions
+
+            drawn = []
+            if question_bank is not None and user_id:
+                try:
+                    drawn = question_bank.draw(user_id, subject, topic, difficulty, question_type, num_questions)
+                except Exception as e:
+                    print(f"Question bank unavailable, generating live: {e}")
+
+            for index, question in enumerate(drawn[:num_questions]):
+                slots[index] = question
+                yield index, question
+
+            workers = max_workers or settings.QUIZ_GENERATION_CONCURRENCY
+            live_indices = list(range(len(drawn), num_questions))
+
+            # Bank questions came from the refiller's generator; seed them so
+            # live questions for the shortfall cannot duplicate them
+            if drawn and live_indices:
+                try:
+                    generator.seed_question_history([question['question'] for question in drawn[:num_questions]])
+                except Exception as e:
+                    print(f"Could not seed bank questions into history: {e}")
+
+            live_stream = self._stream_live(generator, subject, topic, question_type, difficulty, live_indices, workers, cancel_event)
+            try:
+                for index, question in live_stream:
+                    slots[index] = question
+                    yield index, question
+            finally:
+                live_stream.close()
+
+            if cancel_event.is_set():
+                return
+
+            missing = sum(1 for question in slots if question is None)
+            if missing:
+                print(f"Error generating questions: {missing} of {num_questions} failed")
+                return
+
+            live = slots[len(drawn):]
+            if live and question_bank is not None:
+                try:
+                    question_bank.deposit(subject, topic, difficulty, question_type, live)
+                except Exception as e:
+                    print(f"Failed to add questions to bank: {e}")
+
+            self.questions = slots
+            self.generation_complete = True
+        finally:
+            # Also runs when the caller closes the iterator early (GeneratorExit)
+            cancel_event.set()
+
+    def cancel(self):
+        """Stop the generation stream that is currently running, if any"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+
+    def _stream_live(self, generator, subject: str, topic: str, question_type: str, difficulty: str, indices: list, workers: int, cancel_event):
+        """Yield (index, question) for live-generated questions as they complete
+
+        In batch mode the slots are split into QUIZ_BATCH_SIZE chunks that
+        are each requested in a single LLM call. Slots are not resubmitted
+        here: the generator already re-asks for unusable answers and the
+        LLM scheduler retries rate limits, so a slot that still fails
+        stays empty.
+        """
+        if not indices:
+            return
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(indices))), thread_name_prefix="quiz-gen")
+        futures = {}
+
+        try:
+            if settings.QUIZ_GENERATION_MODE == "batch":
+                batch_size = max(1, settings.QUIZ_BATCH_SIZE)
+                for start in range(0, len(indices), batch_size):
+                    chunk = indices[start:start + batch_size]
+                    future = executor.submit(self._generate_question_batch, generator, subject, topic, question_type, difficulty, len(chunk), cancel_event)
+                    futures[future] = ("batch", chunk)
+            else:
+                for index in indices:
+                    future = executor.submit(self._generate_single_question, generator, subject, topic, question_type, difficulty, cancel_event)
+                    futures[future] = ("single", [index])
+
+            while futures:
+                if cancel_event.is_set():
+                    return
+
+                # Short timeout so cancellation is noticed while calls are in flight
+                done, _ = wait(futures, timeout=0.25, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    kind, chunk = futures.pop(future)
+                    try:
+                        result = future.result()
+                        produced = result if kind == "batch" else [result]
+                    except Exception as e:
+                        print(f"Error generating question {chunk[0] + 1}: {e}")
+                        produced = []
+
+                    for index, question in zip(chunk, produced):
+                        yield index, question
+        finally:
+            # Drop queued work; in-flight workers see cancel_event (set by
+            # stream_questions) and stop before their next LLM call, without
+            # adding their questions to the generator's history
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def _generate_single_question(cls, generator, subject: str, topic: str, question_type: str, difficulty: str, cancel_event=None):
+        """Generate one question and convert it to the quiz dict format"""
+        if question_type == "Multiple Choice":
+            question = generator.generate_mcq(topic, difficulty.lower(), subject, cancel_event)
+        else:  # Fill in the blank
+            question = generator.generate_fill_blank(topic, difficulty.lower(), subject, cancel_event)
+
+        return cls._to_quiz_dict(question, question_type, subject, difficulty)
+
+    @classmethod
+    def _generate_question_batch(cls, generator, subject: str, topic: str, question_type: str, difficulty: str, count: int, cancel_event=None):
+        """Generate several questions in one LLM call, converted to quiz dicts"""
+        if question_type == "Multiple Choice":
+            questions = generator.generate_mcq_batch(topic, difficulty.lower(), subject, count, cancel_event)
+        else:  # Fill in the blank
+            questions = generator.generate_fill_blank_batch(topic, difficulty.lower(), subject, count, cancel_event)
+
+        return [cls._to_quiz_dict(question, question_type, subject, difficulty) for question in questions]
+
+    @staticmethod
+    def _to_quiz_dict(question, question_type: str, subject: str, difficulty: str):
+        """Convert a generated question model to the dict format the UI renders"""
+        if question_type == "Multiple Choice":
+            return {
+                'type': 'MCQ',
+                'question': question.question,
+                'options': question.options,
+                'correct_answer': question.correct_answer,
+                'subject': subject,
+                'difficulty': difficulty
+            }
+
+        return {
+            'type': 'Fill in the blank',
+            'question': question.question,
+            'correct_answer': question.answer,
+            'subject': subject,
+            'difficulty': difficulty
+        }
 
     def collect_answer(self, question_index: int, user_answer: str):
         """Collect a single answer"""